@@ -15,6 +15,10 @@ LOG_DIR = DATA_DIR / "log"
 CSV_DIR = DATA_DIR / "temp"
 LOG_CSV_PATH = DATA_DIR / "falhas_download.csv"
 LOG_FILE = f"log\\brazil_data_cube_log.txt"
+SEARCH_CACHE_DIR = DATA_DIR / "cache" / "stac"
+SEARCH_CACHE_TTL_HOURS = 6.0
+ASSET_CACHE_DIR = DATA_DIR / "cache" / "assets"
+ASSET_CACHE_MAX_GB = 3.0
 
 # Tiles do Paraná
 TILES_PARANA = [
@@ -0,0 +1,193 @@
+# brazil_data_cube/downloader/asset_cache.py
+
+import os
+import shutil
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+class AssetCache:
+    """
+    Cache local de assets baixados, endereçado pelo conteúdo remoto.
+
+    A chave é o href do asset mais o validador HTTP (ETag ou Last-Modified):
+    se o arquivo remoto mudar, a chave muda e o cache não é usado. As entradas
+    entram no cache de forma atômica (arquivo temporário + os.replace) e, quando
+    o tamanho total passa da cota, as menos usadas recentemente (mtime, que é
+    atualizado a cada acerto) são removidas. Entradas fixadas com pin não são
+    removidas enquanto estiverem em uso.
+
+    O tamanho de cada entrada é guardado ao lado dela (<chave>.size) e conferido
+    a cada acerto: uma entrada alterada depois de entrar no cache (ex.: gravada
+    através de um hard link) é descartada em vez de entregue.
+
+    Os arquivos são entregues ao diretório de saída por hard link quando
+    possível (sem ocupar espaço extra no volume), senão por cópia.
+    """
+
+    ENTRY_SUFFIX = ".asset"
+    SIZE_SUFFIX = ".size"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 3 * 1024 ** 3):
+        """
+        Args:
+            cache_dir (str): Diretório do cache
+            max_bytes (int): Cota de tamanho do cache em bytes
+        """
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(href: str, validator: str) -> str:
+        """
+        Chave do asset: sha256 do href e do ETag/Last-Modified.
+
+        Sem validador não há como detectar mudanças no arquivo remoto, então
+        esses assets não entram no cache.
+        """
+        if not validator:
+            raise ValueError(f"Asset sem ETag/Last-Modified não pode ser cacheado: {href}")
+        return hashlib.sha256(f"{href}\n{validator}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def validator_from_headers(headers: Dict[str, str]) -> Optional[str]:
+        """Extrai o validador da resposta (ETag tem prioridade sobre Last-Modified)."""
+        etag = headers.get("etag")
+        if etag:
+            return f"etag:{etag}"
+        last_modified = headers.get("last-modified")
+        return f"last-modified:{last_modified}" if last_modified else None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.ENTRY_SUFFIX)
+
+    def _size_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.SIZE_SUFFIX)
+
+    def _stored_size(self, key: str) -> Optional[int]:
+        """Tamanho registrado quando a entrada entrou no cache (None se não houver registro)."""
+        try:
+            with open(self._size_path(key), encoding="utf-8") as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _remove(self, key: str) -> None:
+        """Remove a entrada e o tamanho registrado."""
+        for path in (self._path(key), self._size_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def pinned(self, key: str) -> Iterator[None]:
+        """Impede que a entrada seja removida pela evicção enquanto o bloco executa."""
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pins[key] -= 1
+                if self._pins[key] == 0:
+                    del self._pins[key]
+
+    def fetch(self, key: str, filepath: str) -> Optional[int]:
+        """
+        Copia (ou liga) a entrada do cache para filepath, se existir.
+
+        Returns:
+            Optional[int]: Tamanho do arquivo entregue, ou None se não estiver em cache
+        """
+        path = self._path(key)
+        with self.pinned(key):
+            if not os.path.isfile(path):
+                return None
+            size = os.path.getsize(path)
+            stored_size = self._stored_size(key)
+            if size != stored_size:
+                logger.warning(f"Entrada do cache com {size} bytes em vez de {stored_size}; descartando: {key}")
+                self._remove(key)
+                return None
+            self._materialize(path, filepath)
+            # Marca o uso para a ordem LRU
+            os.utime(path)
+            return size
+
+    def store(self, key: str, filepath: str) -> None:
+        """Adiciona um arquivo baixado ao cache e aplica a cota."""
+        path = self._path(key)
+        with self.pinned(key):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            self._materialize(filepath, tmp_path)
+            # O tamanho é registrado antes da entrada: uma entrada nunca é aceita com o tamanho de outra
+            size_tmp_path = f"{self._size_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(size_tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(os.path.getsize(tmp_path)))
+            os.replace(size_tmp_path, self._size_path(key))
+            os.replace(tmp_path, path)
+            os.utime(path)
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove as entradas menos usadas até o cache caber na cota.
+
+        Returns:
+            int: Quantidade de bytes liberados
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(self.ENTRY_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.name[:-len(self.ENTRY_SUFFIX)]))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, key in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            with self._lock:
+                if key in self._pins:
+                    continue
+                if not os.path.exists(self._path(key)):
+                    continue
+                self._remove(key)
+            freed += size
+            logger.info(f"Asset removido do cache (LRU): {key} ({size / 1024 ** 2:.1f} MB)")
+
+        return freed
+
+    @staticmethod
+    def detach(filepath: str) -> None:
+        """
+        Remove filepath se ele for um hard link de uma entrada do cache.
+
+        Deve ser chamado antes de baixar de novo para o mesmo caminho: gravar
+        sobre o link alteraria também o arquivo guardado no cache.
+        """
+        try:
+            if os.stat(filepath).st_nlink > 1:
+                os.remove(filepath)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _materialize(src: str, dst: str) -> None:
+        """Hard link de src em dst (substituindo dst), com cópia se o link não for possível."""
+        if os.path.exists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
@@ -0,0 +1,318 @@
+# brazil_data_cube/downloader/async_downloader.py
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from .asset_cache import AssetCache
+from ..utils.http_transport import HttpTransport
+from ..utils.metrics import MetricsRegistry
+
+
+logger = logging.getLogger(__name__)
+
+class AsyncDownloader:
+    """
+    Motor de download assíncrono (asyncio + aiohttp) para muitos assets ao mesmo tempo.
+
+    Cada transferência é uma corrotina, não uma thread. A concorrência é
+    limitada por host (e no total) pelo conector do aiohttp. A gravação em
+    disco roda em um pool pequeno de threads alimentado por uma fila limitada
+    por arquivo: se o disco não acompanha, a leitura da rede daquele arquivo
+    pausa (backpressure) em vez de acumular chunks em memória.
+
+    A instância mantém um único event loop (em uma thread própria) e uma única
+    sessão aiohttp enquanto estiver aberta: chamadas de download_all feitas por
+    threads diferentes (ex.: um tile por worker) entram no mesmo loop e
+    disputam o mesmo conector, em vez de abrir um loop por chamada. Use close()
+    ao final da execução.
+
+    Os arquivos são gravados como <destino>.part e só renomeados ao final; em
+    erro ou cancelamento o arquivo parcial é removido.
+    """
+
+    def __init__(self, max_per_host: int = 8, max_total: int = 256, chunk_size: int = 1024 * 256,
+                 write_queue_size: int = 8, writer_threads: int = 4,
+                 connect_timeout: float = 10.0, read_timeout: float = 60.0,
+                 transport: Optional[HttpTransport] = None, asset_cache: Optional[AssetCache] = None):
+        """
+        Args:
+            max_per_host (int): Conexões simultâneas por host
+            max_total (int): Transferências simultâneas no total
+            chunk_size (int): Tamanho dos blocos lidos da rede
+            write_queue_size (int): Chunks pendentes de gravação por arquivo antes de pausar a leitura
+            writer_threads (int): Threads usadas para gravar em disco
+            connect_timeout (float): Timeout de conexão em segundos
+            read_timeout (float): Timeout entre leituras em segundos
+            transport (Optional[HttpTransport]): Transporte HTTP do pipeline; se informado, seus
+                timeouts, retentativas e cabeçalhos substituem os valores acima
+            asset_cache (Optional[AssetCache]): Cache local de assets (mesmo do motor com threads)
+        """
+        self.max_per_host = max_per_host
+        self.max_total = max_total
+        self.chunk_size = chunk_size
+        self.write_queue_size = write_queue_size
+        self.writer_threads = writer_threads
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = 0
+        self.backoff_factor = 0.0
+        self.status_forcelist: frozenset = frozenset()
+        self.headers: Dict[str, str] = {}
+        if transport is not None:
+            self.connect_timeout, self.read_timeout = transport.timeout
+            self.retries = transport.retry.total or 0
+            self.backoff_factor = transport.retry.backoff_factor
+            self.status_forcelist = frozenset(transport.retry.status_forcelist or ())
+            # Só os cabeçalhos do pipeline (ex.: autenticação), não os padrões do requests
+            defaults = requests.utils.default_headers()
+            self.headers = {name: value for name, value in transport.session.headers.items()
+                            if defaults.get(name) != value}
+        self.asset_cache = asset_cache
+
+        self._session = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    async def download_iter(self, jobs: Iterable[Tuple[str, str]],
+                            on_bytes: Optional[Callable[[int], None]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Baixa os pares (href, destino) e entrega cada resultado assim que termina.
+
+        Se o consumidor parar de iterar ou a tarefa for cancelada, as
+        transferências pendentes são canceladas e os arquivos parciais removidos.
+
+        Args:
+            jobs (Iterable[Tuple[str, str]]): Pares (href, caminho de destino)
+            on_bytes (Optional[Callable[[int], None]]): Chamado com a quantidade de bytes gravados
+
+        Yields:
+            Dict[str, Any]: {"href", "path", "bytes", "error"} (error é None em caso de sucesso)
+        """
+        session = self._open_session()
+        tasks = [asyncio.ensure_future(self._obter(session, href, path, on_bytes)) for href, path in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"Cancelando {len(pending)} downloads pendentes.")
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def download_all(self, jobs: Iterable[Tuple[str, str]],
+                     on_bytes: Optional[Callable[[int], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Versão síncrona de download_iter, executada no event loop da instância.
+
+        Pode ser chamada por várias threads ao mesmo tempo.
+
+        Returns:
+            List[Dict[str, Any]]: Resultados na ordem em que terminaram
+        """
+        async def collect():
+            return [result async for result in self.download_iter(jobs, on_bytes)]
+
+        return asyncio.run_coroutine_threadsafe(collect(), self._event_loop()).result()
+
+    def close(self) -> None:
+        """Fecha a sessão, o pool de gravação e encerra o event loop da instância."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self._close_session(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """Cria, na primeira chamada, o event loop da instância em uma thread própria."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="async-downloader", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _open_session(self) -> Any:
+        """Sessão aiohttp compartilhada por todas as transferências (criada no loop em execução)."""
+        import aiohttp
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_total, limit_per_host=self.max_per_host)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers)
+            self._writer = ThreadPoolExecutor(max_workers=self.writer_threads, thread_name_prefix="async-writer")
+        return self._session
+
+    async def _close_session(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._writer.shutdown(wait=True)
+            self._session = self._writer = None
+
+    async def _obter(self, session: Any, href: str, path: str,
+                     on_bytes: Optional[Callable[[int], None]]) -> Dict[str, Any]:
+        """Entrega o asset a partir do cache local ou baixa da rede (com retentativas)."""
+        try:
+            validator = await self._validator(session, href) if self.asset_cache is not None else None
+            if validator is None:
+                written = await self._baixar_com_retentativas(session, href, path, on_bytes)
+                return {"href": href, "path": path, "bytes": written, "error": None}
+
+            loop = asyncio.get_running_loop()
+            key = AssetCache.make_key(href, validator)
+            with self.asset_cache.pinned(key):
+                size = await loop.run_in_executor(self._writer, self.asset_cache.fetch, key, path)
+                if size is not None:
+                    logger.info(f"Asset encontrado no cache local: {path}")
+                    MetricsRegistry.get().inc("bdc_asset_cache_hits_total")
+                    if on_bytes is not None:
+                        on_bytes(size)
+                    return {"href": href, "path": path, "bytes": size, "error": None}
+
+                written = await self._baixar_com_retentativas(session, href, path, on_bytes)
+                await loop.run_in_executor(self._writer, self.asset_cache.store, key, path)
+            return {"href": href, "path": path, "bytes": written, "error": None}
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Erro ao baixar {href}: {e}")
+            return {"href": href, "path": None, "bytes": 0, "error": str(e)}
+
+    async def _validator(self, session: Any, href: str) -> Optional[str]:
+        """ETag/Last-Modified do asset; None se o HEAD falhar ou não trouxer validador."""
+        async with session.head(href, allow_redirects=True) as response:
+            if response.status >= 400:
+                logger.info(f"HEAD de {href} retornou {response.status}; baixando sem o cache local.")
+                return None
+            validator = AssetCache.validator_from_headers(response.headers)
+        if validator is None:
+            logger.info(f"Asset sem ETag/Last-Modified, baixando sem o cache local: {href}")
+        return validator
+
+    async def _baixar_com_retentativas(self, session: Any, href: str, path: str,
+                                       on_bytes: Optional[Callable[[int], None]]) -> int:
+        """Repete a transferência em erros de conexão e nos status de retentativa do transporte."""
+        import aiohttp
+
+        # Com ou sem validador: path pode ser um hard link de uma entrada do cache de uma execução anterior
+        await asyncio.get_running_loop().run_in_executor(self._writer, AssetCache.detach, path)
+
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._transfer(session, href, path, on_bytes)
+            except (aiohttp.ClientResponseError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                status = getattr(e, "status", None)
+                if attempt == self.retries or (status is not None and status not in self.status_forcelist):
+                    raise
+                delay = self.backoff_factor * (2 ** attempt)
+                logger.warning(f"Falha ao baixar {href} ({e}); nova tentativa em {delay:.1f}s.")
+                await asyncio.sleep(delay)
+
+    async def _transfer(self, session: Any, href: str, path: str,
+                        on_bytes: Optional[Callable[[int], None]]) -> int:
+        """Baixa um arquivo para path e retorna os bytes gravados; em erro remove o parcial."""
+        part_path = f"{path}.part"
+        loop = asyncio.get_running_loop()
+        writer = self._writer
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.write_queue_size)
+        fout = None
+        written = 0
+        start = time.perf_counter()
+        ttfb = None
+
+        async def gravar():
+            nonlocal written
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    return
+                escrita = asyncio.wrap_future(writer.submit(fout.write, chunk))
+                try:
+                    await asyncio.shield(escrita)
+                except asyncio.CancelledError:
+                    # A thread não pode ser interrompida: a escrita termina antes de o arquivo poder ser fechado
+                    await asyncio.gather(escrita, return_exceptions=True)
+                    raise
+                written += len(chunk)
+                if on_bytes is not None:
+                    on_bytes(len(chunk))
+
+        async def enfileirar(chunk) -> bool:
+            # Com a fila cheia, espera por espaço ou pelo fim do gravador: se ele falhar,
+            # ninguém mais consome a fila e um put simples ficaria bloqueado para sempre
+            if not queue.full():
+                queue.put_nowait(chunk)
+                return True
+            put = asyncio.ensure_future(queue.put(chunk))
+            await asyncio.wait({put, writer_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                return False
+            return True
+
+        writer_task = None
+        try:
+            async with session.get(href) as response:
+                response.raise_for_status()
+                total_bytes = response.content_length
+                ttfb = time.perf_counter() - start
+
+                fout = await loop.run_in_executor(writer, open, part_path, "wb")
+                writer_task = asyncio.ensure_future(gravar())
+
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    if writer_task.done() or not await enfileirar(chunk):
+                        # O gravador só termina antes do fim se falhou
+                        break
+                if not writer_task.done():
+                    await enfileirar(None)
+                await writer_task
+
+            await loop.run_in_executor(writer, fout.close)
+
+            if total_bytes and written != total_bytes:
+                raise RuntimeError(f"Download incompleto de {path}: {written} de {total_bytes} bytes.")
+
+            os.replace(part_path, path)
+            MetricsRegistry.get().observe_transfer(written, ttfb, time.perf_counter() - start,
+                                                   asset=os.path.basename(path))
+            logger.info(f"Download concluído: {path}")
+            return written
+
+        except BaseException:
+            # Protegido: um novo cancelamento durante a limpeza não deixa o arquivo aberto nem o parcial no disco
+            await asyncio.shield(self._descartar(writer, writer_task, fout, part_path))
+            raise
+
+    @staticmethod
+    async def _descartar(writer: ThreadPoolExecutor, writer_task: Optional[asyncio.Future],
+                         fout: Any, part_path: str) -> None:
+        """Interrompe a gravação, espera a escrita em andamento e remove o arquivo parcial, sem bloquear o loop."""
+        loop = asyncio.get_running_loop()
+        if writer_task is not None:
+            writer_task.cancel()
+            # O gravador só termina depois da escrita que estava no pool; um erro dele já foi repassado
+            await asyncio.gather(writer_task, return_exceptions=True)
+        try:
+            if fout is not None and not fout.closed:
+                await loop.run_in_executor(writer, fout.close)
+        finally:
+            try:
+                os.remove(part_path)
+            except FileNotFoundError:
+                pass
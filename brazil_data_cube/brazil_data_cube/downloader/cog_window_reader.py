@@ -0,0 +1,99 @@
+# brazil_data_cube/downloader/cog_window_reader.py
+
+import math
+import logging
+import rasterio
+import rasterio.errors
+from rasterio.windows import Window, from_bounds
+from rasterio.warp import transform_bounds
+from typing import List
+
+
+logger = logging.getLogger(__name__)
+
+# Evita listagens do diretório remoto e agrupa as leituras em poucas requisições HTTP
+GDAL_REMOTE_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".tif,.TIF,.tiff,.TIFF",
+    "GDAL_HTTP_MULTIRANGE": "YES",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "VSI_CACHE": "TRUE",
+}
+
+class CogWindowReader:
+    """
+    Lê apenas a janela de um Cloud-Optimized GeoTIFF remoto que cobre uma bbox.
+
+    O GDAL (/vsicurl/) busca somente os blocos internos que intersectam a área,
+    então uma bbox pequena transfere uma fração da banda completa.
+    """
+
+    # Lado mínimo dos blocos de um recorte tiled; abaixo disso o recorte é gravado em faixas
+    MIN_BLOCK = 256
+
+    def __init__(self, bbox_crs: str = "EPSG:4326"):
+        self.bbox_crs = bbox_crs
+
+    def read_window(self, href: str, bbox: List[float], filepath: str) -> str:
+        """
+        Recorta a bbox diretamente do COG remoto e grava o resultado em um GeoTIFF local.
+
+        Args:
+            href (str): URL do COG
+            bbox (List[float]): [minx, miny, maxx, maxy] no CRS de bbox_crs
+            filepath (str): Caminho do arquivo recortado
+
+        Returns:
+            str: Caminho do arquivo gravado
+        """
+        with rasterio.Env(**GDAL_REMOTE_OPTIONS):
+            with rasterio.open(href) as src:
+                window = self._window_for_bbox(src, bbox)
+
+                logger.info(f"Lendo janela {window.width}x{window.height} de {src.width}x{src.height} em: {href}")
+                data = src.read(window=window)
+
+                profile = self._clip_profile(src.profile, int(window.width), int(window.height))
+                profile.update(driver="GTiff", transform=src.window_transform(window))
+
+        with rasterio.open(filepath, 'w', **profile) as dst:
+            dst.write(data)
+
+        return filepath
+
+    @classmethod
+    def _clip_profile(cls, profile: dict, width: int, height: int) -> dict:
+        """
+        Perfil do recorte: os blocos do COG de origem (ex.: 512x512) não podem ser
+        maiores que a janela, então são reduzidos a ela (múltiplos de 16, exigido
+        pelo GTiff) ou, em recortes menores que um bloco mínimo, o arquivo não é tiled.
+        """
+        profile = dict(profile, width=width, height=height)
+        if not profile.get("tiled"):
+            return profile
+
+        blockxsize = min(profile.get("blockxsize", cls.MIN_BLOCK), width) // 16 * 16
+        blockysize = min(profile.get("blockysize", cls.MIN_BLOCK), height) // 16 * 16
+        if min(blockxsize, blockysize) < cls.MIN_BLOCK:
+            profile.pop("blockxsize", None)
+            profile.pop("blockysize", None)
+            profile["tiled"] = False
+        else:
+            profile.update(blockxsize=blockxsize, blockysize=blockysize)
+        return profile
+
+    def _window_for_bbox(self, src, bbox: List[float]) -> Window:
+        """Converte a bbox para o CRS do raster e retorna a janela de pixels inteiros que a cobre."""
+        bounds = transform_bounds(self.bbox_crs, src.crs, *bbox, densify_pts=21)
+        window = from_bounds(*bounds, transform=src.transform)
+
+        col_off, row_off = math.floor(window.col_off), math.floor(window.row_off)
+        col_end = math.ceil(window.col_off + window.width)
+        row_end = math.ceil(window.row_off + window.height)
+        window = Window(col_off, row_off, col_end - col_off, row_end - row_off)
+
+        full = Window(0, 0, src.width, src.height)
+        try:
+            return window.intersection(full)
+        except rasterio.errors.WindowError:
+            raise ValueError(f"A bbox {bbox} não intersecta o raster.")
@@ -1,23 +1,46 @@
 # brazil_data_cube/downloader/fetcher.py
 
 import logging
+from shapely.geometry import box, mapping, shape
+from shapely.ops import unary_union
+from shapely.strtree import STRtree
 from ..utils.logger import ResultManager
 from ..config import TILES_PARANA
-from typing import Optional, Dict, Any
+from .search_cache import SearchCache
+from ..utils.metrics import MetricsRegistry
+from ..utils.tracing import Tracer
+from typing import Optional, Dict, Any, List, Tuple
 
 
 logger = logging.getLogger(__name__)
 
+# Itens por página na busca em lote (menos idas e voltas à API)
+BATCH_PAGE_SIZE = 500
+# Itens por página na busca ordenada por nuvem (normalmente a primeira página basta)
+SORTED_PAGE_SIZE = 10
+SORTBY_CLOUD_COVER = [{"field": "properties.eo:cloud_cover", "direction": "asc"}]
+
 class SatelliteImageFetcher:
-    def __init__(self, connection: any):
+    def __init__(self, connection: any, search_cache: Optional[SearchCache] = None,
+                 sorted_search: bool = False):
+        """
+        Args:
+            connection (any): Cliente STAC da BDC
+            search_cache (Optional[SearchCache]): Cache em disco das buscas (desativado se None)
+            sorted_search (bool): Com tile informado, pede os itens já ordenados por nuvem
+                e para no primeiro que passa no filtro de geometria
+        """
         self.connection = connection
+        self.search_cache = search_cache
+        self.sorted_search = sorted_search
+        self._sortby_supported: Optional[bool] = None
 
     def fetch_image(self, satelite: str, bounding_box: list, start_date: str,
                     end_date: str, max_cloud_cover: float, tile_grid_path: str,
-                    tile: Optional[str]) -> Optional[Dict[str, Any]]:
+                    tile: Optional[str], items: Optional[List[Any]] = None) -> Optional[Dict[str, Any]]:
         """
         Busca uma imagem usando filtro de nuvem e geometria.
-        
+
         Args:
             satelite (str): Nome do satélite
             bounding_box (list): Coordenadas [minx, miny, maxx, maxy]
@@ -26,23 +49,39 @@ class SatelliteImageFetcher:
             max_cloud_cover (float): Máximo de cobertura de nuvem (%)
             tile_grid_path (str): Caminho do shapefile de tiles
             tile (Optional[str]): ID do tile (opcional)
+            items (Optional[List]): Itens já obtidos por search_batch (pula a busca)
 
         Returns:
             Optional[Dict]: Assets da imagem ou None se não encontrar
         """
+        with Tracer.get().span("fetch_image", tile=tile, satelite=satelite):
+            return self._fetch_image(satelite, bounding_box, start_date, end_date,
+                                     max_cloud_cover, tile_grid_path, tile, items)
+
+    def _fetch_image(self, satelite: str, bounding_box: list, start_date: str,
+                     end_date: str, max_cloud_cover: float, tile_grid_path: str,
+                     tile: Optional[str], items: Optional[List[Any]]) -> Optional[Dict[str, Any]]:
         try:
-            logger.info(f"Buscando imagens do {satelite}...")
+            if items is None:
+                logger.info(f"Buscando imagens do {satelite}...")
 
-            # Construindo filtro com base no satélite
-            filt = self._build_filter(satelite, max_cloud_cover)
-            search_result = self.connection.search(
-                bbox=bounding_box,
-                datetime=[start_date, end_date],
-                collections=[satelite],
-                filter=filt
-            )
+                # Construindo filtro com base no satélite
+                filt = self._build_filter(satelite, max_cloud_cover)
 
-            items = list(search_result.items())
+                # Uma varredura completa já em cache dispensa a busca ordenada
+                items = self._cached_items(self._search_params(satelite, bounding_box, start_date, end_date, filt))
+
+                if items is None and tile and self.sorted_search:
+                    result = self._search_sorted(satelite, bounding_box, start_date, end_date, filt, tile_grid_path, tile)
+                    if result is not None:
+                        return self._assets_from_sorted(result, satelite, tile)
+
+                if items is None:
+                    items = self._search_items(satelite, bounding_box, start_date, end_date, filt, check_cache=False)
+            else:
+                items = list(items)
+
+            from ..utils.geometry_utils import GeometryUtils
 
             if tile:
                 if not items:
@@ -50,9 +89,7 @@ class SatelliteImageFetcher:
                     ResultManager().log_error_csv(tile, satelite, "Nenhuma imagem encontrada.")
                     return None
 
-                from ..utils.geometry_utils import GeometryUtils
-                geometry_utils = GeometryUtils(tile_grid_path)
-                items = [item for item in items if geometry_utils.is_good_geometry(item, tile)]
+                items = GeometryUtils(tile_grid_path).filter_good_geometries(items, tile)
 
                 if not items:
                     logger.warning(f"Nenhuma imagem passou no filtro de geometria para o tile: {tile}")
@@ -64,8 +101,7 @@ class SatelliteImageFetcher:
                     return None
 
                 tile = items[0].properties.get('tileId', '')
-                geometry_utils = GeometryUtils(tile_grid_path)
-                items = [item for item in items if geometry_utils.is_good_geometry(item, tile)]
+                items = GeometryUtils(tile_grid_path).filter_good_geometries(items, tile)
 
             # Seleciona a melhor imagem (menor cobertura de nuvem)
             items.sort(key=lambda item: item.properties.get('eo:cloud_cover', float('inf')))
@@ -82,6 +118,237 @@ class SatelliteImageFetcher:
             ResultManager().log_error_csv(tile, satelite, erro_msg)
             return None
 
+    def _search_sorted(self, satelite: str, bounding_box: list, start_date: str, end_date: str,
+                       filt: Dict[str, Any], tile_grid_path: str, tile: str) -> Optional[Tuple[int, Any]]:
+        """
+        Busca com ordenação por nuvem no servidor, parando no primeiro item válido.
+
+        As páginas são pedidas uma a uma; como chegam em ordem crescente de
+        eo:cloud_cover, o primeiro item que passa no filtro de geometria é o
+        mesmo que a varredura completa escolheria. Os itens lidos ficam no cache
+        de buscas (com o tile e a ordenação na chave), e uma nova execução refaz
+        o filtro sobre eles sem ir à API.
+
+        Returns:
+            Optional[Tuple[int, Any]]: (itens lidos, melhor item ou None), ou None se o
+            servidor não suportar sortby (o chamador faz a varredura completa)
+        """
+        from ..utils.geometry_utils import GeometryUtils
+        geometry_utils = GeometryUtils(tile_grid_path)
+
+        params = self._search_params(satelite, bounding_box, start_date, end_date, filt)
+        params.update({"sortby": SORTBY_CLOUD_COVER, "tile": tile})
+        cached = self._cached_items(params)
+        if cached is not None:
+            good = geometry_utils.filter_good_geometries(cached, tile)
+            return len(cached), good[0] if good else None
+
+        if not self._supports_sortby():
+            return None
+
+        try:
+            with MetricsRegistry.get().timer("bdc_search_seconds", strategy="sorted"):
+                result = self._search_sorted_pages(satelite, bounding_box, start_date, end_date,
+                                                   filt, geometry_utils, tile)
+        except Exception as e:
+            status_code = getattr(e, "status_code", None)
+            if status_code is not None and 400 <= status_code < 500 and status_code not in (408, 429):
+                # A API recusou a requisição com sortby: não adianta tentar de novo nesta execução
+                logger.warning(f"API recusou a busca ordenada ({status_code}), usando varredura completa: {e}")
+                self._sortby_supported = False
+            else:
+                logger.warning(f"Falha na busca ordenada, usando varredura completa neste tile: {e}")
+            return None
+
+        if result is None:
+            logger.warning("O servidor ignorou o sortby (itens fora de ordem); usando varredura completa.")
+            self._sortby_supported = False
+            return None
+
+        items, best_item = result
+        self._store_items(params, items)
+        return len(items), best_item
+
+    def _search_sorted_pages(self, satelite: str, bounding_box: list, start_date: str, end_date: str,
+                             filt: Dict[str, Any], geometry_utils: Any, tile: str) -> Optional[Tuple[List[Any], Any]]:
+        """
+        Percorre as páginas ordenadas por nuvem até o primeiro item válido (ver _search_sorted).
+
+        Returns:
+            Optional[Tuple[List[Any], Any]]: (itens lidos, melhor item ou None), ou None se
+            os itens vierem fora de ordem (o servidor ignorou o sortby)
+        """
+        search_result = self.connection.search(
+            bbox=bounding_box,
+            datetime=[start_date, end_date],
+            collections=[satelite],
+            filter=filt,
+            sortby=SORTBY_CLOUD_COVER,
+            limit=SORTED_PAGE_SIZE
+        )
+
+        seen: List[Any] = []
+        previous = float('-inf')
+        for page in search_result.pages():
+            items = list(page)
+            for item in items:
+                cloud_cover = item.properties.get('eo:cloud_cover', float('inf'))
+                if cloud_cover < previous:
+                    return None
+                previous = cloud_cover
+
+            seen.extend(items)
+            good = geometry_utils.filter_good_geometries(items, tile)
+            if good:
+                return seen, good[0]
+
+        return seen, None
+
+    def _supports_sortby(self) -> bool:
+        """Consulta (uma vez) se a API declara suporte à extensão de ordenação."""
+        if self._sortby_supported is None:
+            try:
+                from pystac_client.conformance import ConformanceClasses
+                self._sortby_supported = bool(self.connection.conforms_to(ConformanceClasses.SORT))
+            except Exception:
+                self._sortby_supported = False
+            if not self._sortby_supported:
+                logger.info("API STAC sem suporte a sortby; usando varredura completa.")
+        return self._sortby_supported
+
+    def _assets_from_sorted(self, result: Tuple[int, Any], satelite: str, tile: str) -> Optional[Dict[str, Any]]:
+        """Converte o resultado da busca ordenada no retorno de fetch_image."""
+        seen, best_item = result
+
+        if best_item is None:
+            erro_msg = "Nenhuma imagem encontrada." if seen == 0 else "Imagem não passou no filtro de geometria."
+            logger.warning(f"{erro_msg} Tile: {tile}")
+            ResultManager().log_error_csv(tile, satelite, erro_msg)
+            return None
+
+        cloud_cover = best_item.properties.get('eo:cloud_cover', 'desconhecido')
+        logger.info(f"Imagem selecionada com {cloud_cover}% de nuvem ({seen} itens lidos).")
+        return best_item.assets
+
+    def search_batch(self, satelite: str, tile_bboxes: Dict[str, List[float]], start_date: str,
+                     end_date: str, max_cloud_cover: float, max_tiles_per_search: int = 50) -> Dict[str, List[Any]]:
+        """
+        Busca as imagens de vários tiles de uma vez e distribui os itens entre eles.
+
+        Em vez de uma busca por tile, faz uma busca pela união das bboxes (em
+        grupos de até max_tiles_per_search tiles). Cada item vai para todo tile
+        cuja bbox ele intersecta, consultado em uma STRtree, que é o mesmo
+        critério da busca individual por bbox.
+
+        Args:
+            satelite (str): Nome do satélite
+            tile_bboxes (Dict[str, List[float]]): Bbox de busca de cada tile
+            start_date (str): Data início YYYY-MM-DD
+            end_date (str): Data fim YYYY-MM-DD
+            max_cloud_cover (float): Máximo de cobertura de nuvem (%)
+            max_tiles_per_search (int): Quantidade máxima de tiles por busca
+
+        Returns:
+            Dict[str, List]: Itens encontrados para cada tile (lista vazia se nenhum)
+        """
+        filt = self._build_filter(satelite, max_cloud_cover)
+        tiles = list(tile_bboxes)
+        tile_boxes = [box(*tile_bboxes[tile]) for tile in tiles]
+        tree = STRtree(tile_boxes)
+        items_by_tile: Dict[str, List[Any]] = {tile: [] for tile in tiles}
+        seen = set()
+
+        for start in range(0, len(tiles), max_tiles_per_search):
+            group = tile_boxes[start:start + max_tiles_per_search]
+            area = mapping(unary_union(group))
+
+            logger.info(f"Buscando imagens do {satelite} para {len(group)} tiles em uma única busca...")
+            items = self._search_items(satelite, None, start_date, end_date, filt,
+                                       intersects=area, limit=BATCH_PAGE_SIZE)
+
+            for item in items:
+                # Grupos vizinhos podem retornar o mesmo item
+                if item.id in seen:
+                    continue
+                seen.add(item.id)
+                for position in tree.query(shape(item.geometry), predicate="intersects"):
+                    items_by_tile[tiles[position]].append(item)
+
+        logger.info(f"Busca em lote: {len(seen)} itens distribuídos entre {len(tiles)} tiles.")
+        return items_by_tile
+
+    def _search_items(self, satelite: str, bounding_box: Optional[list], start_date: str,
+                      end_date: str, filt: Dict[str, Any], intersects: Optional[Dict[str, Any]] = None,
+                      limit: Optional[int] = None, check_cache: bool = True) -> List[Any]:
+        """
+        Executa a busca STAC, consultando antes o cache em disco (se configurado).
+
+        Args:
+            intersects (Optional[Dict]): Geometria GeoJSON da busca (substitui a bbox)
+            limit (Optional[int]): Itens por página (não altera o resultado)
+            check_cache (bool): Consulta o cache antes de buscar (False se o chamador já consultou)
+
+        Returns:
+            List[Any]: Itens retornados pela busca
+        """
+        params = self._search_params(satelite, bounding_box, start_date, end_date, filt, intersects)
+        search_kwargs = {"intersects": intersects} if intersects is not None else {"bbox": bounding_box}
+        if limit is not None:
+            search_kwargs["limit"] = limit
+
+        if check_cache:
+            cached = self._cached_items(params)
+            if cached is not None:
+                return cached
+
+        with MetricsRegistry.get().timer("bdc_search_seconds", strategy="batch" if intersects is not None else "full"):
+            search_result = self.connection.search(
+                datetime=[start_date, end_date],
+                collections=[satelite],
+                filter=filt,
+                **search_kwargs
+            )
+            items = list(search_result.items())
+
+        self._store_items(params, items)
+        return items
+
+    def _cached_items(self, params: Dict[str, Any]) -> Optional[List[Any]]:
+        """Itens da busca com esses parâmetros no cache em disco, ou None."""
+        if self.search_cache is None:
+            return None
+
+        cached = self.search_cache.get(SearchCache.make_key(params))
+        if cached is not None:
+            logger.info(f"Busca encontrada no cache ({len(cached)} itens).")
+            MetricsRegistry.get().inc("bdc_search_cache_hits_total")
+        return cached
+
+    def _store_items(self, params: Dict[str, Any], items: List[Any]) -> None:
+        """Grava os itens da busca no cache em disco (se configurado)."""
+        if self.search_cache is None:
+            return
+        try:
+            self.search_cache.put(SearchCache.make_key(params), items, params)
+        except Exception as e:
+            # Falha no cache não deve interromper a busca
+            logger.warning(f"Não foi possível gravar a busca no cache: {e}")
+
+    @staticmethod
+    def _search_params(satelite: str, bounding_box: Optional[list], start_date: str, end_date: str,
+                       filt: Dict[str, Any], intersects: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parâmetros que identificam uma busca no cache."""
+        params = {
+            "collection": satelite,
+            "datetime": [start_date, end_date],
+            "filter": filt,
+        }
+        if intersects is not None:
+            params["intersects"] = intersects
+        else:
+            params["bbox"] = [float(v) for v in bounding_box]
+        return params
+
     def _build_filter(self, satelite, max_cloud_cover):
         """Cria o filtro de busca com base no satélite."""
         if satelite == 'S2_L2A-1':
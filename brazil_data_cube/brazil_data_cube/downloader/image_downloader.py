@@ -1,19 +1,69 @@
 # brazil_data_cube/downloader/image_downloader.py
 
 import os
-import requests
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 import logging
-from typing import Optional
+from typing import Optional, Dict, Any, Callable, List
+from .segmented_downloader import SegmentedDownloader
+from .cog_window_reader import CogWindowReader
+from .async_downloader import AsyncDownloader
+from .asset_cache import AssetCache
+from ..utils.http_transport import HttpTransport
+from ..utils.metrics import MetricsRegistry
+from ..utils.tracing import Tracer
 
 
 logger = logging.getLogger(__name__)
 
 class ImagemDownloader:
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, pool_size: int = 8, segments: int = 1,
+                 transport: Optional[HttpTransport] = None, engine: str = "threads",
+                 asset_cache: Optional[AssetCache] = None):
+        if engine not in ("threads", "async"):
+            raise ValueError(f"Motor de download inválido: {engine}")
+
         self.output_dir = output_dir
+        # "async" baixa com asyncio/aiohttp (sem segmentos nem thread por transferência)
+        self.engine = engine
+        self.chunk_size = 1024 * 16
+        self.pool_size = pool_size
+        # Sem transporte compartilhado, cria um com conexões suficientes para todos os segmentos
+        self.transport = transport or HttpTransport(pool_maxsize=pool_size * max(1, segments))
+        self.session = self.transport.session
+        # Com mais de um segmento, arquivos são baixados por intervalos de bytes e podem ser retomados
+        self.segmented = SegmentedDownloader(self.session, segments) if segments > 1 else None
+        # Assets já baixados (mesmo href e ETag/Last-Modified) são reaproveitados sem ir à rede
+        self.asset_cache = asset_cache
+        # Motor assíncrono único da execução: todos os tiles usam o mesmo event loop e conector
+        self.async_downloader = AsyncDownloader(max_per_host=self.transport.pool_maxsize, transport=self.transport,
+                                                asset_cache=asset_cache) if engine == "async" else None
         self.create_output()
 
+    def close(self) -> None:
+        """Encerra o motor assíncrono, se houver (o transporte é de quem o criou)."""
+        if self.async_downloader is not None:
+            self.async_downloader.close()
+
+    def release(self, assets: Dict[str, Any]) -> None:
+        """
+        Apaga os arquivos baixados por download_many para esses assets (as entradas
+        do cache de assets são hard links próprios e continuam no cache).
+
+        Args:
+            assets (Dict[str, Any]): Os mesmos nomes de arquivo -> assets passados a download_many
+        """
+        for filename in assets:
+            filepath = os.path.join(self.output_dir, filename)
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+            else:
+                logger.debug(f"Banda removida após o uso: {filepath}")
+
     def create_output(self) -> None:
         """Cria diretório de saída se ele não existir."""
         os.makedirs(self.output_dir, exist_ok=True)
@@ -22,7 +72,7 @@ class ImagemDownloader:
     def download(self, asset: dict, filename: str, request_options: dict = {}) -> Optional[str]:
         """
         Baixa um asset usando requisição HTTP.
-        
+
         Args:
             asset (dict): Asset do catálogo STAC
             filename (str): Nome do arquivo a ser salvo
@@ -39,17 +89,240 @@ class ImagemDownloader:
             filepath = os.path.join(self.output_dir, filename)
             logger.info(f"Iniciando download da imagem para: {filepath}")
 
-            response = requests.get(asset.href, stream=True, **request_options)
-            total_bytes = int(response.headers.get('content-length', 0))
-            chunk_size = 1024 * 16
+            with tqdm(total=0, unit='B', unit_scale=True, miniters=1, desc=os.path.basename(filepath)) as progress:
+                def on_total(total_bytes):
+                    progress.total = total_bytes
+                    progress.refresh()
 
-            with tqdm.wrapattr(open(filepath, 'wb'), 'write', miniters=1, total=total_bytes, desc=os.path.basename(filepath)) as fout:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    fout.write(chunk)
+                self._baixar_arquivo(asset.href, filepath, request_options, on_total, progress.update)
 
             logger.info(f"Download concluído: {filepath}")
             return filepath
 
         except Exception as e:
             logger.error(f"Erro ao fazer download da imagem: {str(e)}")
-            raise RuntimeError(f"Erro ao fazer download da imagem: {e}")
\ No newline at end of file
+            raise RuntimeError(f"Erro ao fazer download da imagem: {e}")
+
+    def download_many(self, assets: Dict[str, Any], request_options: dict = {},
+                      clip_bbox: Optional[List[float]] = None) -> Dict[str, str]:
+        """
+        Baixa vários assets de um mesmo item em paralelo, com uma única barra de progresso.
+
+        Args:
+            assets (Dict[str, Any]): Nome do arquivo a ser salvo -> asset do catálogo STAC
+            request_options (dict): Opções adicionais para o request
+            clip_bbox (Optional[List[float]]): Se informado, lê do COG remoto apenas a janela
+                que cobre a bbox (EPSG:4326) em vez de baixar a banda inteira
+
+        Returns:
+            Dict[str, str]: Nome do arquivo -> caminho do arquivo baixado
+        """
+        if not assets:
+            return {}
+
+        if any(asset is None for asset in assets.values()):
+            logger.error("Tentativa de download com asset inválido.")
+            raise RuntimeError("Erro ao fazer download da imagem: Asset inválido.")
+
+        if clip_bbox is not None:
+            return self.download_clipped(assets, clip_bbox)
+
+        if self.engine == "async":
+            return self.download_many_async(assets)
+
+        lock = threading.Lock()
+        progress = tqdm(total=0, unit='B', unit_scale=True, miniters=1, desc=f"{len(assets)} bandas")
+        # Os workers herdam os atributos de trace (ex.: tile) de quem pediu o download
+        trace_attributes = Tracer.get().current_attributes()
+
+        def baixar(filename, asset):
+            filepath = os.path.join(self.output_dir, filename)
+            logger.info(f"Iniciando download da imagem para: {filepath}")
+
+            def on_total(total_bytes):
+                with lock:
+                    progress.total += total_bytes
+                    progress.refresh()
+
+            def on_bytes(n):
+                with lock:
+                    progress.update(n)
+
+            with Tracer.get().attributes(**trace_attributes):
+                self._baixar_arquivo(asset.href, filepath, request_options, on_total, on_bytes)
+
+            logger.info(f"Download concluído: {filepath}")
+            return filepath
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(assets), self.pool_size),
+                                    thread_name_prefix="band-download") as executor:
+                futures = {filename: executor.submit(baixar, filename, asset) for filename, asset in assets.items()}
+                return {filename: future.result() for filename, future in futures.items()}
+
+        except Exception as e:
+            logger.error(f"Erro ao fazer download das imagens: {str(e)}")
+            raise RuntimeError(f"Erro ao fazer download das imagens: {e}")
+
+        finally:
+            progress.close()
+
+    def download_many_async(self, assets: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Baixa vários assets com o motor assíncrono (ver AsyncDownloader).
+
+        Chamadas simultâneas (um tile por worker) compartilham o mesmo event loop,
+        a mesma sessão e o cache de assets.
+
+        Args:
+            assets (Dict[str, Any]): Nome do arquivo a ser salvo -> asset do catálogo STAC
+
+        Returns:
+            Dict[str, str]: Nome do arquivo -> caminho do arquivo baixado
+        """
+        paths = {filename: os.path.join(self.output_dir, filename) for filename in assets}
+        jobs = [(asset.href, paths[filename]) for filename, asset in assets.items()]
+
+        with tqdm(total=0, unit='B', unit_scale=True, miniters=1, desc=f"{len(assets)} bandas") as progress:
+            results = self.async_downloader.download_all(jobs, on_bytes=progress.update)
+
+        erros = [result["error"] for result in results if result["error"]]
+        if erros:
+            logger.error(f"Erro ao fazer download das imagens: {erros[0]}")
+            raise RuntimeError(f"Erro ao fazer download das imagens: {erros[0]}")
+
+        return paths
+
+    def download_clipped(self, assets: Dict[str, Any], bbox: List[float]) -> Dict[str, str]:
+        """
+        Recorta a bbox de cada asset direto do COG remoto (clip-on-read), em paralelo.
+
+        Args:
+            assets (Dict[str, Any]): Nome do arquivo a ser salvo -> asset do catálogo STAC
+            bbox (List[float]): [minx, miny, maxx, maxy] em EPSG:4326
+
+        Returns:
+            Dict[str, str]: Nome do arquivo -> caminho do recorte gravado
+        """
+        reader = CogWindowReader()
+
+        def recortar(filename, asset):
+            filepath = os.path.join(self.output_dir, filename)
+            logger.info(f"Recortando asset remoto para: {filepath}")
+            with Tracer.get().span("read_window", asset=filename):
+                return reader.read_window(asset.href, bbox, filepath)
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(assets), self.pool_size)) as executor:
+                futures = {filename: executor.submit(recortar, filename, asset) for filename, asset in assets.items()}
+                return {filename: future.result() for filename, future in futures.items()}
+
+        except Exception as e:
+            logger.error(f"Erro ao recortar as imagens: {str(e)}")
+            raise RuntimeError(f"Erro ao recortar as imagens: {e}")
+
+    def _baixar_arquivo(self, href: str, filepath: str, request_options: dict,
+                        on_total: Callable[[int], None], on_bytes: Callable[[int], None]) -> str:
+        """
+        Entrega o arquivo a partir do cache local de assets ou, se não houver, baixa da rede.
+        """
+        with Tracer.get().span("download", asset=os.path.basename(filepath)) as span:
+            self._obter_arquivo(href, filepath, request_options, on_total, on_bytes)
+            span["bytes"] = os.path.getsize(filepath)
+        return filepath
+
+    def _obter_arquivo(self, href: str, filepath: str, request_options: dict,
+                       on_total: Callable[[int], None], on_bytes: Callable[[int], None]) -> str:
+        # Um único HEAD serve ao cache (validador) e ao download segmentado (tamanho e Range)
+        headers = self._head(href, request_options) if self.asset_cache or self.segmented else None
+
+        validator = AssetCache.validator_from_headers(headers) if self.asset_cache and headers else None
+        if validator is None:
+            if self.asset_cache is not None:
+                # Sem ETag/Last-Modified não há como saber se o arquivo remoto mudou
+                logger.info(f"Asset sem ETag/Last-Modified, baixando sem o cache local: {filepath}")
+            return self._baixar_medido(href, filepath, request_options, on_total, on_bytes, headers)
+
+        key = AssetCache.make_key(href, validator)
+        with self.asset_cache.pinned(key):
+            size = self.asset_cache.fetch(key, filepath)
+            if size is not None:
+                logger.info(f"Asset encontrado no cache local: {filepath}")
+                MetricsRegistry.get().inc("bdc_asset_cache_hits_total")
+                on_total(size)
+                on_bytes(size)
+                return filepath
+
+            self._baixar_medido(href, filepath, request_options, on_total, on_bytes, headers)
+            self.asset_cache.store(key, filepath)
+
+        return filepath
+
+    def _head(self, href: str, request_options: dict) -> Optional[Dict[str, str]]:
+        """Cabeçalhos do HEAD do asset, ou None se o servidor não responder ao HEAD com sucesso."""
+        response = self.session.head(href, allow_redirects=True, **request_options)
+        if not response.ok:
+            logger.info(f"HEAD de {href} retornou {response.status_code}; seguindo sem cache e sem segmentos.")
+            return None
+        return response.headers
+
+    def _baixar_medido(self, href: str, filepath: str, request_options: dict,
+                       on_total: Callable[[int], None], on_bytes: Callable[[int], None],
+                       headers: Optional[Dict[str, str]] = None) -> str:
+        """Baixa da rede registrando bytes, tempo até o primeiro byte e vazão do asset."""
+        # Com ou sem validador: filepath pode ser um hard link de uma entrada do cache de uma execução anterior
+        AssetCache.detach(filepath)
+        lock = threading.Lock()
+        start = time.perf_counter()
+        medida = {"bytes": 0, "ttfb": None}
+
+        def contar(n):
+            with lock:
+                if medida["ttfb"] is None:
+                    medida["ttfb"] = time.perf_counter() - start
+                medida["bytes"] += n
+            on_bytes(n)
+
+        # Bytes retomados de um download anterior vão só para o progresso, não para as métricas
+        self._baixar_rede(href, filepath, request_options, on_total, contar, headers, on_resumed=on_bytes)
+        MetricsRegistry.get().observe_transfer(medida["bytes"], medida["ttfb"], time.perf_counter() - start,
+                                               asset=os.path.basename(filepath))
+        return filepath
+
+    def _baixar_rede(self, href: str, filepath: str, request_options: dict,
+                     on_total: Callable[[int], None], on_bytes: Callable[[int], None],
+                     headers: Optional[Dict[str, str]] = None,
+                     on_resumed: Optional[Callable[[int], None]] = None) -> str:
+        """
+        Baixa um arquivo por segmentos quando possível, senão em um fluxo único.
+
+        Em ambos os casos o tamanho final é conferido com o Content-Length.
+
+        Args:
+            headers (Optional[Dict[str, str]]): Cabeçalhos do HEAD já feito por _obter_arquivo
+            on_resumed (Optional[Callable[[int], None]]): Recebe os bytes já gravados de um download
+                segmentado retomado (on_bytes recebe só os transferidos)
+        """
+        if self.segmented is not None:
+            remote = SegmentedDownloader.remote_from_headers(headers) if headers else None
+            if remote:
+                on_total(remote["size"])
+                return self.segmented.download(href, filepath, remote, on_bytes, request_options, on_resumed)
+            logger.info(f"Servidor não aceita requisições por intervalo, baixando {filepath} em fluxo único.")
+
+        response = self.session.get(href, stream=True, **request_options)
+        response.raise_for_status()
+        total_bytes = int(response.headers.get('content-length', 0))
+        on_total(total_bytes)
+
+        written = 0
+        with open(filepath, 'wb') as fout:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                fout.write(chunk)
+                written += len(chunk)
+                on_bytes(len(chunk))
+
+        if total_bytes and written != total_bytes:
+            raise RuntimeError(f"Download incompleto de {filepath}: {written} de {total_bytes} bytes.")
+
+        return filepath
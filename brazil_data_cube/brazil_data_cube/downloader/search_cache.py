@@ -0,0 +1,99 @@
+# brazil_data_cube/downloader/search_cache.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+import pystac
+from typing import Any, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+class SearchCache:
+    """
+    Cache em disco dos resultados de busca STAC.
+
+    Cada busca é identificada pelos seus parâmetros (coleção, bbox, intervalo
+    de datas, filtro CQL2...) e guardada como uma ItemCollection serializada.
+    Entradas mais antigas que o TTL são ignoradas e sobrescritas.
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: float = 6 * 3600, refresh: bool = False):
+        """
+        Args:
+            cache_dir (str): Diretório onde as buscas são gravadas
+            ttl_seconds (float): Validade de uma entrada em segundos
+            refresh (bool): Ignora as entradas existentes (mas grava as novas buscas)
+        """
+        self.cache_dir = str(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.refresh = refresh
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        """Gera a chave da busca a partir dos seus parâmetros (ordem das chaves não importa)."""
+        canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[pystac.Item]]:
+        """
+        Retorna os itens de uma busca em cache.
+
+        Returns:
+            Optional[List[pystac.Item]]: Itens salvos, ou None se não houver entrada válida
+        """
+        if self.refresh:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entrada de cache ilegível ({path}), descartando: {e}")
+            self.invalidate(key)
+            return None
+
+        age = time.time() - entry.get("stored_at", 0)
+        if age > self.ttl_seconds:
+            logger.info(f"Entrada de cache expirada ({age / 3600:.1f} h): {key}")
+            return None
+
+        return list(pystac.ItemCollection.from_dict(entry["items"]).items)
+
+    def put(self, key: str, items: List[pystac.Item], params: Optional[Dict[str, Any]] = None) -> None:
+        """Grava (de forma atômica) os itens de uma busca."""
+        entry = {
+            "stored_at": time.time(),
+            "params": params,
+            "items": pystac.ItemCollection(items).to_dict(transform_hrefs=False),
+        }
+
+        path = self._path(key)
+        # Processo e thread no nome: workers que gravam a mesma busca não disputam o temporário
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, key: str) -> None:
+        """Remove uma entrada do cache."""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".json"):
+                os.remove(os.path.join(self.cache_dir, filename))
@@ -0,0 +1,185 @@
+# brazil_data_cube/downloader/segmented_downloader.py
+
+import os
+import json
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, Dict, Any, List
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+class SegmentedDownloader:
+    """
+    Baixa um arquivo em N intervalos de bytes (HTTP Range) em paralelo.
+
+    O arquivo é pré-alocado no tamanho final e cada segmento escreve na sua
+    própria faixa. O progresso de cada segmento fica em um manifesto ao lado
+    do arquivo (<arquivo>.parts.json), permitindo retomar um download
+    interrompido (queda de conexão, pod despejado) de onde parou.
+    """
+
+    MANIFEST_SUFFIX = ".parts.json"
+
+    def __init__(self, session: requests.Session, segments: int = 4,
+                 chunk_size: int = 1024 * 256, manifest_interval: int = 1024 * 1024 * 8):
+        self.session = session
+        self.segments = max(1, segments)
+        self.chunk_size = chunk_size
+        self.manifest_interval = manifest_interval
+
+    def supports_ranges(self, href: str, request_options: dict = {}) -> Optional[Dict[str, Any]]:
+        """
+        Consulta o servidor (HEAD) e verifica se o download segmentado é possível.
+
+        Returns:
+            Optional[Dict]: Tamanho e ETag do arquivo, ou None se o servidor não aceitar Range
+        """
+        response = self.session.head(href, allow_redirects=True, **request_options)
+        response.raise_for_status()
+        return self.remote_from_headers(response.headers)
+
+    @staticmethod
+    def remote_from_headers(headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Mesma verificação de supports_ranges a partir de um HEAD já feito.
+
+        Returns:
+            Optional[Dict]: Tamanho e ETag do arquivo, ou None se o servidor não aceitar Range
+        """
+        total_bytes = int(headers.get('content-length', 0))
+        if total_bytes <= 0 or headers.get('accept-ranges', '').lower() != 'bytes':
+            return None
+
+        return {"size": total_bytes, "etag": headers.get('etag', '')}
+
+    def download(self, href: str, filepath: str, remote: Dict[str, Any],
+                 on_bytes: Optional[Callable[[int], None]] = None, request_options: dict = {},
+                 on_resumed: Optional[Callable[[int], None]] = None) -> str:
+        """
+        Baixa (ou retoma) o arquivo em segmentos paralelos.
+
+        Args:
+            href (str): URL do arquivo
+            filepath (str): Caminho de destino
+            remote (Dict): Tamanho e ETag retornados por supports_ranges
+            on_bytes (Callable): Chamado com a quantidade de bytes transferidos e escritos agora
+            request_options (dict): Opções adicionais para o request
+            on_resumed (Callable): Chamado uma vez com os bytes já gravados antes (retomada), que
+                não foram transferidos nesta chamada (ex.: para a barra de progresso, não para métricas)
+
+        Returns:
+            str: Caminho do arquivo baixado e verificado
+        """
+        total_bytes = remote["size"]
+        manifest_path = filepath + self.MANIFEST_SUFFIX
+        manifest = self._load_manifest(manifest_path, href, remote, filepath)
+
+        if manifest is None:
+            manifest = self._new_manifest(href, remote)
+            # Pré-aloca o arquivo no tamanho final
+            with open(filepath, 'wb') as f:
+                f.truncate(total_bytes)
+            self._save_manifest(manifest_path, manifest)
+        else:
+            logger.info(f"Retomando download de {filepath} a partir do manifesto.")
+
+        ja_baixado = sum(seg["pos"] - seg["start"] for seg in manifest["segments"])
+        if on_resumed and ja_baixado:
+            on_resumed(ja_baixado)
+
+        lock = threading.Lock()
+        pendentes = [seg for seg in manifest["segments"] if seg["pos"] <= seg["end"]]
+
+        def baixar_segmento(seg):
+            headers = dict(request_options.get("headers", {}))
+            headers["Range"] = f"bytes={seg['pos']}-{seg['end']}"
+            options = {k: v for k, v in request_options.items() if k != "headers"}
+
+            response = self.session.get(href, stream=True, headers=headers, **options)
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RuntimeError(f"Servidor ignorou o Range do segmento {headers['Range']}.")
+
+            nao_salvo = 0
+            try:
+                # Sem buffer: o que o manifesto registra já foi entregue ao sistema operacional
+                with open(filepath, 'r+b', buffering=0) as f:
+                    f.seek(seg["pos"])
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        chunk = chunk[:seg["end"] + 1 - seg["pos"]]
+                        f.write(chunk)
+                        with lock:
+                            seg["pos"] += len(chunk)
+                            nao_salvo += len(chunk)
+                            if nao_salvo >= self.manifest_interval:
+                                self._save_manifest(manifest_path, manifest)
+                                nao_salvo = 0
+                        if on_bytes:
+                            on_bytes(len(chunk))
+                        if seg["pos"] > seg["end"]:
+                            break
+            finally:
+                with lock:
+                    self._save_manifest(manifest_path, manifest)
+
+        if pendentes:
+            with ThreadPoolExecutor(max_workers=len(pendentes)) as executor:
+                for future in [executor.submit(baixar_segmento, seg) for seg in pendentes]:
+                    future.result()
+
+        self._verify(filepath, manifest)
+        os.remove(manifest_path)
+        return filepath
+
+    def _verify(self, filepath: str, manifest: Dict[str, Any]) -> None:
+        """Garante que todos os segmentos foram concluídos e que o tamanho bate com o Content-Length."""
+        incompletos = [seg for seg in manifest["segments"] if seg["pos"] <= seg["end"]]
+        if incompletos:
+            raise RuntimeError(f"{len(incompletos)} segmento(s) incompleto(s) em {filepath}.")
+
+        tamanho = os.path.getsize(filepath)
+        if tamanho != manifest["size"]:
+            raise RuntimeError(f"Tamanho de {filepath} ({tamanho}) difere do Content-Length ({manifest['size']}).")
+
+    def _new_manifest(self, href: str, remote: Dict[str, Any]) -> Dict[str, Any]:
+        total_bytes = remote["size"]
+        segments = min(self.segments, max(1, total_bytes // self.chunk_size))
+        step = -(-total_bytes // segments)
+
+        ranges: List[Dict[str, int]] = []
+        for start in range(0, total_bytes, step):
+            end = min(start + step, total_bytes) - 1
+            ranges.append({"start": start, "end": end, "pos": start})
+
+        return {"href": href, "size": total_bytes, "etag": remote["etag"], "segments": ranges}
+
+    def _load_manifest(self, manifest_path: str, href: str, remote: Dict[str, Any],
+                       filepath: str) -> Optional[Dict[str, Any]]:
+        """Carrega o manifesto se ele ainda corresponder ao mesmo arquivo remoto."""
+        if not (os.path.isfile(manifest_path) and os.path.isfile(filepath)):
+            return None
+
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifesto {manifest_path} ilegível, reiniciando download: {e}")
+            return None
+
+        if (manifest.get("href") != href or manifest.get("size") != remote["size"]
+                or manifest.get("etag") != remote["etag"] or os.path.getsize(filepath) != remote["size"]):
+            logger.info(f"Manifesto {manifest_path} não corresponde ao arquivo remoto, reiniciando download.")
+            return None
+
+        return manifest
+
+    def _save_manifest(self, manifest_path: str, manifest: Dict[str, Any]) -> None:
+        """Grava o manifesto de forma atômica."""
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
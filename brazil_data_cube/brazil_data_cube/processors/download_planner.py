@@ -0,0 +1,105 @@
+# brazil_data_cube/processors/download_planner.py
+
+import os
+import hashlib
+import logging
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import Future
+from typing import Any, Dict
+
+
+logger = logging.getLogger(__name__)
+
+class DownloadPlanner:
+    """
+    Deduplicação dos downloads de uma execução inteira.
+
+    Cada href distinto é baixado uma única vez, com um nome derivado do próprio
+    href: o primeiro tile que pede o asset o baixa e os demais esperam pelo
+    mesmo Future. Assim os tiles continuam processados em paralelo (busca,
+    download e merge de tiles diferentes se sobrepõem) e, no cubo S2-16D-2,
+    por exemplo, tiles Sentinel que caem no mesmo item do cubo compartilham
+    as bandas.
+
+    Cada pedido conta uma referência ao href; quando o último tile que o pediu
+    o libera (release), o arquivo é apagado e o href pode ser baixado de novo
+    (ou vir do cache de assets) se outro tile ainda o pedir.
+    """
+
+    def __init__(self, downloader: Any):
+        """
+        Args:
+            downloader (ImagemDownloader): Downloader usado para cada asset distinto
+        """
+        self.downloader = downloader
+        self.futures: Dict[str, Future] = {}
+        # href -> pedidos ainda não liberados
+        self.refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def filename_for(href: str) -> str:
+        """Nome local único do asset: hash do href + nome original do arquivo."""
+        digest = hashlib.sha1(href.encode("utf-8")).hexdigest()[:16]
+        basename = os.path.basename(urlparse(href).path) or "asset"
+        return f"{digest}_{basename}"
+
+    def download_many(self, assets: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Mesma interface de ImagemDownloader.download_many, sem baixar de novo assets já pedidos.
+
+        Os assets que ninguém pediu ainda são baixados juntos por quem chamou;
+        os demais são esperados. Uma falha é repassada a todos que pediram o asset.
+
+        Args:
+            assets (Dict[str, Any]): Nome da banda para quem chamou -> asset do catálogo STAC
+
+        Returns:
+            Dict[str, str]: Nome da banda -> caminho local do asset
+        """
+        futures = {}
+        novos = {}
+        with self._lock:
+            for name, asset in assets.items():
+                self.refs[asset.href] = self.refs.get(asset.href, 0) + 1
+                future = self.futures.get(asset.href)
+                if future is None:
+                    future = self.futures[asset.href] = Future()
+                    novos[self.filename_for(asset.href)] = (asset, future)
+                futures[name] = future
+
+        if novos:
+            # Quem cria o Future sempre o resolve antes de esperar pelos dos outros: não há espera circular
+            try:
+                paths = self.downloader.download_many({filename: asset for filename, (asset, _) in novos.items()})
+                for filename, (_, future) in novos.items():
+                    future.set_result(paths[filename])
+            except Exception as e:
+                for _, future in novos.values():
+                    future.set_exception(e)
+
+        compartilhados = len(assets) - len(novos)
+        if compartilhados:
+            logger.info(f"{compartilhados} de {len(assets)} assets já pedidos por outro tile; reaproveitando.")
+
+        return {name: future.result() for name, future in futures.items()}
+
+    def release(self, assets: Dict[str, Any]) -> None:
+        """
+        Libera os assets de um download_many já terminado (com sucesso ou não).
+
+        O arquivo de um href só é apagado quando todos os que o pediram o liberaram.
+
+        Args:
+            assets (Dict[str, Any]): Os mesmos assets passados a download_many
+        """
+        with self._lock:
+            for asset in assets.values():
+                self.refs[asset.href] -= 1
+                if self.refs[asset.href] > 0:
+                    continue
+                del self.refs[asset.href]
+                del self.futures[asset.href]
+                # Ainda sob o lock: um novo pedido do mesmo href só baixa depois de o arquivo antigo ser apagado
+                self.downloader.release({self.filename_for(asset.href): asset})
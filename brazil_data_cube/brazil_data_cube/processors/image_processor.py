@@ -2,22 +2,57 @@
 
 import numpy as np
 import rasterio
+from rasterio.enums import Resampling
+from rasterio.windows import Window
 from rasterio.plot import reshape_as_image
+from affine import Affine
 import logging
 import math
-from typing import Optional
+from typing import Optional, Tuple, Dict, Any
+from ..downloader.cog_window_reader import GDAL_REMOTE_OPTIONS
+from .statistics import HistogramPercentileEstimator
+from .normalization import BandNormalizer
+from ..utils.metrics import MetricsRegistry
+from ..utils.tracing import Tracer
+from ..utils.output_profiles import OutputProfile
 
 
 logger = logging.getLogger(__name__)
 
 class ImageProcessor:
-    def __init__(self, satelite: str):
+    # Lado dos blocos lidos/gravados; limita a memória a alguns MB por banda
+    BLOCK_SIZE = 512
+
+    def __init__(self, satelite: str, target_resolution: Optional[float] = None,
+                 percentile_error: float = 1.0, output_profile: Optional[OutputProfile] = None):
+        """
+        Args:
+            satelite (str): Nome do satélite
+            target_resolution (Optional[float]): Resolução de saída em unidades do CRS (ex: 60 m).
+                Quando maior que a nativa, as bandas são lidas das overviews internas do COG
+            percentile_error (float): Erro máximo dos percentis 2/98 de bandas inteiras de até 16 bits,
+                na unidade dos pixels (as demais usam percentis exatos)
+            output_profile (Optional[OutputProfile]): Formato do RGB gravado (padrão: GeoTIFF simples)
+        """
         self.satelite = satelite
+        self.target_resolution = target_resolution
+        self.percentile_error = percentile_error
+        self.output_profile = output_profile or OutputProfile()
 
     def merge_rgb_tif(self, r: str, g: str, b: str, output_path: str) -> str:
         """
         Mescla bandas R, G e B em um único GeoTIFF RGB.
-        
+
+        As bandas podem ser arquivos locais ou URLs de COGs remotos; com
+        target_resolution, só o nível de overview necessário é lido.
+
+        O processamento é feito em duas passadas por blocos: a primeira calcula
+        os limites de normalização de cada banda (histograma incremental) e a
+        segunda converte cada bloco para uint8 no domínio inteiro (tabela de
+        consulta, ver BandNormalizer) e o grava. Para bandas de até 16 bits o
+        pico de memória independe do tamanho da cena; bandas float ou inteiras
+        mais largas guardam os pixels válidos para os percentis exatos.
+
         Args:
             r (str): Caminho da banda vermelha
             g (str): Caminho da banda verde
@@ -29,58 +64,140 @@ class ImageProcessor:
         """
         logger.info(f"Mesclando bandas RGB para: {output_path}")
 
-        with rasterio.open(r) as red, \
+        with Tracer.get().span("merge_rgb_tif", output=output_path), \
+             MetricsRegistry.get().timer("bdc_merge_seconds"), \
+             rasterio.Env(**GDAL_REMOTE_OPTIONS), \
+             rasterio.open(r) as red, \
              rasterio.open(g) as green, \
              rasterio.open(b) as blue:
 
-            # Lê bandas e converte zeros em NaN
-            r_band = red.read(1).astype(float)
-            g_band = green.read(1).astype(float)
-            b_band = blue.read(1).astype(float)
-
-            r_band[r_band == 0] = np.nan
-            g_band[g_band == 0] = np.nan
-            b_band[b_band == 0] = np.nan
-
-            # Funções de normalização
-            def normalize_soft(array):
-                array_min, array_max = np.nanmin(array), np.nanmax(array)
-                if array_max - array_min == 0:
-                    return np.zeros_like(array, dtype=np.uint8)
-                scaled = (array - array_min) / (array_max - array_min) * 255
-                return np.nan_to_num(scaled, nan=0).astype(np.uint8)
-
-            def normalize_percentile(array):
-                p2, p98 = np.nanpercentile(array, (2, 98))
-                array = np.clip(array, p2, p98)
-                if np.nanmax(array) - np.nanmin(array) == 0:
-                    return np.zeros_like(array, dtype=np.uint8)
-                scaled = (array - np.nanmin(array)) / (np.nanmax(array) - np.nanmin(array)) * 255
-                return np.nan_to_num(scaled, nan=0).astype(np.uint8)
-
-            norm_func = normalize_soft if self.satelite == 'S2-16D-2' else normalize_percentile
-
-            r_norm = norm_func(r_band)
-            g_norm = norm_func(g_band)
-            b_norm = norm_func(b_band)
-
-            # Máscara de valores NaN
-            nan_mask = np.isnan(r_band) | np.isnan(g_band) | np.isnan(b_band)
-            r_norm[nan_mask] = 0
-            g_norm[nan_mask] = 0
-            b_norm[nan_mask] = 0
-
-            # Empilha como RGB
-            rgb = np.stack([r_norm, g_norm, b_norm], axis=0)
-
-            # Atualiza o profile para uint8
+            bands = [red, green, blue]
+            width, height, transform = self._output_grid(red)
+            windows = list(self._block_windows(width, height))
+
+            # Passo 1: estatísticas de normalização de cada banda, lidas bloco a bloco
+            params = [self._band_statistics(src, windows, width, height) for src in bands]
+
+            # Atualiza o profile para uint8, organizado em blocos internos
             profile = red.profile
-            profile.update(count=3, dtype=rasterio.uint8, driver="GTiff")
+            profile.update(count=3, dtype=rasterio.uint8, driver="GTiff",
+                           width=width, height=height, transform=transform,
+                           tiled=True, blockxsize=self.BLOCK_SIZE, blockysize=self.BLOCK_SIZE)
+
+            # Passo 2: normaliza e grava cada bloco, sem carregar a cena inteira
+            normalizers = [BandNormalizer(param["lo"], param["hi"], param["clip"], src.dtypes[0])
+                           for src, param in zip(bands, params)]
+            nodata_buffer = np.empty((self.BLOCK_SIZE, self.BLOCK_SIZE), dtype=bool)
+            out_buffer = np.empty((self.BLOCK_SIZE, self.BLOCK_SIZE), dtype=np.uint8)
+
+            with self.output_profile.open(output_path, **profile) as dst:
+                for window in windows:
+                    shape = (int(window.height), int(window.width))
+                    blocks = [self._read_block(src, window, width, height) for src in bands]
+
+                    # Pixel nodata (0 ou NaN) em qualquer banda é zerado nas três
+                    nodata = nodata_buffer[:shape[0], :shape[1]]
+                    nodata.fill(False)
+                    for block in blocks:
+                        np.logical_or(nodata, block == 0, out=nodata)
+                        if block.dtype.kind == 'f':
+                            np.logical_or(nodata, np.isnan(block), out=nodata)
+
+                    out = out_buffer[:shape[0], :shape[1]]
+                    for index, (block, normalizer) in enumerate(zip(blocks, normalizers), start=1):
+                        normalizer.normalize(block, out=out)
+                        np.copyto(out, 0, where=nodata)
+                        dst.write(out, index, window=window)
+
+            logger.info(f"Imagem RGB salva em: {output_path}")
+
+    def _block_windows(self, width: int, height: int):
+        """Percorre a grade de saída em janelas de BLOCK_SIZE x BLOCK_SIZE."""
+        for row_off in range(0, height, self.BLOCK_SIZE):
+            for col_off in range(0, width, self.BLOCK_SIZE):
+                yield Window(col_off, row_off,
+                             min(self.BLOCK_SIZE, width - col_off),
+                             min(self.BLOCK_SIZE, height - row_off))
+
+    def _band_statistics(self, src, windows, width: int, height: int) -> Dict[str, Any]:
+        """
+        Calcula os limites de normalização de uma banda em uma passada por blocos.
+
+        Bandas inteiras de até 16 bits usam um histograma acumulado bloco a bloco,
+        com erro máximo de percentile_error nos percentis 2/98 (exatos com o
+        padrão 1.0). Bandas float ou inteiras mais largas não têm um domínio que
+        caiba em um histograma com esse erro e usam os percentis exatos.
+
+        Returns:
+            Dict[str, Any]: lo/hi da escala (None se a banda não tiver pixels válidos) e se há recorte
+        """
+        dtype = np.dtype(src.dtypes[0])
+        if dtype.kind not in 'ui' or dtype.itemsize > 2:
+            return self._exact_statistics(src, windows, width, height)
+
+        info = np.iinfo(dtype)
+        estimator = HistogramPercentileEstimator((info.min, info.max), self.percentile_error)
+        for window in windows:
+            block = self._read_block(src, window, width, height)
+            estimator.update(block[block != 0])
 
-            # Salva o arquivo
-            with rasterio.open(output_path, 'w', **profile) as dst:
-                dst.write(rgb[0], 1)
-                dst.write(rgb[1], 2)
-                dst.write(rgb[2], 3)
+        if estimator.count == 0:
+            return {"lo": None, "hi": None, "clip": False}
 
-            logger.info(f"Imagem RGB salva em: {output_path}")
\ No newline at end of file
+        if self.satelite == 'S2-16D-2':
+            return {"lo": estimator.min, "hi": estimator.max, "clip": False}
+
+        p2, p98 = estimator.percentiles((2, 98))
+        return {"lo": float(p2), "hi": float(p98), "clip": True}
+
+    def _exact_statistics(self, src, windows, width: int, height: int) -> Dict[str, Any]:
+        """Limites de normalização com np.percentile sobre os pixels válidos (diferentes de 0 e NaN)."""
+        valid = []
+        for window in windows:
+            block = self._read_block(src, window, width, height)
+            valid.append(block[(block != 0) & ~np.isnan(block)])
+        values = np.concatenate(valid).astype(np.float64)
+
+        if values.size == 0:
+            return {"lo": None, "hi": None, "clip": False}
+
+        if self.satelite == 'S2-16D-2':
+            return {"lo": float(values.min()), "hi": float(values.max()), "clip": False}
+
+        p2, p98 = np.percentile(values, (2, 98))
+        return {"lo": float(p2), "hi": float(p98), "clip": True}
+
+    def _output_grid(self, src) -> Tuple[int, int, Affine]:
+        """
+        Calcula largura, altura e transform da saída para a resolução desejada.
+
+        Sem target_resolution (ou se ela for mais fina que a nativa) mantém a grade original.
+        """
+        native_resolution = src.res[0]
+        if not self.target_resolution or self.target_resolution <= native_resolution:
+            return src.width, src.height, src.transform
+
+        factor = self.target_resolution / native_resolution
+        width = max(1, round(src.width / factor))
+        height = max(1, round(src.height / factor))
+        transform = src.transform * Affine.scale(src.width / width, src.height / height)
+
+        logger.info(f"Lendo {src.width}x{src.height} como {width}x{height} ({self.target_resolution} de resolução).")
+        return width, height, transform
+
+    def _read_block(self, src, window: Window, width: int, height: int) -> np.ndarray:
+        """
+        Lê a banda 1 de uma janela da grade de saída.
+
+        Se a grade de saída for mais grossa que a do raster, a janela é mapeada para
+        os pixels de origem e lida com out_shape reduzido: o GDAL usa a overview mais
+        próxima (ou uma leitura decimada se não houver overviews). Nearest preserva o nodata 0.
+        """
+        if (width, height) == (src.width, src.height):
+            return src.read(1, window=window)
+
+        scale_x, scale_y = src.width / width, src.height / height
+        src_window = Window(window.col_off * scale_x, window.row_off * scale_y,
+                            window.width * scale_x, window.height * scale_y)
+        return src.read(1, window=src_window, out_shape=(int(window.height), int(window.width)),
+                        resampling=Resampling.nearest)
@@ -2,17 +2,50 @@
 
 import rasterio
 from rasterio.merge import merge
-import subprocess
 import os
-import time
 import logging
 from typing import List, Optional
+from ..utils.metrics import MetricsRegistry
+from ..utils.tracing import Tracer
+from ..utils.output_profiles import OutputProfile
+from .mosaic_grid import MosaicGrid
+from .vrt_builder import VrtBuilder
+from .reprojector import TileReprojector
+from .parallel_mosaic import ParallelMosaicBuilder
 
 logger = logging.getLogger(__name__)
 
 class MosaicGenerator:
-    def __init__(self, common_crs: str = "EPSG:32721"):
+    def __init__(self, common_crs: str = "EPSG:32721", streaming: bool = False, block_size: int = 1024,
+                 virtual: bool = False, reproject_workers: Optional[int] = None,
+                 output_profile: Optional[OutputProfile] = None, mosaic_workers: int = 1):
+        """
+        Args:
+            common_crs (str): CRS comum do mosaico
+            streaming (bool): Escreve o mosaico bloco a bloco em um GeoTIFF tiled, em vez de montá-lo
+                inteiro em memória com rasterio.merge (a memória não cresce com o número de tiles)
+            block_size (int): Lado dos blocos processados no modo streaming (múltiplo de 16)
+            virtual (bool): Grava só um VRT que referencia os tiles (o .tif do caminho de saída vira .vrt);
+                o arquivo físico pode ser gerado depois com materialize_mosaic.py. Tiles em resoluções
+                diferentes não podem ser representados no VRT e geram o mosaico físico
+            reproject_workers (Optional[int]): Processos usados para reprojetar tiles em outro CRS
+                (padrão: número de CPUs)
+            output_profile (Optional[OutputProfile]): Formato do mosaico gravado (padrão: GeoTIFF simples)
+            mosaic_workers (int): No modo streaming, com mais de 1 o mosaico é dividido em chunks montados
+                em paralelo por esse número de processos (ParallelMosaicBuilder). Sem streaming é ignorado
+
+        A forma de gravação segue a ordem: virtual, streaming (paralelo se mosaic_workers > 1) e,
+        por último, o merge em memória.
+        """
+        if block_size <= 0 or block_size % 16:
+            raise ValueError(f"block_size deve ser um múltiplo positivo de 16, recebido {block_size}.")
         self.common_crs = common_crs
+        self.streaming = streaming
+        self.block_size = block_size
+        self.virtual = virtual
+        self.reprojector = TileReprojector(common_crs, reproject_workers)
+        self.output_profile = output_profile or OutputProfile()
+        self.mosaic_workers = max(1, mosaic_workers)
 
     def mosaic_tiles(self, tile_files: List[str], output_path: str) -> Optional[str]:
         """
@@ -26,9 +59,14 @@ class MosaicGenerator:
         Returns:
             Optional[str]: Caminho do mosaico criado ou None se falhar
         """
-        src_files = []
+        with Tracer.get().span("mosaic_tiles", tiles=len(tile_files), output=output_path), \
+             MetricsRegistry.get().timer("bdc_mosaic_seconds"):
+            return self._mosaic_tiles(tile_files, output_path)
+
+    def _mosaic_tiles(self, tile_files: List[str], output_path: str) -> Optional[str]:
         band_count = None
         valid_files = []
+        to_reproject = []
 
         for fp in tile_files:
             try:
@@ -44,36 +82,50 @@ class MosaicGenerator:
 
                     if src.crs != self.common_crs:
                         logger.warning(f"Arquivo {fp} tem CRS diferente ({src.crs}). Reprojetando...")
-                        reprojected_fp = fp.replace(".tif", "_reprojected.tif")
-                        cmd = [
-                            "gdalwarp",
-                            "-t_srs", self.common_crs,
-                            "-dstnodata", "-32768",
-                            "-overwrite",
-                            fp,
-                            reprojected_fp
-                        ]
-                        result = subprocess.run(cmd, capture_output=True, text=True)
-                        if result.returncode != 0:
-                            logger.error(f"Erro ao reprojetar {fp}: {result.stderr}")
-                            continue
-                        time.sleep(20)  # Tempo para garantir que o arquivo esteja pronto
-                        valid_files.append(reprojected_fp)
-                        src_files.append(rasterio.open(reprojected_fp))
-                        continue
+                        to_reproject.append(fp)
 
                     valid_files.append(fp)
-                    src_files.append(rasterio.open(fp))
 
             except rasterio.errors.RasterioIOError as e:
                 logger.error(f"Erro ao abrir {fp}: {e}")
                 os.remove(fp)
                 logger.info(f"Arquivo corrompido {fp} foi removido.")
 
+        # Os tiles em outro CRS são reprojetados juntos, em paralelo, mantendo a ordem original
+        with Tracer.get().span("reproject", files=len(to_reproject)):
+            reprojected = self.reprojector.reproject_many(to_reproject)
+        valid_files = [reprojected.get(fp, fp) for fp in valid_files if reprojected.get(fp, fp)]
+        src_files = [rasterio.open(fp) for fp in valid_files]
+
         if not src_files:
             logger.error("Nenhum arquivo válido para mosaico.")
             return None
 
+        virtual = self.virtual
+        if virtual and not VrtBuilder.supports(src_files):
+            logger.warning("Tiles com resoluções ou nodata diferentes: gravando o mosaico físico em vez do VRT.")
+            virtual = False
+        if virtual:
+            output_path = os.path.splitext(output_path)[0] + ".vrt"
+
+        try:
+            if virtual:
+                VrtBuilder(self.common_crs).build(src_files, output_path)
+            elif self.streaming and self.mosaic_workers > 1:
+                self._write_parallel(src_files, output_path)
+            elif self.streaming:
+                self._write_streaming(src_files, output_path)
+            else:
+                self._write_in_memory(src_files, output_path)
+        finally:
+            for src in src_files:
+                src.close()
+
+        logger.info(f"Mosaico salvo em: {output_path}")
+        return output_path
+
+    def _write_in_memory(self, src_files: List[rasterio.DatasetReader], output_path: str) -> None:
+        """Monta o mosaico inteiro em memória com rasterio.merge e grava de uma vez."""
         # Faz o merge dos tiles
         mosaic, out_trans = merge(src_files)
 
@@ -90,11 +142,45 @@ class MosaicGenerator:
         })
 
         # Salva o mosaico final
-        with rasterio.open(output_path, "w", **out_meta) as dest:
+        with self.output_profile.open(output_path, **out_meta) as dest:
             dest.write(mosaic)
 
-        for src in src_files:
-            src.close()
+    def _write_parallel(self, src_files: List[rasterio.DatasetReader], output_path: str) -> None:
+        """Grava o mosaico em chunks montados em paralelo por mosaic_workers processos."""
+        out_meta = src_files[0].meta.copy()
+        out_meta["crs"] = self.common_crs
+        ParallelMosaicBuilder(self.mosaic_workers).build(src_files, output_path, out_meta, self.output_profile)
 
-        logger.info(f"Mosaico salvo em: {output_path}")
-        return output_path
\ No newline at end of file
+    def _write_streaming(self, src_files: List[rasterio.DatasetReader], output_path: str) -> None:
+        """
+        Grava o mosaico bloco a bloco, com o mesmo resultado do rasterio.merge (método 'first').
+
+        A grade de saída é calculada antes a partir dos limites das fontes; para
+        cada bloco só são lidas as janelas das fontes que o interceptam. A memória
+        usada é a de um bloco, qualquer que seja o número de tiles.
+        """
+        grid = MosaicGrid.from_sources(src_files)
+        first = src_files[0]
+        count, dtype = first.count, first.dtypes[0]
+        nodata = first.nodata if first.nodata is not None else 0
+
+        out_meta = first.meta.copy()
+        out_meta.update({
+            "driver": "GTiff",
+            "height": grid.height,
+            "width": grid.width,
+            "transform": grid.transform,
+            "count": count,
+            "dtype": dtype,
+            "crs": self.common_crs,
+            "tiled": True,
+            "blockxsize": self.block_size,
+            "blockysize": self.block_size,
+            "BIGTIFF": "IF_SAFER",
+        })
+
+        logger.info(f"Gravando mosaico {grid.width}x{grid.height} em blocos de {self.block_size} px...")
+        with self.output_profile.open(output_path, **out_meta) as dest:
+            for block in grid.blocks(self.block_size):
+                data = grid.read_block(src_files, block, count, dtype, nodata)
+                dest.write(data, window=block)
@@ -0,0 +1,189 @@
+# brazil_data_cube/processors/mosaic_grid.py
+
+import math
+import logging
+import numpy as np
+from typing import Any, Iterator, List, Optional, Tuple
+from affine import Affine
+from rasterio import windows
+from rasterio.merge import copy_first
+from rasterio.windows import Window
+
+
+logger = logging.getLogger(__name__)
+
+class MosaicGrid:
+    """
+    Grade de saída de um mosaico, calculada só a partir dos metadados das fontes.
+
+    Segue as mesmas regras do rasterio.merge.merge: extensão igual à união dos
+    limites das fontes, resolução da primeira fonte e origem no canto superior
+    esquerdo. Com isso o mosaico pode ser escrito bloco a bloco, lendo de cada
+    fonte apenas a janela que cai no bloco, sem montar o mosaico inteiro em memória.
+    """
+
+    def __init__(self, transform: Affine, width: int, height: int):
+        """
+        Args:
+            transform (Affine): Transformação da grade de saída
+            width (int): Largura em pixels
+            height (int): Altura em pixels
+        """
+        self.transform = transform
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_sources(cls, sources: List[Any], res: Optional[Tuple[float, float]] = None) -> "MosaicGrid":
+        """
+        Calcula a grade que cobre todas as fontes.
+
+        Args:
+            sources (List[DatasetReader]): Rasters abertos, todos no mesmo CRS
+            res (Optional[Tuple[float, float]]): Resolução de saída; por padrão, a da primeira fonte
+
+        Returns:
+            MosaicGrid: Grade do mosaico
+        """
+        if not sources:
+            raise ValueError("Nenhuma fonte informada para calcular a grade do mosaico.")
+
+        for src in sources:
+            if not src.transform.is_rectilinear or src.transform.a < 0 or src.transform.e > 0:
+                raise ValueError(f"Raster {src.name} não está orientado para o norte e não pode ser mosaicado.")
+
+        res = res or sources[0].res
+        west = min(src.bounds.left for src in sources)
+        south = min(src.bounds.bottom for src in sources)
+        east = max(src.bounds.right for src in sources)
+        north = max(src.bounds.top for src in sources)
+
+        width = int(round((east - west) / res[0]))
+        height = int(round((north - south) / res[1]))
+        transform = Affine.translation(west, north) * Affine.scale(res[0], -res[1])
+        return cls(transform, width, height)
+
+    @property
+    def window(self) -> Window:
+        """Janela da grade inteira."""
+        return Window(0, 0, self.width, self.height)
+
+    def blocks(self, block_size: int) -> Iterator[Window]:
+        """Percorre a grade em blocos de block_size x block_size (os da borda podem ser menores)."""
+        for row_off in range(0, self.height, block_size):
+            for col_off in range(0, self.width, block_size):
+                yield Window(col_off, row_off,
+                             min(block_size, self.width - col_off),
+                             min(block_size, self.height - row_off))
+
+    def placement(self, src: Any) -> Optional[Tuple[Window, Window]]:
+        """
+        Posição de src na grade inteira, calculada como no rasterio.merge.
+
+        A janela lida na fonte e a janela (arredondada) em que ela cai na grade
+        são calculadas uma única vez para a grade toda; os blocos recortam essa
+        mesma correspondência. Assim fontes fora do alinhamento da grade (origem
+        que não é múltipla da resolução, ou outra resolução) são reamostradas
+        igual ao merge, qualquer que seja o tamanho dos blocos.
+
+        Returns:
+            Optional[Tuple[Window, Window]]: (janela na fonte, janela na grade),
+            ou None se a fonte não cai na grade
+        """
+        grid_left, grid_bottom, grid_right, grid_top = windows.bounds(self.window, self.transform)
+        left = max(src.bounds.left, grid_left)
+        right = min(src.bounds.right, grid_right)
+        bottom = max(src.bounds.bottom, grid_bottom)
+        top = min(src.bounds.top, grid_top)
+        if left >= right or bottom >= top:
+            return None
+
+        src_window = windows.from_bounds(left, bottom, right, top, src.transform)
+        dst_window = self.align(windows.from_bounds(left, bottom, right, top, self.transform))
+        if dst_window.width <= 0 or dst_window.height <= 0:
+            return None
+        return src_window, dst_window
+
+    def source_window(self, src: Any, block: Window) -> Optional[Tuple[Window, Window]]:
+        """
+        Janela de src que cobre o bloco.
+
+        Args:
+            src (DatasetReader): Fonte aberta
+            block (Window): Bloco da grade de saída
+
+        Returns:
+            Optional[Tuple[Window, Window]]: (janela na fonte, janela dentro do bloco),
+            ou None se a fonte não intercepta o bloco
+        """
+        placement = self.placement(src)
+        if placement is None:
+            return None
+        src_window, dst_window = placement
+
+        # Pixels da grade cobertos ao mesmo tempo pelo bloco e pela fonte
+        col_start = max(block.col_off, dst_window.col_off)
+        col_stop = min(block.col_off + block.width, dst_window.col_off + dst_window.width)
+        row_start = max(block.row_off, dst_window.row_off)
+        row_stop = min(block.row_off + block.height, dst_window.row_off + dst_window.height)
+        if col_start >= col_stop or row_start >= row_stop:
+            return None
+
+        # Recorta a janela da fonte na mesma proporção da leitura do merge
+        scale_x = src_window.width / dst_window.width
+        scale_y = src_window.height / dst_window.height
+        src_block = Window(src_window.col_off + (col_start - dst_window.col_off) * scale_x,
+                           src_window.row_off + (row_start - dst_window.row_off) * scale_y,
+                           (col_stop - col_start) * scale_x,
+                           (row_stop - row_start) * scale_y)
+        dst_block = Window(col_start - block.col_off, row_start - block.row_off,
+                           col_stop - col_start, row_stop - row_start)
+        return src_block, dst_block
+
+    def intersects(self, src: Any, block: Window) -> bool:
+        """Indica se src tem pixels dentro do bloco (só pelos metadados)."""
+        return self.source_window(src, block) is not None
+
+    def read_block(self, sources: List[Any], block: Window, count: int, dtype: str, nodata: float) -> np.ndarray:
+        """
+        Monta um bloco do mosaico com o método 'first' do rasterio.merge.
+
+        Cada fonte preenche apenas os pixels do bloco ainda sem dado, lendo só
+        a janela que intercepta o bloco.
+
+        Args:
+            sources (List[DatasetReader]): Fontes abertas, em ordem de prioridade
+            block (Window): Bloco da grade de saída
+            count (int): Número de bandas
+            dtype (str): Tipo dos pixels
+            nodata (float): Valor sem dado
+
+        Returns:
+            np.ndarray: Bloco (bandas, linhas, colunas)
+        """
+        data = np.full((count, block.height, block.width), nodata, dtype=dtype)
+
+        for src in sources:
+            src_windows = self.source_window(src, block)
+            if src_windows is None:
+                continue
+            src_window, dst_window = src_windows
+            rows, cols = dst_window.toslices()
+            region = data[:, rows, cols]
+            if np.isnan(nodata):
+                region_mask = np.isnan(region)
+            elif not np.issubdtype(region.dtype, np.integer):
+                region_mask = np.isclose(region, nodata)
+            else:
+                region_mask = region == nodata
+            new_data = src.read(out_shape=(count, dst_window.height, dst_window.width),
+                                window=src_window, masked=True)
+            copy_first(region, new_data, region_mask, new_data.mask)
+
+        return data
+
+    @staticmethod
+    def align(window: Window) -> Window:
+        """Arredonda offsets e tamanhos como o rasterio.merge (evita costuras entre blocos)."""
+        return Window(math.floor(window.col_off + 0.1), math.floor(window.row_off + 0.1),
+                      math.floor(window.width + 0.5), math.floor(window.height + 0.5))
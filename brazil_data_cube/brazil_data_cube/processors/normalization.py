@@ -0,0 +1,84 @@
+# brazil_data_cube/processors/normalization.py
+
+import logging
+import numpy as np
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+class BandNormalizer:
+    """
+    Converte blocos de uma banda para uint8 usando os limites globais lo/hi.
+
+    Para bandas inteiras de até 16 bits a escala é pré-calculada em uma tabela
+    (um uint8 para cada valor possível) e cada bloco é convertido com np.take,
+    sem cópias em float. A tabela é gerada com a mesma conta da normalização
+    em float64, então o resultado é idêntico bit a bit. Outros tipos usam a
+    conta em float64 bloco a bloco.
+
+    O valor 0 é nodata e sempre vira 0.
+    """
+
+    def __init__(self, lo: Optional[float], hi: Optional[float], clip: bool, dtype: str):
+        """
+        Args:
+            lo (Optional[float]): Valor mapeado para 0 (None se a banda não tem pixels válidos)
+            hi (Optional[float]): Valor mapeado para 255
+            clip (bool): Se os valores devem ser recortados em [lo, hi] antes da escala
+            dtype (str): Tipo dos pixels da banda
+        """
+        self.lo = lo
+        self.hi = hi
+        self.clip = clip
+        self.dtype = np.dtype(dtype)
+        self.empty = lo is None or hi - lo == 0
+        self.lut = self._build_lut() if self._uses_lut() else None
+
+    def normalize(self, block: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Normaliza um bloco da banda.
+
+        Args:
+            block (np.ndarray): Pixels no tipo nativo da banda
+            out (Optional[np.ndarray]): Array uint8 do mesmo formato para reaproveitar memória
+
+        Returns:
+            np.ndarray: Bloco em uint8
+        """
+        if out is None:
+            out = np.empty(block.shape, dtype=np.uint8)
+
+        if self.empty:
+            out.fill(0)
+        elif self.lut is not None:
+            # Inteiros com sinal são indexados pelo padrão de bits sem sinal
+            indexes = block.view(self.lut_index_dtype) if self.dtype.kind == 'i' else block
+            np.take(self.lut, indexes, out=out)
+        else:
+            out[...] = self._scale(block.astype(np.float64))
+
+        return out
+
+    def _uses_lut(self) -> bool:
+        return self.dtype.kind in 'ui' and self.dtype.itemsize <= 2
+
+    def _build_lut(self) -> np.ndarray:
+        """Aplica a escala a todos os valores possíveis do tipo da banda."""
+        self.lut_index_dtype = np.dtype(f"u{self.dtype.itemsize}")
+        indexes = np.arange(np.iinfo(self.lut_index_dtype).max + 1, dtype=np.int64)
+        values = indexes.astype(self.lut_index_dtype).view(self.dtype).astype(np.float64)
+
+        if self.empty:
+            return np.zeros(indexes.size, dtype=np.uint8)
+        return self._scale(values)
+
+    def _scale(self, values: np.ndarray) -> np.ndarray:
+        """Escala em float64, igual à normalização original (zeros/NaN viram 0)."""
+        values[values == 0] = np.nan
+        if self.clip:
+            values = np.clip(values, self.lo, self.hi)
+        scaled = (values - self.lo) / (self.hi - self.lo) * 255
+        # Valores fora de [lo, hi] não ocorrem na banda; o recorte só evita casts inválidos na tabela
+        np.clip(scaled, 0, 255, out=scaled)
+        return np.nan_to_num(scaled, nan=0).astype(np.uint8)
@@ -0,0 +1,138 @@
+# brazil_data_cube/processors/parallel_mosaic.py
+
+import os
+import logging
+import rasterio
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional, Tuple
+from rasterio.windows import Window
+from .mosaic_grid import MosaicGrid
+from ..utils.output_profiles import OutputProfile
+
+
+logger = logging.getLogger(__name__)
+
+class ParallelMosaicBuilder:
+    """
+    Monta mosaicos grandes dividindo a grade de saída em chunks processados em paralelo.
+
+    A grade é calculada a partir dos metadados das fontes (MosaicGrid) e cada
+    chunk recebe só os tiles que o interceptam. Os chunks são montados em um
+    pool de processos com MosaicGrid.read_block, o mesmo do modo streaming, e
+    devolvidos ao processo principal, que os grava em janelas disjuntas do
+    mesmo arquivo de saída. No máximo duas vezes workers chunks ficam em memória
+    ao mesmo tempo, então a memória não depende do número de tiles nem do
+    tamanho do mosaico.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 2048):
+        """
+        Args:
+            workers (Optional[int]): Processos do pool (padrão: número de CPUs)
+            chunk_size (int): Lado dos chunks da grade de saída, em pixels (múltiplo de 16)
+        """
+        if chunk_size <= 0 or chunk_size % 16:
+            raise ValueError(f"chunk_size deve ser um múltiplo positivo de 16, recebido {chunk_size}.")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+
+    def plan(self, grid: MosaicGrid, sources: List[Any]) -> List[Tuple[Window, List[str]]]:
+        """
+        Divide a grade em chunks e associa a cada um os tiles que o interceptam.
+
+        Args:
+            grid (MosaicGrid): Grade do mosaico
+            sources (List[DatasetReader]): Tiles abertos, em ordem de prioridade
+
+        Returns:
+            List[Tuple[Window, List[str]]]: (chunk, caminhos dos tiles) dos chunks com algum tile
+        """
+        chunks = []
+        for chunk in grid.blocks(self.chunk_size):
+            paths = [src.name for src in sources if grid.intersects(src, chunk)]
+            if paths:
+                chunks.append((chunk, paths))
+        return chunks
+
+    def build(self, sources: List[Any], output_path: str, profile: Dict[str, Any],
+              output_profile: Optional[OutputProfile] = None) -> str:
+        """
+        Grava o mosaico das fontes em output_path.
+
+        Args:
+            sources (List[DatasetReader]): Tiles abertos, no mesmo CRS e em ordem de prioridade
+            output_path (str): Caminho do mosaico
+            profile (Dict[str, Any]): Profile de saída (CRS, dtype, nodata, ...); grade e blocos são
+                definidos aqui
+            output_profile (Optional[OutputProfile]): Formato do arquivo gravado (padrão: GeoTIFF simples)
+
+        Returns:
+            str: Caminho do mosaico gravado
+        """
+        output_profile = output_profile or OutputProfile()
+        grid = MosaicGrid.from_sources(sources)
+        first = sources[0]
+        count, dtype = first.count, first.dtypes[0]
+        nodata = first.nodata if first.nodata is not None else 0
+        chunks = self.plan(grid, sources)
+
+        out_meta = dict(profile)
+        out_meta.update({
+            "driver": "GTiff",
+            "height": grid.height,
+            "width": grid.width,
+            "transform": grid.transform,
+            "count": count,
+            "dtype": dtype,
+            "tiled": True,
+            "blockxsize": min(self.chunk_size, 512),
+            "blockysize": min(self.chunk_size, 512),
+            "BIGTIFF": "IF_SAFER",
+        })
+        out_meta.setdefault("nodata", first.nodata)
+
+        logger.info(f"Montando mosaico {grid.width}x{grid.height} em {len(chunks)} chunks "
+                    f"de {self.chunk_size} px com {self.workers} processos...")
+
+        with output_profile.open(output_path, **out_meta) as dest, \
+             ProcessPoolExecutor(max_workers=self.workers) as executor:
+            if nodata != 0:
+                # Chunks sem nenhum tile não são processados: recebem o nodata aqui
+                self._fill_empty(dest, grid, chunks, count, dtype, nodata)
+
+            pending = set()
+            for chunk, paths in chunks:
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._write(dest, done)
+                pending.add(executor.submit(self.merge_chunk, grid, chunk, paths, count, dtype, nodata))
+            self._write(dest, pending)
+
+        return output_path
+
+    @staticmethod
+    def merge_chunk(grid: MosaicGrid, chunk: Window, paths: List[str], count: int, dtype: str,
+                    nodata: float) -> Tuple[Window, np.ndarray]:
+        """Monta um chunk a partir dos seus tiles (executado nos processos do pool)."""
+        sources = [rasterio.open(path) for path in paths]
+        try:
+            return chunk, grid.read_block(sources, chunk, count, dtype, nodata)
+        finally:
+            for src in sources:
+                src.close()
+
+    @staticmethod
+    def _write(dest: Any, futures: Any) -> None:
+        """Grava os chunks prontos em suas janelas (repassa erros dos processos)."""
+        for future in futures:
+            chunk, data = future.result()
+            dest.write(data, window=chunk)
+
+    def _fill_empty(self, dest: Any, grid: MosaicGrid, chunks: List[Tuple[Window, List[str]]],
+                    count: int, dtype: str, nodata: float) -> None:
+        """Preenche com nodata os chunks que nenhum tile intercepta."""
+        planned = {(chunk.col_off, chunk.row_off) for chunk, _ in chunks}
+        for chunk in grid.blocks(self.chunk_size):
+            if (chunk.col_off, chunk.row_off) not in planned:
+                dest.write(np.full((count, chunk.height, chunk.width), nodata, dtype=dtype), window=chunk)
@@ -0,0 +1,127 @@
+# brazil_data_cube/processors/reprojector.py
+
+import os
+import logging
+import rasterio
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from rasterio.enums import Resampling
+from rasterio.vrt import WarpedVRT
+from rasterio.warp import aligned_target, calculate_default_transform
+from .mosaic_grid import MosaicGrid
+
+
+logger = logging.getLogger(__name__)
+
+class TileReprojector:
+    """
+    Reprojeta tiles para o CRS do mosaico dentro do próprio processo, sem gdalwarp.
+
+    Cada arquivo é reprojetado em um processo de um pool (tiles diferentes em
+    paralelo) e, dentro dele, o warp do GDAL usa warp_threads threads. A grade
+    de saída mantém a resolução da fonte e é alinhada a múltiplos dela no CRS de
+    destino (como o -tap do gdalwarp), a mesma grade dos tiles que já estão no
+    CRS do mosaico. O resultado é lido bloco a bloco de um WarpedVRT, gravado em
+    um arquivo temporário e renomeado só ao final: quando o caminho existe, o
+    arquivo está completo, sem necessidade de esperas.
+    """
+
+    def __init__(self, dst_crs: str, workers: Optional[int] = None, warp_threads: int = 2,
+                 resampling: Resampling = Resampling.nearest, block_size: int = 1024):
+        """
+        Args:
+            dst_crs (str): CRS de destino
+            workers (Optional[int]): Processos do pool (padrão: número de CPUs)
+            warp_threads (int): Threads do warp do GDAL em cada processo
+            resampling (Resampling): Método de reamostragem (nearest preserva o nodata)
+            block_size (int): Lado dos blocos lidos do warp e gravados na saída (múltiplo de 16)
+        """
+        self.dst_crs = dst_crs
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.warp_threads = max(1, warp_threads)
+        self.resampling = resampling
+        self.block_size = block_size
+
+    @staticmethod
+    def output_path_for(path: str) -> str:
+        """Caminho do arquivo reprojetado."""
+        return path.replace(".tif", "_reprojected.tif")
+
+    def reproject_many(self, paths: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Reprojeta os arquivos em paralelo. Falhas são registradas no log e não interrompem os demais.
+
+        Args:
+            paths (List[str]): Arquivos a reprojetar
+
+        Returns:
+            Dict[str, Optional[str]]: Arquivo original -> arquivo reprojetado (None se falhou)
+        """
+        if not paths:
+            return {}
+
+        logger.info(f"Reprojetando {len(paths)} arquivos para {self.dst_crs} com {self.workers} processos...")
+        resultados: Dict[str, Optional[str]] = {}
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(paths))) as executor:
+            futures = {
+                executor.submit(self.reproject, path, self.output_path_for(path),
+                                self.dst_crs, self.warp_threads, self.resampling, self.block_size): path
+                for path in paths
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    resultados[path] = future.result()
+                except Exception as e:
+                    logger.error(f"Erro ao reprojetar {path}: {e}")
+                    resultados[path] = None
+
+        return resultados
+
+    @staticmethod
+    def reproject(src_path: str, dst_path: str, dst_crs: str, warp_threads: int = 2,
+                  resampling: Resampling = Resampling.nearest, block_size: int = 1024) -> str:
+        """
+        Reprojeta um arquivo (executado nos processos do pool).
+
+        Returns:
+            str: Caminho do arquivo reprojetado
+        """
+        tmp_path = f"{dst_path}.part"
+
+        with rasterio.open(src_path) as src:
+            res = src.res
+            transform, width, height = calculate_default_transform(
+                src.crs, dst_crs, src.width, src.height, *src.bounds, resolution=res
+            )
+            # Alinha a grade a múltiplos da resolução, como os tiles que já estão no CRS do mosaico
+            transform, width, height = aligned_target(transform, width, height, res)
+            nodata = src.nodata if src.nodata is not None else 0
+
+            profile = src.profile.copy()
+            profile.update({
+                "driver": "GTiff",
+                "crs": dst_crs,
+                "transform": transform,
+                "width": width,
+                "height": height,
+                "nodata": nodata,
+                "tiled": True,
+                "blockxsize": block_size,
+                "blockysize": block_size,
+            })
+
+            with WarpedVRT(src, crs=dst_crs, transform=transform, width=width, height=height,
+                           nodata=nodata, resampling=resampling,
+                           warp_extras={"NUM_THREADS": warp_threads}) as vrt:
+                try:
+                    with rasterio.open(tmp_path, "w", **profile) as dst:
+                        for block in MosaicGrid(transform, width, height).blocks(block_size):
+                            dst.write(vrt.read(window=block), window=block)
+                    os.replace(tmp_path, dst_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+
+        return dst_path
@@ -0,0 +1,135 @@
+# brazil_data_cube/processors/statistics.py
+
+import math
+import logging
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+class HistogramPercentileEstimator:
+    """
+    Estima percentis de um raster a partir de um histograma acumulado por blocos.
+
+    Cada bloco é somado ao histograma em O(n), sem ordenar nem guardar os pixels.
+    O erro de cada percentil é no máximo max_error (a largura das classes); com
+    dados inteiros e max_error=1 o resultado é idêntico ao np.nanpercentile.
+
+    O histograma tem no máximo MAX_BINS classes: intervalos largos demais para
+    o erro pedido (ex.: int32 com max_error=1) são recusados em vez de alocar
+    gigabytes de contadores.
+    """
+
+    MAX_BINS = 1 << 20
+
+    def __init__(self, value_range: Tuple[float, float] = (0, 65535), max_error: float = 1.0):
+        """
+        Args:
+            value_range (Tuple[float, float]): Menor e maior valor possíveis dos pixels
+            max_error (float): Erro máximo aceito nos percentis, na unidade dos pixels
+        """
+        if max_error <= 0:
+            raise ValueError("max_error deve ser positivo.")
+
+        self.lower, self.upper = value_range
+        self.bin_width = max_error
+        self.bins = int(math.floor((self.upper - self.lower) / self.bin_width)) + 1
+        if self.bins > self.MAX_BINS:
+            raise ValueError(f"Intervalo {value_range} com erro {max_error} exige {self.bins} classes "
+                             f"(máximo {self.MAX_BINS}); aumente max_error.")
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Acumula os valores de um bloco. NaN é ignorado; o nodata deve ser removido pelo chamador.
+
+        Args:
+            values (np.ndarray): Pixels válidos do bloco (qualquer formato)
+        """
+        values = np.asarray(values).ravel()
+        if values.dtype.kind == 'f':
+            values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        block_min, block_max = float(values.min()), float(values.max())
+        self.min = block_min if self.min is None else min(self.min, block_min)
+        self.max = block_max if self.max is None else max(self.max, block_max)
+
+        if values.dtype.kind in 'ui' and self.bin_width == 1 and self.lower == int(self.lower):
+            indexes = values.astype(np.int64) - int(self.lower)
+        else:
+            indexes = np.floor((values - self.lower) / self.bin_width).astype(np.int64)
+        np.clip(indexes, 0, self.bins - 1, out=indexes)
+
+        self.counts += np.bincount(indexes, minlength=self.bins)
+        self.count += values.size
+
+    def percentiles(self, q: Sequence[float]) -> Optional[np.ndarray]:
+        """
+        Calcula percentis com a mesma interpolação linear do np.percentile.
+
+        Args:
+            q (Sequence[float]): Percentis desejados, de 0 a 100
+
+        Returns:
+            Optional[np.ndarray]: Valores dos percentis, ou None se nenhum valor foi acumulado
+        """
+        if self.count == 0:
+            return None
+
+        quantiles = np.true_divide(np.asarray(q, dtype=np.float64), 100)
+        virtual_indexes = (self.count - 1) * quantiles
+        previous_indexes = np.clip(np.floor(virtual_indexes), 0, self.count - 1).astype(np.int64)
+        next_indexes = np.clip(previous_indexes + 1, 0, self.count - 1)
+        gamma = virtual_indexes - previous_indexes
+
+        previous = self._order_statistics(previous_indexes)
+        following = self._order_statistics(next_indexes)
+
+        # Mesma forma de interpolação do numpy (_lerp), para resultados bit a bit iguais
+        diff = following - previous
+        result = previous + diff * gamma
+        np.subtract(following, diff * (1 - gamma), out=result, where=gamma >= 0.5)
+        return result
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Calcula um único percentil (ver percentiles)."""
+        result = self.percentiles([q])
+        return None if result is None else float(result[0])
+
+    def _order_statistics(self, ranks: np.ndarray) -> np.ndarray:
+        """Retorna o k-ésimo menor valor para cada posição k, pelo limite inferior da classe."""
+        cumulative = np.cumsum(self.counts)
+        bins = np.searchsorted(cumulative, ranks, side='right')
+        values = self.lower + bins * self.bin_width
+        return np.clip(values.astype(np.float64), self.min, self.max)
+
+
+def array_percentiles(array: np.ndarray, q: Sequence[float]) -> np.ndarray:
+    """
+    Percentis de um array inteiro em memória, com o histograma acumulado em vez de ordenar.
+
+    Bandas inteiras de até 16 bits usam HistogramPercentileEstimator com classes
+    de largura 1 (resultado idêntico ao np.percentile); float e inteiros mais
+    largos não cabem nesse histograma e usam o np.percentile.
+
+    Args:
+        array (np.ndarray): Pixels (qualquer formato)
+        q (Sequence[float]): Percentis desejados, de 0 a 100
+
+    Returns:
+        np.ndarray: Valores dos percentis
+    """
+    array = np.asarray(array)
+    if array.dtype.kind not in 'ui' or array.dtype.itemsize > 2 or array.size == 0:
+        return np.percentile(array, q)
+
+    info = np.iinfo(array.dtype)
+    estimator = HistogramPercentileEstimator((info.min, info.max), max_error=1)
+    estimator.update(array)
+    return estimator.percentiles(q)
@@ -2,36 +2,64 @@
 
 import time
 import logging
-import geopandas as gpd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from ..config import TILES_PARANA
 from ..config import SAT_SUPPORTED
 from ..utils.bounding_box_handler import BoundingBoxHandler
 from ..utils.logger import ResultManager
+from ..utils.tile_grid import TileGrid
+from ..utils.tracing import Tracer
+from ..utils.output_profiles import OutputProfile
 from brazil_data_cube.processors.image_processor import ImageProcessor
 from brazil_data_cube.processors.mosaic_generator import MosaicGenerator
+from brazil_data_cube.processors.download_planner import DownloadPlanner
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 
 logger = logging.getLogger(__name__)
 
+# Nome da banda no arquivo -> chave do asset no item STAC
+BANDAS_RGB = {"red": "B04", "green": "B03", "blue": "B02"}
+
 class TileProcessor:
 
     def __init__(self, fetcher: any, downloader: any, output_dir: str,
-                 tile_grid_path: str, max_cloud_cover: float):
+                 tile_grid_path: str, max_cloud_cover: float, workers: int = 1,
+                 target_resolution: Optional[float] = None, batch_search: bool = False,
+                 dedupe_downloads: bool = False, streaming_mosaic: bool = False,
+                 virtual_mosaic: bool = False, reproject_workers: Optional[int] = None,
+                 rgb_profile: Optional[OutputProfile] = None, mosaic_profile: Optional[OutputProfile] = None,
+                 mosaic_workers: int = 1):
         self.fetcher = fetcher
         self.downloader = downloader
         self.output_dir = output_dir
         self.tile_grid_path = tile_grid_path
         self.max_cloud_cover = max_cloud_cover
+        self.workers = max(1, workers)
+        self.target_resolution = target_resolution
+        self.batch_search = batch_search
+        self.prefetched_items: Optional[Dict[str, List[Any]]] = None
+        self.dedupe_downloads = dedupe_downloads
+        self.download_source = downloader
+        self.rgb_profile = rgb_profile
         self.bbox_handler = BoundingBoxHandler()
-        self.result_manager = ResultManager()
         self.image_processor = ImageProcessor(satelite="")  # Será redefinido na execução
-        self.mosaic_generator = MosaicGenerator()
+        self.mosaic_generator = MosaicGenerator(streaming=streaming_mosaic, virtual=virtual_mosaic,
+                                                reproject_workers=reproject_workers, output_profile=mosaic_profile,
+                                                mosaic_workers=mosaic_workers)
+        self.result_manager = ResultManager(self.mosaic_generator)
 
     def processar_tiles_parana(self, satelite: str, start_date: str, end_date: str) -> None:
         """
         Processa todos os tiles do Paraná, baixa e monta o mosaico final.
-        
+
+        Com workers > 1 os tiles são processados em paralelo: a busca STAC, os
+        downloads e o merge RGB de tiles diferentes se sobrepõem. O mosaico final
+        só é gerado depois que todos os tiles terminarem. Com batch_search, as
+        imagens de todos os tiles são buscadas antes em uma única busca STAC.
+        Com dedupe_downloads, tiles que usam o mesmo item não baixam as mesmas
+        bandas de novo (ver DownloadPlanner).
+
         Args:
             satelite (str): Nome do satélite
             start_date (str): Data de início (YYYY-MM-DD)
@@ -42,43 +70,168 @@ class TileProcessor:
             self.result_manager.log_error_csv("Paraná", satelite, "Satélite não suportado")
             return
 
+        self.prefetched_items = self._buscar_em_lote(satelite, start_date, end_date) if self.batch_search else None
+
+        # Com dedupe_downloads, tiles que usam o mesmo asset esperam pelo mesmo download
+        self.download_source = DownloadPlanner(self.downloader) if self.dedupe_downloads else self.downloader
+        resultados = self._por_tile(lambda tile: self._processar_tile(tile, satelite, start_date, end_date))
+
         tile_mosaic_files = []
         results_time_estimated = []
 
+        for resultado in resultados:
+            if resultado is None:
+                continue
+            tile_mosaic_files.append(resultado["output"])
+            results_time_estimated.append({"Tile_id": resultado["Tile_id"], "duration_sec": resultado["duration_sec"]})
+
+        self.result_manager.gerenciar_resultados(
+            tile_mosaic_files, results_time_estimated, self.output_dir, satelite, start_date, end_date
+        )
+
+    def _buscar_em_lote(self, satelite: str, start_date: str, end_date: str) -> Optional[Dict[str, List[Any]]]:
+        """
+        Busca de uma vez os itens de todos os tiles do Paraná.
+
+        Returns:
+            Optional[Dict[str, List]]: Itens por tile, ou None se a busca em lote falhar
+            (os tiles voltam a ser buscados um a um)
+        """
+        tile_grid = TileGrid.load(self.tile_grid_path)
+        tile_bboxes = {}
         for tile in TILES_PARANA:
-            start = time.perf_counter()
-            logger.info(f"Processando tile {tile}...")
+            tile_bounds = tile_grid.get_bounds(tile)
+            if tile_bounds is not None:
+                tile_bboxes[tile] = self.bbox_handler.calcular_bbox_reduzido_bounds(tile_bounds)
 
-            tile_grid = gpd.read_file(self.tile_grid_path)
-            tile_grid = tile_grid[tile_grid["NAME"] == tile]
+        try:
+            return self.fetcher.search_batch(satelite, tile_bboxes, start_date, end_date, self.max_cloud_cover)
+        except Exception as e:
+            logger.warning(f"Falha na busca em lote, buscando tile a tile: {e}", exc_info=True)
+            return None
 
-            if tile_grid.empty:
-                logger.warning(f"Tile {tile} não encontrado na grade Sentinel-2. Pulando...")
-                continue
+    def _por_tile(self, funcao: Callable[[str], Any]) -> List[Any]:
+        """
+        Aplica funcao a cada tile do Paraná, em um pool limitado de threads se workers > 1.
 
-            main_bbox = self.bbox_handler.calcular_bbox_reduzido(tile_grid)
+        Returns:
+            List[Any]: Resultados na mesma ordem de TILES_PARANA
+        """
+        tracer = Tracer.get()
 
-            image_assets = self.fetcher.fetch_image(
-                satelite, main_bbox, start_date, end_date,
-                self.max_cloud_cover, self.tile_grid_path, tile
-            )
+        def executar(tile):
+            # Os spans abertos durante o tile (busca, downloads, merge) carregam o tile id
+            with tracer.attributes(tile=tile):
+                return funcao(tile)
 
-            if not image_assets:
-                logger.warning(f"Nenhuma imagem encontrada para o tile {tile}.")
-                continue
+        if self.workers == 1:
+            return [executar(tile) for tile in TILES_PARANA]
 
-            logger.info("Baixando e processando imagens...")
-            r = self.downloader.download(image_assets['B04'], f"{satelite}_{start_date}_{end_date}_red")
-            g = self.downloader.download(image_assets['B03'], f"{satelite}_{start_date}_{end_date}_green")
-            b = self.downloader.download(image_assets['B02'], f"{satelite}_{start_date}_{end_date}_blue")
+        logger.info(f"Processando {len(TILES_PARANA)} tiles com {self.workers} workers...")
+        resultados = {}
 
-            tile_mosaic_output = os.path.join(self.output_dir, f"{satelite}_{tile}_{start_date}_{end_date}_RGB.tif")
-            ImageProcessor(satelite).merge_rgb_tif(r, g, b, tile_mosaic_output)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tile-worker") as executor:
+            futures = {executor.submit(executar, tile): tile for tile in TILES_PARANA}
+            for future in as_completed(futures):
+                resultados[futures[future]] = future.result()
 
-            tile_mosaic_files.append(tile_mosaic_output)
-            duration = time.perf_counter() - start
-            results_time_estimated.append({"Tile_id": tile, "duration_sec": duration})
+        # Mantém a ordem original dos tiles para o mosaico
+        return [resultados[tile] for tile in TILES_PARANA]
 
-        self.result_manager.gerenciar_resultados(
-            tile_mosaic_files, results_time_estimated, self.output_dir, satelite, start_date, end_date
-        )
\ No newline at end of file
+    def _processar_tile(self, tile: str, satelite: str, start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca, baixa e mescla as bandas RGB de um único tile.
+
+        Returns:
+            Optional[Dict]: Caminho do RGB e duração do tile, ou None se falhar
+        """
+        start = time.perf_counter()
+        logger.info(f"Processando tile {tile}...")
+        assets = {}
+
+        try:
+            try:
+                image_assets = self._buscar_tile(tile, satelite, start_date, end_date)
+                if image_assets is None:
+                    return None
+
+                if self.target_resolution:
+                    # Prévia: as overviews são lidas direto dos COGs remotos, sem baixar as bandas
+                    r, g, b = (image_assets[BANDAS_RGB[banda]].href for banda in ("red", "green", "blue"))
+                else:
+                    logger.info(f"Baixando e processando imagens do tile {tile}...")
+                    # O tile entra no nome das bandas para que downloads paralelos não sobrescrevam uns aos outros
+                    base_name = f"{satelite}_{tile}_{start_date}_{end_date}"
+                    assets = {f"{base_name}_{banda}": image_assets[asset_key] for banda, asset_key in BANDAS_RGB.items()}
+                    bandas = self.download_source.download_many(assets)
+                    r, g, b = bandas[f"{base_name}_red"], bandas[f"{base_name}_green"], bandas[f"{base_name}_blue"]
+
+            except Exception as e:
+                logger.error(f"Erro ao processar o tile {tile}: {e}", exc_info=True)
+                self.result_manager.log_error_csv(tile, satelite, str(e))
+                return None
+
+            return self._mesclar_tile(tile, satelite, start_date, end_date, r, g, b, time.perf_counter() - start)
+        finally:
+            # Bandas de resolução cheia só servem ao merge: não acumulam no disco ao longo dos tiles
+            self._liberar_bandas(assets)
+
+    def _liberar_bandas(self, assets: Dict[str, Any]) -> None:
+        """Apaga as bandas baixadas para o tile (com dedupe_downloads, só quando nenhum outro tile as usa)."""
+        if assets:
+            try:
+                self.download_source.release(assets)
+            except Exception as e:
+                logger.warning(f"Falha ao apagar as bandas baixadas: {e}")
+
+    def _buscar_tile(self, tile: str, satelite: str, start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca a melhor imagem do tile.
+
+        Returns:
+            Optional[Dict]: Assets da imagem ou None se o tile não existir ou não houver imagem
+        """
+        tile_bounds = TileGrid.load(self.tile_grid_path).get_bounds(tile)
+
+        if tile_bounds is None:
+            logger.warning(f"Tile {tile} não encontrado na grade Sentinel-2. Pulando...")
+            return None
+
+        main_bbox = self.bbox_handler.calcular_bbox_reduzido_bounds(tile_bounds)
+
+        items = None if self.prefetched_items is None else self.prefetched_items.get(tile, [])
+        image_assets = self.fetcher.fetch_image(
+            satelite, main_bbox, start_date, end_date,
+            self.max_cloud_cover, self.tile_grid_path, tile, items
+        )
+
+        if not image_assets:
+            logger.warning(f"Nenhuma imagem encontrada para o tile {tile}.")
+            return None
+
+        return image_assets
+
+    def _mesclar_tile(self, tile: str, satelite: str, start_date: str, end_date: str,
+                      r: str, g: str, b: str, elapsed: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        Mescla as bandas RGB do tile.
+
+        Args:
+            r, g, b (str): Caminhos locais (ou hrefs, na prévia) das bandas
+            elapsed (float): Tempo já gasto no tile antes do merge, em segundos
+
+        Returns:
+            Optional[Dict]: Caminho do RGB e duração do tile, ou None se falhar
+        """
+        start = time.perf_counter()
+        try:
+            tile_mosaic_output = os.path.join(self.output_dir, f"{satelite}_{tile}_{start_date}_{end_date}_RGB.tif")
+            ImageProcessor(satelite, self.target_resolution,
+                           output_profile=self.rgb_profile).merge_rgb_tif(r, g, b, tile_mosaic_output)
+        except Exception as e:
+            logger.error(f"Erro ao processar o tile {tile}: {e}", exc_info=True)
+            self.result_manager.log_error_csv(tile, satelite, str(e))
+            return None
+
+        duration = elapsed + time.perf_counter() - start
+        return {"Tile_id": tile, "output": tile_mosaic_output, "duration_sec": duration}
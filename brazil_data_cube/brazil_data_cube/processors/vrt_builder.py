@@ -0,0 +1,116 @@
+# brazil_data_cube/processors/vrt_builder.py
+
+import os
+import math
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any, List, Optional
+from rasterio import windows
+from rasterio.dtypes import dtype_rev, typename_fwd
+from .mosaic_grid import MosaicGrid
+
+
+logger = logging.getLogger(__name__)
+
+class VrtBuilder:
+    """
+    Escreve um mosaico virtual (GDAL VRT) que referencia os GeoTIFFs dos tiles.
+
+    Só os metadados das fontes são lidos, então o mosaico fica pronto em
+    milissegundos. A grade é a mesma do rasterio.merge (MosaicGrid) e, como no
+    VRT a última fonte listada prevalece, as fontes são escritas em ordem
+    inversa com o nodata de cada uma: onde os tiles se sobrepõem vale o primeiro
+    da lista, igual ao método 'first' do merge.
+
+    Só fontes na mesma resolução da grade são aceitas: o VRT reamostra as de
+    outra resolução com arredondamentos próprios, diferentes dos do merge.
+    As fontes também precisam ter o mesmo nodata, já que o VRT só descarta o
+    nodata de cada fonte e o merge descarta também o da primeira. Sem nodata,
+    o merge trata o 0 como vazio, e o VRT usa o 0 como NODATA das fontes.
+    """
+
+    def __init__(self, crs: str):
+        """
+        Args:
+            crs (str): CRS do mosaico (todas as fontes já devem estar nele)
+        """
+        self.crs = crs
+
+    @staticmethod
+    def supports(src_files: List[Any]) -> bool:
+        """Indica se o VRT reproduz o merge para essas fontes (todas na resolução e com o nodata da primeira)."""
+        first = src_files[0]
+        x_res, y_res = first.res
+        return all(math.isclose(src.res[0], x_res, rel_tol=1e-9) and math.isclose(src.res[1], y_res, rel_tol=1e-9)
+                   and VrtBuilder._same_nodata(src.nodata, first.nodata) for src in src_files)
+
+    @staticmethod
+    def _same_nodata(a: Optional[float], b: Optional[float]) -> bool:
+        if a is None or b is None:
+            return a is b
+        return a == b or (math.isnan(a) and math.isnan(b))
+
+    def build(self, src_files: List[Any], output_path: str) -> str:
+        """
+        Grava o VRT.
+
+        Args:
+            src_files (List[DatasetReader]): Tiles abertos, com a mesma quantidade de bandas
+            output_path (str): Caminho do .vrt
+
+        Returns:
+            str: Caminho do VRT gravado
+        """
+        if not self.supports(src_files):
+            raise ValueError("O mosaico virtual exige que todos os tiles tenham a resolução e o nodata do primeiro.")
+
+        grid = MosaicGrid.from_sources(src_files)
+        first = src_files[0]
+        vrt_dir = os.path.dirname(os.path.abspath(output_path))
+        # Mesmo valor que o merge usa para decidir quais pixels ainda estão vazios
+        nodata = first.nodata if first.nodata is not None else 0
+
+        root = ET.Element("VRTDataset", rasterXSize=str(grid.width), rasterYSize=str(grid.height))
+        ET.SubElement(root, "SRS").text = first.crs.to_wkt() if first.crs else self.crs
+        t = grid.transform
+        ET.SubElement(root, "GeoTransform").text = ", ".join(repr(v) for v in (t.c, t.a, t.b, t.f, t.d, t.e))
+
+        for band in range(1, first.count + 1):
+            data_type = typename_fwd[dtype_rev[first.dtypes[band - 1]]]
+            band_el = ET.SubElement(root, "VRTRasterBand", dataType=data_type, band=str(band))
+            if first.nodata is not None:
+                ET.SubElement(band_el, "NoDataValue").text = repr(first.nodata)
+            ET.SubElement(band_el, "ColorInterp").text = first.colorinterp[band - 1].name.capitalize()
+
+            for src in reversed(src_files):
+                self._add_source(band_el, src, band, grid, vrt_dir, nodata)
+
+        ET.indent(root)
+        ET.ElementTree(root).write(output_path, encoding="utf-8")
+        logger.info(f"Mosaico virtual com {len(src_files)} tiles salvo em: {output_path}")
+        return output_path
+
+    @staticmethod
+    def _add_source(band_el: ET.Element, src: Any, band: int, grid: MosaicGrid, vrt_dir: str, nodata: float) -> None:
+        """Acrescenta a banda de src ao VRT, posicionada pela grade do mosaico."""
+        source_el = ET.SubElement(band_el, "ComplexSource")
+
+        path = os.path.abspath(src.name)
+        try:
+            filename, relative = os.path.relpath(path, vrt_dir), "1"
+        except ValueError:
+            # Outro drive (Windows): usa o caminho absoluto
+            filename, relative = path, "0"
+        ET.SubElement(source_el, "SourceFilename", relativeToVRT=relative).text = filename.replace(os.sep, "/")
+        ET.SubElement(source_el, "SourceBand").text = str(band)
+
+        block_height, block_width = src.block_shapes[band - 1]
+        ET.SubElement(source_el, "SourceProperties", RasterXSize=str(src.width), RasterYSize=str(src.height),
+                      DataType=typename_fwd[dtype_rev[src.dtypes[band - 1]]],
+                      BlockXSize=str(block_width), BlockYSize=str(block_height))
+        ET.SubElement(source_el, "SrcRect", xOff="0", yOff="0", xSize=str(src.width), ySize=str(src.height))
+
+        dst = MosaicGrid.align(windows.from_bounds(*src.bounds, grid.transform))
+        ET.SubElement(source_el, "DstRect", xOff=str(dst.col_off), yOff=str(dst.row_off),
+                      xSize=str(dst.width), ySize=str(dst.height))
+        ET.SubElement(source_el, "NODATA").text = repr(nodata)
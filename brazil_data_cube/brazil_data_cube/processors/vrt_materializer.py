@@ -0,0 +1,90 @@
+# brazil_data_cube/processors/vrt_materializer.py
+
+import logging
+import threading
+import rasterio
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, List, Optional
+from rasterio.windows import Window
+from .mosaic_grid import MosaicGrid
+from ..utils.output_profiles import OutputProfile
+
+
+logger = logging.getLogger(__name__)
+
+class VrtMaterializer:
+    """
+    Converte um mosaico virtual (VRT) em um arquivo físico COG.
+
+    Os blocos do VRT são lidos em paralelo, cada thread com o seu próprio
+    handle do dataset (handles do GDAL não podem ser compartilhados entre
+    threads), e gravados pela thread principal no writer do perfil de saída
+    (um GeoTIFF tiled temporário, convertido para COG ao final). A quantidade
+    de blocos em memória é limitada a duas vezes o número de workers.
+    """
+
+    def __init__(self, workers: int = 4, block_size: int = 1024, output_profile: Optional[OutputProfile] = None):
+        """
+        Args:
+            workers (int): Threads de leitura dos blocos
+            block_size (int): Lado dos blocos lidos do VRT (múltiplo de 16)
+            output_profile (Optional[OutputProfile]): Formato do arquivo gravado (padrão: COG com DEFLATE)
+        """
+        if block_size <= 0 or block_size % 16:
+            raise ValueError(f"block_size deve ser um múltiplo positivo de 16, recebido {block_size}.")
+        self.workers = max(1, workers)
+        self.block_size = block_size
+        self.output_profile = output_profile or OutputProfile("cog-deflate")
+
+    def materialize(self, vrt_path: str, output_path: str) -> str:
+        """
+        Grava o conteúdo do VRT como COG.
+
+        Args:
+            vrt_path (str): Caminho do mosaico virtual
+            output_path (str): Caminho do COG de saída
+
+        Returns:
+            str: Caminho do COG gravado
+        """
+        with rasterio.open(vrt_path) as vrt:
+            grid = MosaicGrid(vrt.transform, vrt.width, vrt.height)
+            profile = vrt.profile.copy()
+            profile.update({"driver": "GTiff", "tiled": True,
+                            "blockxsize": self.block_size, "blockysize": self.block_size})
+
+        local = threading.local()
+        handles: List[Any] = []
+        handles_lock = threading.Lock()
+
+        def ler(block: Window):
+            if not hasattr(local, "src"):
+                local.src = rasterio.open(vrt_path)
+                with handles_lock:
+                    handles.append(local.src)
+            return block, local.src.read(window=block)
+
+        logger.info(f"Materializando {vrt_path} ({grid.width}x{grid.height}) com {self.workers} workers...")
+        try:
+            with self.output_profile.open(output_path, **profile) as dst, \
+                 ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vrt-reader") as executor:
+                pending = set()
+                for block in grid.blocks(self.block_size):
+                    if len(pending) >= 2 * self.workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        self._gravar(dst, done)
+                    pending.add(executor.submit(ler, block))
+                self._gravar(dst, pending)
+        finally:
+            for handle in handles:
+                handle.close()
+
+        logger.info(f"Mosaico materializado em: {output_path}")
+        return output_path
+
+    @staticmethod
+    def _gravar(dst: Any, futures: Any) -> None:
+        """Grava no destino os blocos lidos (repassa erros de leitura)."""
+        for future in futures:
+            block, data = future.result()
+            dst.write(data, window=block)
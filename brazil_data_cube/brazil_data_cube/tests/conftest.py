@@ -1,4 +1,6 @@
 # tests/conftest.py
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
 from unittest.mock import MagicMock
 
@@ -16,4 +18,61 @@ def mock_fetcher():
 def mock_downloader():
     downloader = MagicMock()
     downloader.download.side_effect = lambda asset, filename: filename
-    return downloader
\ No newline at end of file
+    downloader.download_many.side_effect = lambda assets: {filename: filename for filename in assets}
+    return downloader
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Serve os arquivos de server.files com suporte (opcional) a Range, ETag e HEAD."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._responder(corpo=False)
+
+    def do_GET(self):
+        self._responder(corpo=True)
+
+    def _responder(self, corpo):
+        server = self.server
+        server.requests.append((self.command, self.path, self.headers.get("Range")))
+        data = server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+
+        intervalo = self.headers.get("Range") if server.ranges else None
+        if intervalo:
+            inicio, fim = intervalo.split("=")[1].split("-")
+            inicio, fim = int(inicio), min(int(fim), len(data) - 1)
+            trecho = data[inicio:fim + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{len(data)}")
+        else:
+            trecho = data
+            self.send_response(200)
+
+        # Tamanho anunciado no HEAD pode ser alterado para simular um arquivo trocado no servidor
+        tamanho = server.head_sizes.get(self.path, len(trecho)) if self.command == "HEAD" else len(trecho)
+        self.send_header("Content-Length", str(tamanho))
+        if server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if server.etags.get(self.path):
+            self.send_header("ETag", server.etags[self.path])
+        self.end_headers()
+        if corpo:
+            self.wfile.write(trecho)
+
+
+@pytest.fixture
+def range_server():
+    """Servidor HTTP local; arquivos em server.files, requisições recebidas em server.requests."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    server.files, server.etags, server.head_sizes, server.requests = {}, {}, {}, []
+    server.ranges = True
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
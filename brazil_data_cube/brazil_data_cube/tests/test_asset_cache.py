@@ -0,0 +1,103 @@
+# tests/test_asset_cache.py
+import os
+import pytest
+from types import SimpleNamespace
+from brazil_data_cube.downloader.asset_cache import AssetCache
+from brazil_data_cube.downloader.image_downloader import ImagemDownloader
+
+CONTEUDO = os.urandom(50_000)
+
+def escrever(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return str(path)
+
+def test_store_and_fetch(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    key = AssetCache.make_key("https://x/B04.tif", AssetCache.validator_from_headers({"etag": '"abc"'}))
+
+    assert cache.fetch(key, str(tmp_path / "saida.tif")) is None
+    cache.store(key, escrever(tmp_path / "baixado.tif", 100))
+
+    assert cache.fetch(key, str(tmp_path / "saida.tif")) == 100
+    assert (tmp_path / "saida.tif").read_bytes() == b"x" * 100
+    assert key != AssetCache.make_key("https://x/B04.tif", AssetCache.validator_from_headers({"etag": '"def"'}))
+
+def test_lru_eviction_respects_pins(tmp_path):
+    cache = AssetCache(tmp_path / "cache", max_bytes=250)
+    for i, key in enumerate(["a", "b"]):
+        cache.store(key, escrever(tmp_path / f"{key}.tif", 100))
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+
+    # "a" é a menos usada, mas está fixada: sai "b"
+    with cache.pinned("a"):
+        cache.store("c", escrever(tmp_path / "c.tif", 100))
+    assert sorted(os.listdir(tmp_path / "cache")) == ["a.asset", "a.size", "c.asset", "c.size"]
+
+    cache.store("d", escrever(tmp_path / "d.tif", 100))
+    assert sorted(os.listdir(tmp_path / "cache")) == ["c.asset", "c.size", "d.asset", "d.size"]
+
+def test_detach_protects_cached_copy(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    saida = escrever(tmp_path / "saida.tif", 10)
+    cache.store("k", saida)
+
+    AssetCache.detach(saida)
+    escrever(saida, 5)
+    assert cache.fetch("k", str(tmp_path / "outra.tif")) == 10
+
+def test_entry_changed_through_a_link_is_discarded(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    saida = escrever(tmp_path / "saida.tif", 10)
+    cache.store("k", saida)
+
+    # Sem detach: a gravação trunca também a entrada do cache
+    escrever(saida, 5)
+
+    assert cache.fetch("k", str(tmp_path / "outra.tif")) is None
+    assert os.listdir(tmp_path / "cache") == []
+
+def test_download_without_validator_keeps_cached_copy(range_server, tmp_path):
+    range_server.files["/B04.tif"] = CONTEUDO
+    cache = AssetCache(tmp_path / "cache")
+    downloader = ImagemDownloader(str(tmp_path / "saida"), asset_cache=cache)
+    # A saída ainda é um hard link da entrada de uma execução anterior
+    cache.store("k", escrever(tmp_path / "saida" / "B04.tif", 10))
+
+    downloader.download_many({"B04.tif": SimpleNamespace(href=f"{range_server.url}/B04.tif")})
+
+    assert (tmp_path / "saida" / "B04.tif").read_bytes() == CONTEUDO
+    assert cache.fetch("k", str(tmp_path / "outra.tif")) == 10
+
+def test_key_requires_validator():
+    with pytest.raises(ValueError):
+        AssetCache.make_key("https://x/B04.tif", None)
+
+def _baixar_duas_vezes(range_server, tmp_path, segments):
+    cache = AssetCache(tmp_path / "cache")
+    asset = {"B04.tif": SimpleNamespace(href=f"{range_server.url}/B04.tif")}
+    for saida in ("a", "b"):
+        caminhos = ImagemDownloader(str(tmp_path / saida), segments=segments,
+                                    asset_cache=cache).download_many(asset)
+        with open(caminhos["B04.tif"], "rb") as f:
+            assert f.read() == CONTEUDO
+    return [(metodo, intervalo is not None) for metodo, _, intervalo in range_server.requests]
+
+def test_asset_without_validator_is_not_cached(range_server, tmp_path):
+    range_server.files["/B04.tif"] = CONTEUDO
+
+    metodos = _baixar_duas_vezes(range_server, tmp_path, segments=1)
+
+    assert metodos.count(("GET", False)) == 2
+    assert os.listdir(tmp_path / "cache") == []
+
+def test_single_head_shared_by_cache_and_segments(range_server, tmp_path):
+    range_server.files["/B04.tif"] = CONTEUDO
+    range_server.etags["/B04.tif"] = '"v1"'
+
+    metodos = _baixar_duas_vezes(range_server, tmp_path, segments=2)
+
+    # Primeiro download: um HEAD e GETs por intervalo; o segundo sai do cache com um HEAD só
+    gets = metodos[1:-1]
+    assert metodos[0] == metodos[-1] == ("HEAD", False)
+    assert gets and all(requisicao == ("GET", True) for requisicao in gets)
@@ -0,0 +1,128 @@
+# tests/test_async_downloader.py
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from functools import partial
+import pytest
+from brazil_data_cube.downloader.async_downloader import AsyncDownloader
+from brazil_data_cube.downloader.asset_cache import AssetCache
+
+@pytest.fixture
+def servidor(tmp_path):
+    origem = tmp_path / "origem"
+    origem.mkdir()
+    for i in range(6):
+        (origem / f"banda{i}.bin").write_bytes(os.urandom(300_000))
+
+    handler = partial(SimpleHTTPRequestHandler, directory=str(origem))
+    handler.log_message = lambda *args: None
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", origem
+    server.shutdown()
+
+def test_download_all(servidor, tmp_path):
+    url, origem = servidor
+    destino = tmp_path / "destino"
+    destino.mkdir()
+    jobs = [(f"{url}/banda{i}.bin", str(destino / f"banda{i}.bin")) for i in range(6)]
+    jobs.append((f"{url}/inexistente.bin", str(destino / "inexistente.bin")))
+    recebidos = []
+
+    downloader = AsyncDownloader(max_per_host=2, chunk_size=4096, write_queue_size=2)
+    try:
+        results = downloader.download_all(jobs, recebidos.append)
+    finally:
+        downloader.close()
+
+    assert len(results) == 7
+    falhas = [result for result in results if result["error"]]
+    assert [result["href"] for result in falhas] == [f"{url}/inexistente.bin"]
+    for i in range(6):
+        assert (destino / f"banda{i}.bin").read_bytes() == (origem / f"banda{i}.bin").read_bytes()
+    assert sum(recebidos) == 6 * 300_000
+    assert sorted(os.listdir(destino)) == [f"banda{i}.bin" for i in range(6)]
+
+def test_writer_failure_with_full_queue_does_not_hang(servidor, tmp_path, mocker):
+    url, _ = servidor
+    arquivo = mocker.MagicMock(closed=False)
+    arquivo.write.side_effect = OSError("disco cheio")
+    mocker.patch("brazil_data_cube.downloader.async_downloader.open", create=True, return_value=arquivo)
+    downloader = AsyncDownloader(chunk_size=1024, write_queue_size=1)
+
+    async def baixar():
+        try:
+            return [result async for result in downloader.download_iter([(f"{url}/banda0.bin", str(tmp_path / "b0.bin"))])]
+        finally:
+            await downloader._close_session()
+
+    # Com o gravador parado e a fila cheia, o leitor não pode ficar preso no put
+    results = asyncio.run(asyncio.wait_for(baixar(), timeout=10))
+
+    assert results[0]["error"] == "disco cheio"
+    assert not os.path.exists(tmp_path / "b0.bin.part")
+
+def test_cancel_waits_for_the_running_write_before_closing(servidor, tmp_path, mocker):
+    url, _ = servidor
+    eventos = []
+    escrevendo = threading.Event()
+
+    def escrever(chunk):
+        escrevendo.set()
+        time.sleep(0.3)
+        eventos.append("write")
+
+    arquivo = mocker.MagicMock(closed=False)
+    arquivo.write.side_effect = escrever
+    arquivo.close.side_effect = lambda: eventos.append("close")
+    mocker.patch("brazil_data_cube.downloader.async_downloader.open", create=True, return_value=arquivo)
+    downloader = AsyncDownloader(chunk_size=1024)
+
+    async def consumir():
+        return [result async for result in downloader.download_iter([(f"{url}/banda0.bin", str(tmp_path / "b0.bin"))])]
+
+    async def cancelar_durante_a_escrita():
+        tarefa = asyncio.ensure_future(consumir())
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, escrevendo.wait, 5)
+            tarefa.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await tarefa
+        finally:
+            await downloader._close_session()
+
+    asyncio.run(asyncio.wait_for(cancelar_durante_a_escrita(), timeout=10))
+
+    # O arquivo só é fechado depois que a escrita em andamento termina
+    assert eventos[0] == "write"
+    assert eventos[-1] == "close" and eventos.count("close") == 1
+
+def test_concurrent_calls_share_one_loop_and_the_asset_cache(range_server, tmp_path):
+    for i in range(4):
+        range_server.files[f"/banda{i}.bin"] = os.urandom(50_000)
+        range_server.etags[f"/banda{i}.bin"] = f'"v{i}"'
+    downloader = AsyncDownloader(asset_cache=AssetCache(tmp_path / "cache"))
+    loops = set()
+
+    def baixar(saida, i):
+        loops.add(id(downloader._event_loop()))
+        path = str(tmp_path / f"{saida}{i}.bin")
+        return downloader.download_all([(f"{range_server.url}/banda{i}.bin", path)])[0]
+
+    try:
+        for saida in ("a", "b"):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(lambda i: baixar(saida, i), range(4)))
+            assert all(result["error"] is None for result in results)
+    finally:
+        downloader.close()
+
+    assert len(loops) == 1
+    # A segunda rodada sai do cache: só HEADs
+    gets = [path for metodo, path, _ in range_server.requests if metodo == "GET"]
+    assert sorted(gets) == [f"/banda{i}.bin" for i in range(4)]
+    for i in range(4):
+        assert (tmp_path / f"b{i}.bin").read_bytes() == range_server.files[f"/banda{i}.bin"]
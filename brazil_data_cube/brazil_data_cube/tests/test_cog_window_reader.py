@@ -0,0 +1,79 @@
+# tests/test_cog_window_reader.py
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.warp import transform_bounds
+from rasterio.windows import Window
+from brazil_data_cube.downloader.cog_window_reader import CogWindowReader
+
+CRS = "EPSG:32722"
+LEFT, TOP, RES = 600000, 7300000, 10
+
+@pytest.fixture
+def cog(tmp_path):
+    """GeoTIFF tiled 1024x1024 com blocos 512x512, como os COGs do BDC."""
+    path = str(tmp_path / "B04.tif")
+    data = np.arange(1024 * 1024, dtype=np.uint32).reshape(1, 1024, 1024)
+    profile = {"driver": "GTiff", "width": 1024, "height": 1024, "count": 1, "dtype": "uint32", "crs": CRS,
+               "transform": from_origin(LEFT, TOP, RES, RES), "tiled": True, "blockxsize": 512, "blockysize": 512}
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data)
+    return path, data
+
+def _janela(path, bbox, bbox_crs=CRS):
+    with rasterio.open(path) as src:
+        return CogWindowReader(bbox_crs)._window_for_bbox(src, bbox)
+
+def test_window_covers_partial_pixels(cog):
+    path, _ = cog
+    # Começa no meio do pixel 10 e termina no meio do pixel 29 (colunas e linhas)
+    bbox = [LEFT + 105, TOP - 295, LEFT + 295, TOP - 105]
+
+    assert _janela(path, bbox) == Window(10, 10, 20, 20)
+
+def test_window_is_clamped_to_the_raster(cog):
+    path, _ = cog
+    bbox = [LEFT - 500, TOP - 200, LEFT + 100, TOP + 500]
+
+    assert _janela(path, bbox) == Window(0, 0, 10, 20)
+
+def test_bbox_outside_the_raster(cog):
+    path, _ = cog
+
+    with pytest.raises(ValueError, match="não intersecta"):
+        _janela(path, [LEFT - 5000, TOP - 5000, LEFT - 1000, TOP - 1000])
+
+def test_geographic_bbox_covers_the_area(cog):
+    path, _ = cog
+    area = (LEFT + 1000, TOP - 3000, LEFT + 3000, TOP - 1000)
+    bbox = transform_bounds(CRS, "EPSG:4326", *area)
+
+    window = _janela(path, bbox, "EPSG:4326")
+
+    # A bbox em graus, reprojetada, cobre pelo menos os pixels 100..300 da área
+    assert window.col_off <= 100 and window.row_off <= 100
+    assert window.col_off + window.width >= 300 and window.row_off + window.height >= 300
+    assert window.width < 220 and window.height < 220
+
+@pytest.mark.parametrize("bbox, tiled, blocks", [
+    # Recorte pequeno: sem tiles (blocos de 512 não cabem em 20x20)
+    ([LEFT + 105, TOP - 295, LEFT + 295, TOP - 105], False, None),
+    # Recorte de 300x400: blocos reduzidos ao recorte, em múltiplos de 16
+    ([LEFT + 1000, TOP - 5000, LEFT + 4000, TOP - 1000], True, (400 // 16 * 16, 300 // 16 * 16)),
+])
+def test_clipped_write(cog, tmp_path, bbox, tiled, blocks):
+    path, data = cog
+    saida = str(tmp_path / "recorte.tif")
+
+    CogWindowReader(CRS).read_window(path, bbox, saida)
+
+    window = _janela(path, bbox)
+    with rasterio.open(path) as src, rasterio.open(saida) as dst:
+        assert dst.transform == src.window_transform(window)
+        assert dst.crs == src.crs
+        assert np.array_equal(dst.read(), data[:, window.row_off:window.row_off + window.height,
+                                                 window.col_off:window.col_off + window.width])
+        assert dst.profile.get("tiled", False) == tiled
+        if blocks:
+            assert dst.block_shapes[0] == blocks
@@ -0,0 +1,146 @@
+# tests/test_download_planner.py
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+from brazil_data_cube.processors.download_planner import DownloadPlanner
+
+def asset(href):
+    return SimpleNamespace(href=href)
+
+def test_each_href_is_downloaded_once(mock_downloader):
+    mock_downloader.download_many.side_effect = lambda assets: {filename: filename for filename in assets}
+    planner = DownloadPlanner(mock_downloader)
+    compartilhado = asset("https://bdc/cubo/item1/B04.tif")
+
+    primeiro = planner.download_many({"red": compartilhado})
+    segundo = planner.download_many({"red": compartilhado, "green": asset("https://bdc/cubo/item2/B03.tif")})
+
+    assert mock_downloader.download_many.call_count == 2
+    assert list(mock_downloader.download_many.call_args.args[0]) == [
+        DownloadPlanner.filename_for("https://bdc/cubo/item2/B03.tif")]
+    nome = DownloadPlanner.filename_for(compartilhado.href)
+    assert nome.endswith("_B04.tif")
+    assert primeiro == {"red": nome}
+    assert segundo["red"] == nome
+
+def test_waiters_share_the_owner_download():
+    downloader = MagicMock()
+    liberar = threading.Event()
+
+    def download_many(assets):
+        liberar.wait(5)
+        return {filename: filename for filename in assets}
+
+    downloader.download_many.side_effect = download_many
+    planner = DownloadPlanner(downloader)
+    compartilhado = {"red": asset("https://bdc/cubo/B04.tif")}
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(planner.download_many, compartilhado) for _ in range(3)]
+        liberar.set()
+        resultados = [future.result(timeout=5) for future in futures]
+
+    assert downloader.download_many.call_count == 1
+    assert resultados[0] == resultados[1] == resultados[2]
+
+def test_failures_only_affect_owners():
+    downloader = MagicMock()
+
+    def download_many(assets):
+        if any("falha" in item.href for item in assets.values()):
+            raise RuntimeError("timeout")
+        return {filename: filename for filename in assets}
+
+    downloader.download_many.side_effect = download_many
+    planner = DownloadPlanner(downloader)
+    ok = asset("https://bdc/ok/B04.tif")
+
+    assert planner.download_many({"red": ok})
+    with pytest.raises(RuntimeError, match="timeout"):
+        planner.download_many({"red": ok, "green": asset("https://bdc/falha/B03.tif")})
+    # O asset que falhou não é baixado de novo por outro tile
+    with pytest.raises(RuntimeError, match="timeout"):
+        planner.download_many({"green": asset("https://bdc/falha/B03.tif")})
+    assert downloader.download_many.call_count == 2
+
+def test_band_is_released_by_the_last_user(tmp_path):
+    downloader = MagicMock()
+
+    def download_many(assets):
+        for filename in assets:
+            (tmp_path / filename).touch()
+        return {filename: str(tmp_path / filename) for filename in assets}
+
+    downloader.download_many.side_effect = download_many
+    downloader.release.side_effect = lambda assets: [(tmp_path / filename).unlink() for filename in assets]
+    planner = DownloadPlanner(downloader)
+    primeiro = {"red": asset("https://bdc/cubo/B04.tif")}
+    segundo = {"red": primeiro["red"], "green": asset("https://bdc/cubo/B03.tif")}
+
+    red = planner.download_many(primeiro)["red"]
+    green = planner.download_many(segundo)["green"]
+
+    # B03 só era usado pelo segundo; B04 ainda é usado pelo primeiro
+    planner.release(segundo)
+    assert os.path.exists(red) and not os.path.exists(green)
+    planner.release(primeiro)
+    assert not os.path.exists(red)
+    assert planner.refs == {} and planner.futures == {}
+
+    # Pedido depois de liberado: baixado de novo
+    assert os.path.exists(planner.download_many({"green": segundo["green"]})["green"])
+    assert downloader.download_many.call_count == 3
+
+def test_tile_processor_shares_downloads(mock_fetcher, mock_downloader, mocker, tmp_path):
+    from brazil_data_cube.processors.tile_processor import TileProcessor
+
+    mock_fetcher.fetch_image.return_value = {band: asset(f"https://bdc/cubo/{band}.tif") for band in ("B04", "B03", "B02")}
+    mocker.patch("brazil_data_cube.processors.tile_processor.TileGrid.load").return_value.get_bounds.return_value = (0, 0, 1, 1)
+    merge = mocker.patch("brazil_data_cube.processors.tile_processor.ImageProcessor").return_value.merge_rgb_tif
+    # Nenhum tile termina o merge (e libera as bandas) antes de os três terem pedido as bandas
+    merge.side_effect = lambda *args: barreira.wait()
+    barreira = threading.Barrier(3, timeout=5)
+    mocker.patch("brazil_data_cube.processors.tile_processor.TILES_PARANA", ["21JYM", "21JYN", "21KYP"])
+
+    processor = TileProcessor(mock_fetcher, mock_downloader, str(tmp_path), "grade.shp", 20.0,
+                              workers=3, dedupe_downloads=True)
+    processor.result_manager = MagicMock()
+    processor.processar_tiles_parana("S2-16D-2", "2024-01-01", "2024-01-16")
+
+    # Os três tiles caem no mesmo item: cada banda é baixada uma vez
+    nomes = sorted(DownloadPlanner.filename_for(f"https://bdc/cubo/{band}.tif") for band in ("B04", "B03", "B02"))
+    baixados = [filename for call in mock_downloader.download_many.call_args_list for filename in call.args[0]]
+    assert sorted(baixados) == nomes
+    assert merge.call_count == 3
+    # E é apagada uma vez, depois do último merge
+    liberados = [filename for call in mock_downloader.release.call_args_list for filename in call.args[0]]
+    assert sorted(liberados) == nomes
+    assert len(processor.result_manager.gerenciar_resultados.call_args.args[0]) == 3
+
+def test_tile_duration_includes_shared_download(mock_fetcher, mock_downloader, mocker, tmp_path):
+    from brazil_data_cube.processors.tile_processor import TileProcessor
+
+    mock_fetcher.fetch_image.return_value = {band: asset(f"https://bdc/cubo/{band}.tif") for band in ("B04", "B03", "B02")}
+
+    def download_many(assets):
+        time.sleep(0.2)
+        return {filename: filename for filename in assets}
+
+    mock_downloader.download_many.side_effect = download_many
+    mocker.patch("brazil_data_cube.processors.tile_processor.TileGrid.load").return_value.get_bounds.return_value = (0, 0, 1, 1)
+    mocker.patch("brazil_data_cube.processors.tile_processor.ImageProcessor")
+    mocker.patch("brazil_data_cube.processors.tile_processor.TILES_PARANA", ["21JYM", "21JYN"])
+
+    processor = TileProcessor(mock_fetcher, mock_downloader, str(tmp_path), "grade.shp", 20.0,
+                              workers=2, dedupe_downloads=True)
+    processor.result_manager = MagicMock()
+    processor.processar_tiles_parana("S2-16D-2", "2024-01-01", "2024-01-16")
+
+    # O tile que esperou pelo download do outro também conta essa espera
+    duracoes = processor.result_manager.gerenciar_resultados.call_args.args[1]
+    assert [d["Tile_id"] for d in duracoes] == ["21JYM", "21JYN"]
+    assert all(d["duration_sec"] >= 0.2 for d in duracoes)
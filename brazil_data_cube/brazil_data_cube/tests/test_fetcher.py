@@ -37,3 +37,166 @@ def test_fetch_image_valid(mocker):
 
     assert result is not None
     assert "B04" in result
+
+def test_search_batch_assigns_items_to_tiles():
+    def item(item_id, minx, miny, maxx, maxy):
+        mock_item = MagicMock()
+        mock_item.id = item_id
+        mock_item.geometry = {"type": "Polygon", "coordinates": [[(minx, miny), (maxx, miny), (maxx, maxy), (minx, maxy), (minx, miny)]]}
+        return mock_item
+
+    mock_connection = MagicMock()
+    mock_connection.search.return_value.items.return_value = [
+        item("oeste", -55.0, -25.0, -54.0, -24.0),
+        item("leste", -54.0, -25.0, -53.0, -24.0),
+        item("ambos", -54.6, -24.6, -53.4, -24.4),
+    ]
+
+    fetcher = SatelliteImageFetcher(mock_connection)
+    result = fetcher.search_batch("S2_L2A-1", {
+        "21JYM": [-54.6, -24.6, -54.4, -24.4],
+        "22JBS": [-53.6, -24.6, -53.4, -24.4],
+        "22JBT": [-50.0, -20.0, -49.9, -19.9],
+    }, "2024-01-01", "2024-02-01", 20.0)
+
+    assert mock_connection.search.call_count == 1
+    assert "intersects" in mock_connection.search.call_args.kwargs
+    assert [i.id for i in result["21JYM"]] == ["oeste", "ambos"]
+    assert [i.id for i in result["22JBS"]] == ["leste", "ambos"]
+    assert result["22JBT"] == []
+
+def test_sorted_search_stops_at_first_good_item(mocker):
+    def item(item_id, cloud_cover):
+        mock_item = MagicMock()
+        mock_item.properties = {"eo:cloud_cover": cloud_cover}
+        mock_item.assets = {"id": item_id}
+        return mock_item
+
+    first_page = [item("a", 10), item("b", 12)]
+    second_page = [item("c", 15)]
+    consumed = []
+
+    def pages():
+        for page in (first_page, second_page, [item("d", 18)]):
+            consumed.append(page)
+            yield page
+
+    mock_connection = MagicMock()
+    mock_connection.conforms_to.return_value = True
+    mock_connection.search.return_value.pages.side_effect = pages
+    geometry_utils = mocker.patch("brazil_data_cube.utils.geometry_utils.GeometryUtils").return_value
+    geometry_utils.filter_good_geometries.side_effect = lambda items, tile: [i for i in items if i.assets["id"] == "c"]
+
+    fetcher = SatelliteImageFetcher(mock_connection, sorted_search=True)
+    result = fetcher.fetch_image("S2_L2A-1", [-51.0, -25.0, -50.0, -24.0], "2024-01-01", "2024-02-01",
+                                 20.0, "grade.shp", "21JYM")
+
+    assert result == {"id": "c"}
+    assert len(consumed) == 2
+    assert mock_connection.search.call_args.kwargs["sortby"][0]["direction"] == "asc"
+
+def test_sorted_search_falls_back_when_unsorted(mocker):
+    def item(cloud_cover):
+        mock_item = MagicMock()
+        mock_item.properties = {"eo:cloud_cover": cloud_cover}
+        mock_item.assets = {"cloud": cloud_cover}
+        return mock_item
+
+    items = [item(15), item(11)]
+    mock_connection = MagicMock()
+    mock_connection.conforms_to.return_value = True
+    mock_connection.search.return_value.pages.return_value = iter([items])
+    mock_connection.search.return_value.items.return_value = items
+    geometry_utils = mocker.patch("brazil_data_cube.utils.geometry_utils.GeometryUtils").return_value
+    geometry_utils.filter_good_geometries.side_effect = lambda items, tile: list(items)
+
+    fetcher = SatelliteImageFetcher(mock_connection, sorted_search=True)
+    result = fetcher.fetch_image("S2_L2A-1", [-51.0, -25.0, -50.0, -24.0], "2024-01-01", "2024-02-01",
+                                 20.0, "grade.shp", "21JYM")
+
+    assert result == {"cloud": 11}
+    assert "sortby" not in mock_connection.search.call_args.kwargs
+
+def _stac_item(item_id, cloud_cover):
+    import pystac
+    from datetime import datetime
+    item = pystac.Item(item_id, {"type": "Point", "coordinates": [-50.5, -24.5]}, [-50.5, -24.5, -50.5, -24.5],
+                       datetime(2024, 1, 1), {"eo:cloud_cover": cloud_cover})
+    item.add_asset("B04", pystac.Asset(f"https://example.com/{item_id}/B04.tif"))
+    return item
+
+def _sorted_fetch(fetcher):
+    return fetcher.fetch_image("S2_L2A-1", [-51.0, -25.0, -50.0, -24.0], "2024-01-01", "2024-02-01",
+                               20.0, "grade.shp", "21JYM")
+
+def test_sorted_search_rerun_uses_cache(tmp_path, mocker):
+    from brazil_data_cube.downloader.search_cache import SearchCache
+
+    mock_connection = MagicMock()
+    mock_connection.conforms_to.return_value = True
+    mock_connection.search.return_value.pages.side_effect = lambda: iter([[_stac_item("a", 10), _stac_item("b", 12)]])
+    geometry_utils = mocker.patch("brazil_data_cube.utils.geometry_utils.GeometryUtils").return_value
+    geometry_utils.filter_good_geometries.side_effect = lambda items, tile: [i for i in items if i.id == "b"]
+
+    for _ in range(2):
+        fetcher = SatelliteImageFetcher(mock_connection, SearchCache(tmp_path), sorted_search=True)
+        result = _sorted_fetch(fetcher)
+        assert result["B04"].href == "https://example.com/b/B04.tif"
+
+    assert mock_connection.search.call_count == 1
+
+def test_full_scan_in_cache_skips_sorted_search(tmp_path, mocker):
+    from brazil_data_cube.downloader.search_cache import SearchCache
+
+    cache = SearchCache(tmp_path)
+    mock_connection = MagicMock()
+    geometry_utils = mocker.patch("brazil_data_cube.utils.geometry_utils.GeometryUtils").return_value
+    geometry_utils.filter_good_geometries.side_effect = lambda items, tile: list(items)
+    fetcher = SatelliteImageFetcher(mock_connection, cache, sorted_search=True)
+    filt = fetcher._build_filter("S2_L2A-1", 20.0)
+    params = fetcher._search_params("S2_L2A-1", [-51.0, -25.0, -50.0, -24.0], "2024-01-01", "2024-02-01", filt)
+    cache.put(SearchCache.make_key(params), [_stac_item("a", 15), _stac_item("b", 11)], params)
+    get = mocker.spy(cache, "get")
+
+    result = _sorted_fetch(fetcher)
+
+    assert result["B04"].href == "https://example.com/b/B04.tif"
+    mock_connection.search.assert_not_called()
+    assert get.call_count == 1
+
+def test_transient_error_keeps_sortby_enabled(mocker):
+    import requests
+
+    items = [_stac_item("a", 10)]
+    mock_connection = MagicMock()
+    mock_connection.conforms_to.return_value = True
+    mock_connection.search.return_value.pages.side_effect = [requests.ConnectionError("reset"), iter([items])]
+    mock_connection.search.return_value.items.return_value = items
+    geometry_utils = mocker.patch("brazil_data_cube.utils.geometry_utils.GeometryUtils").return_value
+    geometry_utils.filter_good_geometries.side_effect = lambda items, tile: list(items)
+    fetcher = SatelliteImageFetcher(mock_connection, sorted_search=True)
+
+    assert _sorted_fetch(fetcher) is not None
+    assert "sortby" not in mock_connection.search.call_args.kwargs
+
+    assert _sorted_fetch(fetcher) is not None
+    assert "sortby" in mock_connection.search.call_args.kwargs
+
+def test_sortby_rejected_by_api_is_disabled(mocker):
+    from pystac_client.exceptions import APIError
+
+    error = APIError("sortby não suportado")
+    error.status_code = 400
+    items = [_stac_item("a", 10)]
+    mock_connection = MagicMock()
+    mock_connection.conforms_to.return_value = True
+    mock_connection.search.return_value.pages.side_effect = error
+    mock_connection.search.return_value.items.return_value = items
+    geometry_utils = mocker.patch("brazil_data_cube.utils.geometry_utils.GeometryUtils").return_value
+    geometry_utils.filter_good_geometries.side_effect = lambda items, tile: list(items)
+    fetcher = SatelliteImageFetcher(mock_connection, sorted_search=True)
+
+    for _ in range(2):
+        assert _sorted_fetch(fetcher) is not None
+    sorted_calls = [call for call in mock_connection.search.call_args_list if "sortby" in call.kwargs]
+    assert len(sorted_calls) == 1
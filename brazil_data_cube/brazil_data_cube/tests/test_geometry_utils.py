@@ -0,0 +1,33 @@
+# tests/test_geometry_utils.py
+import geopandas as gpd
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from shapely.geometry import box, mapping
+from brazil_data_cube.utils.geometry_utils import GeometryUtils
+from brazil_data_cube.utils.tile_grid import TileGrid
+
+@pytest.fixture
+def grade(tmp_path):
+    path = tmp_path / "grade.shp"
+    gpd.GeoDataFrame({"NAME": ["21JYM"], "geometry": [box(-55.0, -25.0, -54.0, -24.0)]}, crs="EPSG:4326").to_file(path)
+    TileGrid.clear_cache()
+    yield str(path)
+    TileGrid.clear_cache()
+
+def item(minx, miny, maxx, maxy):
+    return SimpleNamespace(geometry=mapping(box(minx, miny, maxx, maxy)))
+
+def test_coverage_ratios(grade):
+    items = [
+        item(-55.0, -25.0, -54.0, -24.0),  # cobre o tile inteiro
+        item(-55.0, -25.0, -54.5, -24.0),  # metade
+        item(-55.0, -25.0, -54.1, -24.0),  # 90%
+        item(-50.0, -20.0, -49.0, -19.0),  # longe (descartado pelo bbox)
+    ]
+    utils = GeometryUtils(grade)
+
+    np.testing.assert_allclose(utils.coverage_ratios(items, "21JYM"), [1.0, 0.5, 0.9, 0.0])
+    assert utils.filter_good_geometries(items, "21JYM") == [items[0], items[2]]
+    assert [utils.is_good_geometry(i, "21JYM") for i in items] == [True, False, True, False]
+    assert utils.filter_good_geometries(items, "XXXXX") == []
@@ -0,0 +1,32 @@
+# tests/test_http_transport.py
+from brazil_data_cube.utils.http_transport import HttpTransport
+
+def test_adapter_defaults():
+    transport = HttpTransport(pool_maxsize=4, connect_timeout=2, read_timeout=30, retries=5)
+    adapter = transport.session.get_adapter("https://data.inpe.br")
+
+    assert adapter.timeout == (2, 30)
+    assert adapter.max_retries.total == 5
+    assert 503 in adapter.max_retries.status_forcelist
+    assert "POST" in adapter.max_retries.allowed_methods
+
+def test_default_timeout_is_applied(mocker):
+    transport = HttpTransport(connect_timeout=2, read_timeout=30)
+    send = mocker.patch("requests.adapters.HTTPAdapter.send")
+    adapter = transport.session.get_adapter("https://example.com")
+    request = mocker.MagicMock()
+
+    adapter.send(request)
+    assert send.call_args.kwargs["timeout"] == (2, 30)
+
+    adapter.send(request, timeout=5)
+    assert send.call_args.kwargs["timeout"] == 5
+
+def test_stac_io_and_downloader_share_session(tmp_path):
+    from brazil_data_cube.downloader.image_downloader import ImagemDownloader
+
+    transport = HttpTransport()
+    downloader = ImagemDownloader(str(tmp_path), transport=transport)
+
+    assert transport.stac_io().session is transport.session
+    assert downloader.session is transport.session
@@ -0,0 +1,80 @@
+# tests/test_image_downloader.py
+import os
+import threading
+from types import SimpleNamespace
+import pytest
+from brazil_data_cube.downloader.image_downloader import ImagemDownloader
+
+BANDAS = {"red": "B04", "green": "B03", "blue": "B02"}
+
+def test_download_many_returns_every_band(range_server, tmp_path):
+    for asset_key in BANDAS.values():
+        range_server.files[f"/{asset_key}.tif"] = os.urandom(40_000)
+    downloader = ImagemDownloader(str(tmp_path))
+
+    caminhos = downloader.download_many({
+        f"tile_{banda}": SimpleNamespace(href=f"{range_server.url}/{asset_key}.tif") for banda, asset_key in BANDAS.items()
+    })
+
+    assert caminhos == {f"tile_{banda}": str(tmp_path / f"tile_{banda}") for banda in BANDAS}
+    for banda, asset_key in BANDAS.items():
+        with open(caminhos[f"tile_{banda}"], "rb") as f:
+            assert f.read() == range_server.files[f"/{asset_key}.tif"]
+
+def test_download_many_downloads_bands_in_parallel(mocker, tmp_path):
+    downloader = ImagemDownloader(str(tmp_path), pool_size=3)
+    # Só passa se as três bandas estiverem sendo baixadas ao mesmo tempo
+    barreira = threading.Barrier(3, timeout=5)
+
+    def baixar(href, filepath, *args):
+        barreira.wait()
+        return filepath
+
+    baixar_arquivo = mocker.patch.object(downloader, "_baixar_arquivo", side_effect=baixar)
+
+    caminhos = downloader.download_many({banda: SimpleNamespace(href=f"https://bdc/{banda}.tif") for banda in BANDAS})
+
+    assert caminhos == {banda: os.path.join(str(tmp_path), banda) for banda in BANDAS}
+    assert sorted(call.args[0] for call in baixar_arquivo.call_args_list) == sorted(
+        f"https://bdc/{banda}.tif" for banda in BANDAS)
+
+def test_download_many_fails_when_one_band_fails(mocker, tmp_path):
+    downloader = ImagemDownloader(str(tmp_path))
+
+    def baixar(href, filepath, *args):
+        if "B03" in href:
+            raise ConnectionError("conexão recusada")
+        return filepath
+
+    mocker.patch.object(downloader, "_baixar_arquivo", side_effect=baixar)
+
+    with pytest.raises(RuntimeError, match="Erro ao fazer download das imagens: conexão recusada"):
+        downloader.download_many({banda: SimpleNamespace(href=f"https://bdc/{asset_key}.tif")
+                                  for banda, asset_key in BANDAS.items()})
+
+def test_download_many_rejects_missing_asset(mocker, tmp_path):
+    downloader = ImagemDownloader(str(tmp_path))
+    baixar = mocker.patch.object(downloader, "_baixar_arquivo")
+
+    with pytest.raises(RuntimeError, match="Asset inválido"):
+        downloader.download_many({"red": SimpleNamespace(href="https://bdc/B04.tif"), "green": None})
+    baixar.assert_not_called()
+
+def test_download_many_reports_http_error(range_server, tmp_path):
+    range_server.files["/B04.tif"] = os.urandom(1000)
+    downloader = ImagemDownloader(str(tmp_path))
+
+    with pytest.raises(RuntimeError, match="404"):
+        downloader.download_many({"red": SimpleNamespace(href=f"{range_server.url}/B04.tif"),
+                                  "green": SimpleNamespace(href=f"{range_server.url}/inexistente.tif")})
+
+def test_release_removes_downloaded_bands(range_server, tmp_path):
+    range_server.files["/B04.tif"] = os.urandom(1000)
+    downloader = ImagemDownloader(str(tmp_path))
+    assets = {"tile_red": SimpleNamespace(href=f"{range_server.url}/B04.tif")}
+    caminhos = downloader.download_many(assets)
+
+    downloader.release(assets)
+    downloader.release(assets)  # Já apagado: sem erro
+
+    assert not os.path.exists(caminhos["tile_red"])
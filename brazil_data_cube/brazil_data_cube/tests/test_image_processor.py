@@ -0,0 +1,136 @@
+# tests/test_image_processor.py
+import numpy as np
+import pytest
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from brazil_data_cube.processors.image_processor import ImageProcessor
+from brazil_data_cube.utils.output_profiles import OutputProfile
+
+def merge_rgb_original(paths, satelite):
+    """merge_rgb_tif original: np.nanpercentile sobre a banda inteira em float."""
+    bands = []
+    for path in paths:
+        with rasterio.open(path) as src:
+            band = src.read(1).astype(float)
+        band[band == 0] = np.nan
+        bands.append(band)
+
+    def normalize_soft(array):
+        array_min, array_max = np.nanmin(array), np.nanmax(array)
+        if array_max - array_min == 0:
+            return np.zeros_like(array, dtype=np.uint8)
+        scaled = (array - array_min) / (array_max - array_min) * 255
+        return np.nan_to_num(scaled, nan=0).astype(np.uint8)
+
+    def normalize_percentile(array):
+        p2, p98 = np.nanpercentile(array, (2, 98))
+        array = np.clip(array, p2, p98)
+        if np.nanmax(array) - np.nanmin(array) == 0:
+            return np.zeros_like(array, dtype=np.uint8)
+        scaled = (array - np.nanmin(array)) / (np.nanmax(array) - np.nanmin(array)) * 255
+        return np.nan_to_num(scaled, nan=0).astype(np.uint8)
+
+    norm_func = normalize_soft if satelite == 'S2-16D-2' else normalize_percentile
+    normalized = [norm_func(band) for band in bands]
+    nan_mask = np.isnan(bands[0]) | np.isnan(bands[1]) | np.isnan(bands[2])
+    for band in normalized:
+        band[nan_mask] = 0
+    return np.stack(normalized)
+
+def _write_bands(tmp_path, data, dtype):
+    paths = []
+    for name, band in zip(("red", "green", "blue"), data):
+        path = str(tmp_path / f"{name}.tif")
+        profile = {"driver": "GTiff", "width": band.shape[1], "height": band.shape[0], "count": 1,
+                   "dtype": dtype, "crs": "EPSG:32722", "transform": from_origin(600000, 7300000, 10, 10)}
+        with rasterio.open(path, "w", **profile) as dst:
+            dst.write(band.astype(dtype), 1)
+        paths.append(path)
+    return paths
+
+def _merge(tmp_path, paths, satelite):
+    output = str(tmp_path / "rgb.tif")
+    ImageProcessor(satelite, output_profile=OutputProfile("gtiff")).merge_rgb_tif(*paths, output)
+    with rasterio.open(output) as dst:
+        return dst.read()
+
+@pytest.mark.parametrize("satelite", ["S2_L2A-1", "S2-16D-2"])
+def test_int32_band_matches_original(tmp_path, satelite):
+    data = np.random.default_rng(0).integers(1, 2_000_000_000, size=(3, 600, 530), dtype=np.int64)
+    data[:, :, :7] = 0
+    paths = _write_bands(tmp_path, data, "int32")
+
+    result = _merge(tmp_path, paths, satelite)
+
+    assert np.array_equal(result, merge_rgb_original(paths, satelite))
+
+@pytest.mark.parametrize("satelite", ["S2_L2A-1", "S2-16D-2"])
+def test_float_reflectance_band_matches_original(tmp_path, satelite):
+    data = np.random.default_rng(1).uniform(0.01, 0.6, size=(3, 600, 530))
+    data[:, :9, :] = 0
+    paths = _write_bands(tmp_path, data, "float32")
+
+    result = _merge(tmp_path, paths, satelite)
+
+    assert result.any()
+    assert np.array_equal(result, merge_rgb_original(paths, satelite))
+
+@pytest.mark.parametrize("dtype", ["uint16", "float32"])
+@pytest.mark.parametrize("satelite", ["S2_L2A-1", "S2-16D-2"])
+def test_merge_rgb_matches_original(tmp_path, dtype, satelite):
+    # Cena maior que um bloco, com nodata diferente em cada banda
+    rng = np.random.default_rng(2)
+    data = rng.integers(1, 12000, size=(3, 700, 530)).astype(dtype)
+    data[0, :, :11] = 0
+    data[1, :13, :] = 0
+    data[2, rng.random((700, 530)) < 0.01] = 0
+    if dtype == "float32":
+        data = data / 10000
+        data[1, 600:, 500:] = np.nan
+    paths = _write_bands(tmp_path, data, dtype)
+
+    result = _merge(tmp_path, paths, satelite)
+
+    assert np.array_equal(result, merge_rgb_original(paths, satelite))
+
+@pytest.mark.parametrize("target_resolution", [None, 10, 5])
+def test_output_grid_keeps_native_grid(tmp_path, target_resolution):
+    paths = _write_bands(tmp_path, np.ones((3, 700, 530)), "uint16")
+
+    with rasterio.open(paths[0]) as src:
+        grid = ImageProcessor("S2_L2A-1", target_resolution)._output_grid(src)
+
+    assert grid == (530, 700, from_origin(600000, 7300000, 10, 10))
+
+def test_output_grid_coarser_resolution_covers_the_same_extent(tmp_path):
+    paths = _write_bands(tmp_path, np.ones((3, 700, 530)), "uint16")
+
+    with rasterio.open(paths[0]) as src:
+        width, height, transform = ImageProcessor("S2_L2A-1", 60)._output_grid(src)
+
+    assert (width, height) == (88, 117)
+    assert transform * (0, 0) == src.transform * (0, 0)
+    assert transform * (width, height) == pytest.approx(src.transform * (src.width, src.height))
+
+def test_coarse_read_uses_the_overview(tmp_path):
+    # Overviews por média diferem de uma leitura decimada: a igualdade prova que o nível foi usado
+    data = np.random.default_rng(3).integers(1, 12000, size=(3, 1024, 1024))
+    paths = _write_bands(tmp_path, data, "uint16")
+    for path in paths:
+        with rasterio.open(path, "r+") as dst:
+            dst.build_overviews([2, 4, 8], Resampling.average)
+
+    processor = ImageProcessor("S2_L2A-1", 40, output_profile=OutputProfile("gtiff"))
+    output = str(tmp_path / "rgb.tif")
+    processor.merge_rgb_tif(*paths, output)
+
+    with rasterio.open(output) as result:
+        assert (result.width, result.height) == (256, 256)
+        assert result.res == (40, 40)
+    with rasterio.open(paths[0]) as src:
+        bloco = processor._read_block(src, Window(0, 0, 256, 256), 256, 256)
+    with rasterio.open(paths[0], overview_level=1) as overview:
+        assert np.array_equal(bloco, overview.read(1))
+    assert not np.array_equal(bloco, data[0, ::4, ::4])
@@ -0,0 +1,34 @@
+# tests/test_metrics.py
+import json
+import pytest
+from brazil_data_cube.utils.metrics import MetricsRegistry
+
+def test_counters_summaries_and_gauges():
+    registry = MetricsRegistry()
+    registry.inc("bdc_download_bytes_total", 100)
+    registry.inc("bdc_download_bytes_total", 50)
+    registry.observe("bdc_search_seconds", 0.5, strategy="full")
+    registry.observe("bdc_search_seconds", 1.5, strategy="full")
+    registry.set("bdc_download_throughput_bytes_per_second", 2048.0, asset="21JYM_red")
+
+    data = registry.to_json()
+    assert data["bdc_download_bytes_total"] == [{"labels": {}, "value": 150}]
+    assert data["bdc_search_seconds"][0]["value"] == {"count": 2, "sum": 2.0, "min": 0.5, "max": 1.5}
+
+    text = registry.to_prometheus()
+    assert "# TYPE bdc_search_seconds summary" in text
+    assert 'bdc_search_seconds_count{strategy="full"} 2' in text
+    assert 'bdc_download_throughput_bytes_per_second{asset="21JYM_red"} 2048.0' in text
+
+def test_timer_records_failures_and_dump(tmp_path):
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError):
+        with registry.timer("bdc_merge_seconds"):
+            raise ValueError("falhou")
+    registry.observe_transfer(1000, 0.1, 2.0, asset="x")
+
+    path = registry.dump(str(tmp_path / "metricas.json"))
+    data = json.loads(open(path).read())
+    assert data["bdc_merge_seconds"][0]["value"]["count"] == 1
+    assert data["bdc_download_throughput_bytes_per_second"][0]["value"] == 500.0
+    assert data["bdc_download_ttfb_seconds"][0]["value"]["sum"] == 0.1
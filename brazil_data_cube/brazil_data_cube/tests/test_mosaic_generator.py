@@ -0,0 +1,176 @@
+# tests/test_mosaic_generator.py
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from brazil_data_cube.processors.mosaic_generator import MosaicGenerator
+from brazil_data_cube.processors.mosaic_grid import MosaicGrid
+from brazil_data_cube.processors.vrt_materializer import VrtMaterializer
+from brazil_data_cube.processors.parallel_mosaic import ParallelMosaicBuilder
+from brazil_data_cube.utils.output_profiles import OutputProfile
+
+CRS = "EPSG:32721"
+
+def _write_tile(path, left, top, width, height, seed, nodata=0, res=10):
+    data = np.random.default_rng(seed).integers(1, 4000, size=(3, height, width)).astype(np.uint16)
+    # Bordas sem dado, como nas cenas Sentinel recortadas (0 nos tiles sem nodata)
+    data[:, :, :5] = 0 if nodata is None else nodata
+    profile = {"driver": "GTiff", "width": width, "height": height, "count": 3, "dtype": "uint16",
+               "crs": CRS, "transform": from_origin(left, top, res, res), "nodata": nodata}
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data)
+    return str(path)
+
+def _tiles(tmp_path):
+    return [
+        _write_tile(tmp_path / "a.tif", 500000, 7200000, 70, 50, 1),
+        _write_tile(tmp_path / "b.tif", 500400, 7199800, 60, 55, 2),
+        _write_tile(tmp_path / "c.tif", 499700, 7199600, 40, 30, 3),
+    ]
+
+def _offset_tiles(tmp_path):
+    # Origens fora dos múltiplos da resolução
+    return [
+        _write_tile(tmp_path / "a.tif", 500000, 7200000, 70, 50, 1),
+        _write_tile(tmp_path / "b.tif", 500403.7, 7199796.2, 60, 55, 2),
+        _write_tile(tmp_path / "c.tif", 499706.4, 7199601.9, 40, 30, 3),
+    ]
+
+def _misaligned_tiles(tmp_path):
+    # Origens deslocadas e um tile em outra resolução
+    return _offset_tiles(tmp_path) + [_write_tile(tmp_path / "d.tif", 500103.3, 7199700.1, 20, 16, 4, res=20)]
+
+@pytest.mark.parametrize("make_tiles", [_tiles, _misaligned_tiles])
+@pytest.mark.parametrize("block_size", [16, 64, 256])
+def test_streaming_mosaic_matches_in_memory_merge(tmp_path, make_tiles, block_size):
+    tiles = make_tiles(tmp_path)
+    MosaicGenerator(CRS).mosaic_tiles(tiles, str(tmp_path / "memory.tif"))
+    MosaicGenerator(CRS, streaming=True, block_size=block_size,
+                    output_profile=OutputProfile("gtiff")).mosaic_tiles(tiles, str(tmp_path / "stream.tif"))
+
+    with rasterio.open(tmp_path / "memory.tif") as expected, rasterio.open(tmp_path / "stream.tif") as result:
+        assert result.transform == expected.transform
+        assert result.shape == expected.shape
+        assert result.nodata == expected.nodata
+        assert result.profile["tiled"]
+        assert result.block_shapes[0] == (block_size, block_size)
+        assert np.array_equal(result.read(), expected.read())
+
+def test_grid_blocks_cover_output(tmp_path):
+    tiles = _tiles(tmp_path)
+    sources = [rasterio.open(path) for path in tiles]
+    try:
+        grid = MosaicGrid.from_sources(sources)
+        blocks = list(grid.blocks(32))
+
+        assert sum(block.width * block.height for block in blocks) == grid.width * grid.height
+        assert grid.source_window(sources[0], blocks[-1]) is None
+    finally:
+        for src in sources:
+            src.close()
+
+@pytest.mark.parametrize("make_tiles", [_tiles, _offset_tiles])
+def test_virtual_mosaic_matches_merge_and_materializes(tmp_path, make_tiles):
+    tiles = make_tiles(tmp_path)
+    MosaicGenerator(CRS).mosaic_tiles(tiles, str(tmp_path / "memory.tif"))
+    vrt_path = MosaicGenerator(CRS, virtual=True).mosaic_tiles(tiles, str(tmp_path / "virtual.tif"))
+
+    assert vrt_path == str(tmp_path / "virtual.vrt")
+    with rasterio.open(tmp_path / "memory.tif") as expected, rasterio.open(vrt_path) as result:
+        assert result.transform == expected.transform
+        assert np.array_equal(result.read(), expected.read())
+
+    # Blocos internos pequenos para que o mosaico de teste tenha overviews
+    cog_path = VrtMaterializer(workers=3, block_size=16,
+                               output_profile=OutputProfile("cog-deflate", block_size=32)).materialize(vrt_path, str(tmp_path / "cog.tif"))
+
+    with rasterio.open(tmp_path / "memory.tif") as expected, rasterio.open(cog_path) as result:
+        assert result.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+        assert result.overviews(1)
+        assert np.array_equal(result.read(), expected.read())
+    assert not (tmp_path / "cog.tif.tmp.tif").exists()
+
+def test_virtual_mosaic_without_nodata_matches_merge(tmp_path):
+    # Sem nodata, o merge trata o 0 como vazio: as bordas do primeiro tile mostram o que está embaixo
+    tiles = [_write_tile(tmp_path / "a.tif", 500000, 7200000, 70, 50, 1, nodata=None),
+             _write_tile(tmp_path / "b.tif", 499800, 7199900, 60, 55, 2, nodata=None)]
+    MosaicGenerator(CRS).mosaic_tiles(tiles, str(tmp_path / "memory.tif"))
+    vrt_path = MosaicGenerator(CRS, virtual=True).mosaic_tiles(tiles, str(tmp_path / "virtual.tif"))
+
+    assert vrt_path == str(tmp_path / "virtual.vrt")
+    with rasterio.open(tmp_path / "memory.tif") as expected, rasterio.open(vrt_path) as result:
+        assert result.nodata is expected.nodata is None
+        assert np.array_equal(result.read(), expected.read())
+
+def test_virtual_mosaic_falls_back_for_mixed_nodata(tmp_path):
+    tiles = [_write_tile(tmp_path / "a.tif", 500000, 7200000, 70, 50, 1, nodata=None),
+             _write_tile(tmp_path / "b.tif", 499800, 7199900, 60, 55, 2, nodata=7)]
+    MosaicGenerator(CRS).mosaic_tiles(tiles, str(tmp_path / "memory.tif"))
+    output = MosaicGenerator(CRS, virtual=True).mosaic_tiles(tiles, str(tmp_path / "virtual.tif"))
+
+    assert output == str(tmp_path / "virtual.tif")
+    with rasterio.open(tmp_path / "memory.tif") as expected, rasterio.open(output) as result:
+        assert np.array_equal(result.read(), expected.read())
+
+def test_virtual_mosaic_falls_back_for_mixed_resolutions(tmp_path):
+    tiles = _misaligned_tiles(tmp_path)
+    MosaicGenerator(CRS).mosaic_tiles(tiles, str(tmp_path / "memory.tif"))
+    output = MosaicGenerator(CRS, virtual=True).mosaic_tiles(tiles, str(tmp_path / "virtual.tif"))
+
+    assert output == str(tmp_path / "virtual.tif")
+    with rasterio.open(tmp_path / "memory.tif") as expected, rasterio.open(output) as result:
+        assert result.driver == "GTiff"
+        assert np.array_equal(result.read(), expected.read())
+
+def test_parallel_mosaic_matches_in_memory_merge(tmp_path):
+    tiles = _tiles(tmp_path)
+    MosaicGenerator(CRS).mosaic_tiles(tiles, str(tmp_path / "memory.tif"))
+    MosaicGenerator(CRS, streaming=True, mosaic_workers=2).mosaic_tiles(tiles, str(tmp_path / "parallel.tif"))
+
+    with rasterio.open(tmp_path / "memory.tif") as expected, rasterio.open(tmp_path / "parallel.tif") as result:
+        assert result.transform == expected.transform
+        assert np.array_equal(result.read(), expected.read())
+
+def test_parallel_chunks_match_merge_for_misaligned_tiles(tmp_path):
+    tiles = _misaligned_tiles(tmp_path)
+    MosaicGenerator(CRS).mosaic_tiles(tiles, str(tmp_path / "memory.tif"))
+    sources = [rasterio.open(path) for path in tiles]
+    try:
+        output = ParallelMosaicBuilder(workers=2, chunk_size=32).build(
+            sources, str(tmp_path / "chunks.tif"), {"crs": CRS}, OutputProfile("gtiff"))
+    finally:
+        for src in sources:
+            src.close()
+
+    with rasterio.open(tmp_path / "memory.tif") as expected, rasterio.open(output) as result:
+        assert np.array_equal(result.read(), expected.read())
+
+def test_mosaic_workers_without_streaming_uses_in_memory_merge(tmp_path, mocker):
+    tiles = _tiles(tmp_path)
+    build = mocker.patch.object(ParallelMosaicBuilder, "build")
+
+    MosaicGenerator(CRS, mosaic_workers=4).mosaic_tiles(tiles, str(tmp_path / "memory.tif"))
+
+    build.assert_not_called()
+    assert (tmp_path / "memory.tif").exists()
+
+def test_parallel_chunks_only_get_intersecting_tiles(tmp_path):
+    tiles = _tiles(tmp_path)
+    sources = [rasterio.open(path) for path in tiles]
+    try:
+        builder = ParallelMosaicBuilder(workers=2, chunk_size=32)
+        grid = MosaicGrid.from_sources(sources)
+        chunks = builder.plan(grid, sources)
+
+        assert any(len(paths) < len(tiles) for _, paths in chunks)
+        for chunk, paths in chunks:
+            assert paths == [src.name for src in sources if grid.intersects(src, chunk)]
+
+        output = builder.build(sources, str(tmp_path / "chunks.tif"), {"crs": CRS}, OutputProfile("gtiff"))
+    finally:
+        for src in sources:
+            src.close()
+
+    with rasterio.open(output) as result, rasterio.open(tiles[0]) as first:
+        assert result.crs.to_epsg() == 32721
+        assert result.nodata == first.nodata
@@ -0,0 +1,31 @@
+# tests/test_normalization.py
+import numpy as np
+import pytest
+from brazil_data_cube.processors.normalization import BandNormalizer
+
+def normalizacao_float(array, lo, hi, clip):
+    array = array.astype(float)
+    array[array == 0] = np.nan
+    if clip:
+        array = np.clip(array, lo, hi)
+    scaled = (array - lo) / (hi - lo) * 255
+    return np.nan_to_num(scaled, nan=0).astype(np.uint8)
+
+@pytest.mark.parametrize("dtype", ["uint16", "int16", "float32"])
+@pytest.mark.parametrize("clip", [True, False])
+def test_normalize_matches_float_path(dtype, clip):
+    block = np.random.default_rng(0).integers(0, 12000, size=(64, 64)).astype(dtype)
+    valid = block[block != 0].astype(float)
+    lo, hi = (np.percentile(valid, 2), np.percentile(valid, 98)) if clip else (valid.min(), valid.max())
+
+    result = BandNormalizer(lo, hi, clip, dtype).normalize(block)
+
+    assert result.dtype == np.uint8
+    assert np.array_equal(result, normalizacao_float(block, lo, hi, clip))
+
+def test_normalize_empty_band():
+    block = np.zeros((8, 8), dtype=np.uint16)
+
+    result = BandNormalizer(None, None, True, "uint16").normalize(block)
+
+    assert not result.any()
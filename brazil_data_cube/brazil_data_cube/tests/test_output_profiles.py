@@ -0,0 +1,63 @@
+# tests/test_output_profiles.py
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from brazil_data_cube.utils.output_profiles import OutputProfile
+
+PROFILE = {"driver": "GTiff", "width": 1000, "height": 800, "count": 3, "dtype": "uint8",
+           "crs": "EPSG:32721", "transform": from_origin(500000, 7200000, 10, 10), "nodata": 0}
+
+def _data():
+    return np.random.default_rng(0).integers(1, 255, size=(3, 800, 1000)).astype(np.uint8)
+
+@pytest.mark.parametrize("name, compression", [("cog-deflate", "DEFLATE"), ("cog-zstd", "ZSTD")])
+def test_cog_profile_writes_tiled_compressed_cog_with_overviews(tmp_path, name, compression):
+    path = str(tmp_path / "out.tif")
+    data = _data()
+
+    with OutputProfile(name, block_size=256).open(path, **PROFILE) as dst:
+        for row in range(0, 800, 200):
+            window = rasterio.windows.Window(0, row, 1000, 200)
+            dst.write(data[:, row:row + 200], window=window)
+
+    with rasterio.open(path) as src:
+        structure = src.tags(ns="IMAGE_STRUCTURE")
+        assert structure["LAYOUT"] == "COG"
+        assert structure["COMPRESSION"] == compression
+        assert structure["PREDICTOR"] == "2"
+        assert src.block_shapes[0] == (256, 256)
+        assert src.overviews(1)
+        assert np.array_equal(src.read(), data)
+    assert not (tmp_path / "out.tif.tmp.tif").exists()
+
+def test_gtiff_profile_keeps_plain_layout(tmp_path):
+    path = str(tmp_path / "out.tif")
+
+    with OutputProfile("gtiff").open(path, **PROFILE) as dst:
+        dst.write(_data())
+
+    with rasterio.open(path) as src:
+        assert src.compression is None
+        assert not src.overviews(1)
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        OutputProfile("jpeg")
+
+def test_cog_profile_accepts_striped_source_profile(tmp_path):
+    # Profile copiado de um GeoTIFF em faixas: blocos de uma linha inteira por poucas linhas
+    source = str(tmp_path / "faixas.tif")
+    with rasterio.open(source, "w", **PROFILE) as dst:
+        dst.write(_data())
+    with rasterio.open(source) as src:
+        profile = src.profile
+    assert not profile.get("tiled")
+
+    path = str(tmp_path / "out.tif")
+    with OutputProfile("cog-deflate").open(path, **profile) as dst:
+        dst.write(_data())
+
+    with rasterio.open(path) as src:
+        assert src.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+        assert np.array_equal(src.read(), _data())
@@ -0,0 +1,51 @@
+# tests/test_reprojector.py
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from brazil_data_cube.processors.mosaic_generator import MosaicGenerator
+from brazil_data_cube.processors.reprojector import TileReprojector
+
+def _write_tile(path, crs, left, top, size=64):
+    data = np.random.default_rng(0).integers(1, 255, size=(3, size, size)).astype(np.uint8)
+    profile = {"driver": "GTiff", "width": size, "height": size, "count": 3, "dtype": "uint8",
+               "crs": crs, "transform": from_origin(left, top, 10, 10), "nodata": 0}
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data)
+    return str(path)
+
+def test_reprojected_grid_is_aligned_to_target_resolution(tmp_path):
+    # Tile da zona 22S, perto da divisa com a 21S
+    src = _write_tile(tmp_path / "zona22.tif", "EPSG:32722", 180000, 7200000)
+
+    result = TileReprojector("EPSG:32721", workers=2).reproject_many([src])
+
+    out = result[src]
+    assert out == str(tmp_path / "zona22_reprojected.tif")
+    assert not (tmp_path / "zona22_reprojected.tif.part").exists()
+    with rasterio.open(out) as dst:
+        assert dst.crs.to_epsg() == 32721
+        assert dst.res == (10, 10)
+        assert dst.transform.c % 10 == 0 and dst.transform.f % 10 == 0
+        data = dst.read()
+        assert set(np.unique(data)) - {0}
+
+def test_failed_reprojection_is_reported_without_stopping(tmp_path):
+    good = _write_tile(tmp_path / "good.tif", "EPSG:32722", 180000, 7200000)
+    missing = str(tmp_path / "missing.tif")
+
+    result = TileReprojector("EPSG:32721", workers=2).reproject_many([good, missing])
+
+    assert result[missing] is None
+    assert result[good] is not None
+
+def test_mosaic_reprojects_tiles_in_other_crs(tmp_path):
+    tiles = [
+        _write_tile(tmp_path / "a.tif", "EPSG:32721", 800000, 7200000),
+        _write_tile(tmp_path / "b.tif", "EPSG:32722", 180000, 7200000),
+    ]
+
+    output = MosaicGenerator("EPSG:32721", reproject_workers=2).mosaic_tiles(tiles, str(tmp_path / "mosaic.tif"))
+
+    assert (tmp_path / "b_reprojected.tif").exists()
+    with rasterio.open(output) as dst:
+        assert dst.crs.to_epsg() == 32721
@@ -0,0 +1,72 @@
+# tests/test_search_cache.py
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pystac
+from brazil_data_cube.downloader.search_cache import SearchCache
+
+def make_item(item_id, cloud_cover):
+    item = pystac.Item(item_id, {"type": "Point", "coordinates": [-54.5, -24.5]}, [-54.5, -24.5, -54.5, -24.5],
+                       datetime(2024, 1, 1), {"eo:cloud_cover": cloud_cover})
+    item.add_asset("B04", pystac.Asset("https://example.com/B04.tif"))
+    return item
+
+PARAMS = {"collection": "S2_L2A-1", "bbox": [-55.0, -25.0, -54.0, -24.0],
+          "datetime": ["2024-01-01", "2024-01-31"], "filter": {"op": "lte"}}
+
+def test_key_ignores_param_order():
+    reordered = dict(reversed(list(PARAMS.items())))
+    assert SearchCache.make_key(PARAMS) == SearchCache.make_key(reordered)
+    assert SearchCache.make_key(PARAMS) != SearchCache.make_key({**PARAMS, "bbox": [0, 0, 1, 1]})
+
+def test_roundtrip(tmp_path):
+    cache = SearchCache(tmp_path)
+    key = SearchCache.make_key(PARAMS)
+
+    assert cache.get(key) is None
+    cache.put(key, [make_item("a", 5.0), make_item("b", 12.0)], PARAMS)
+
+    items = cache.get(key)
+    assert [item.id for item in items] == ["a", "b"]
+    assert items[1].properties["eo:cloud_cover"] == 12.0
+    assert items[0].assets["B04"].href == "https://example.com/B04.tif"
+
+def test_concurrent_puts_of_same_key(tmp_path):
+    cache = SearchCache(tmp_path)
+    key = SearchCache.make_key(PARAMS)
+    items = [make_item(str(i), float(i)) for i in range(50)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(cache.put, key, items, PARAMS) for _ in range(32)]:
+            future.result()
+
+    assert len(cache.get(key)) == 50
+    assert os.listdir(tmp_path) == [f"{key}.json"]
+
+def test_ttl_refresh_and_invalidate(tmp_path):
+    key = SearchCache.make_key(PARAMS)
+    SearchCache(tmp_path).put(key, [make_item("a", 5.0)])
+
+    expired = time.time() - 7200
+    path = os.path.join(tmp_path, f"{key}.json")
+    os.utime(path, (expired, expired))
+    assert SearchCache(tmp_path, ttl_seconds=3600).get(key) is not None  # idade vem do conteúdo, não do mtime
+
+    assert SearchCache(tmp_path, ttl_seconds=0).get(key) is None
+    assert SearchCache(tmp_path, refresh=True).get(key) is None
+
+    SearchCache(tmp_path).invalidate(key)
+    assert SearchCache(tmp_path).get(key) is None
+
+def test_fetcher_uses_cache(tmp_path, mocker):
+    from brazil_data_cube.downloader.fetcher import SatelliteImageFetcher
+
+    connection = mocker.MagicMock()
+    connection.search.return_value.items.return_value = [make_item("a", 5.0)]
+    fetcher = SatelliteImageFetcher(connection, SearchCache(tmp_path))
+
+    for _ in range(2):
+        items = fetcher._search_items("S2_L2A-1", [-55, -25, -54, -24], "2024-01-01", "2024-01-31", {"op": "lte"})
+        assert [item.id for item in items] == ["a"]
+    assert connection.search.call_count == 1
@@ -0,0 +1,117 @@
+# tests/test_segmented_downloader.py
+import os
+import json
+import pytest
+import requests
+from types import SimpleNamespace
+from brazil_data_cube.downloader.segmented_downloader import SegmentedDownloader
+from brazil_data_cube.downloader.image_downloader import ImagemDownloader
+from brazil_data_cube.utils.metrics import MetricsRegistry
+
+CONTEUDO = os.urandom(100_000)
+
+def _baixar(range_server, tmp_path, segments=4):
+    downloader = SegmentedDownloader(requests.Session(), segments, chunk_size=4096)
+    href = f"{range_server.url}/B04.tif"
+    remote = downloader.supports_ranges(href)
+    destino = str(tmp_path / "B04.tif")
+    return downloader, href, remote, destino
+
+def _gets(range_server):
+    return [intervalo for metodo, _, intervalo in range_server.requests if metodo == "GET"]
+
+def test_multi_segment_download(range_server, tmp_path):
+    range_server.files["/B04.tif"] = CONTEUDO
+    range_server.etags["/B04.tif"] = '"v1"'
+    downloader, href, remote, destino = _baixar(range_server, tmp_path)
+    recebidos = []
+
+    downloader.download(href, destino, remote, recebidos.append)
+
+    assert remote == {"size": len(CONTEUDO), "etag": '"v1"'}
+    with open(destino, "rb") as f:
+        assert f.read() == CONTEUDO
+    assert sorted(_gets(range_server)) == sorted(
+        ["bytes=0-24999", "bytes=25000-49999", "bytes=50000-74999", "bytes=75000-99999"])
+    assert sum(recebidos) == len(CONTEUDO)
+    assert not os.path.exists(destino + SegmentedDownloader.MANIFEST_SUFFIX)
+
+def test_server_without_ranges_falls_back_to_single_stream(range_server, tmp_path):
+    range_server.files["/B04.tif"] = CONTEUDO
+    range_server.ranges = False
+
+    caminhos = ImagemDownloader(str(tmp_path), segments=4).download_many(
+        {"B04.tif": SimpleNamespace(href=f"{range_server.url}/B04.tif")})
+
+    with open(caminhos["B04.tif"], "rb") as f:
+        assert f.read() == CONTEUDO
+    assert _gets(range_server) == [None]
+
+def _interromper(href, destino):
+    """Download interrompido: metade do primeiro segmento gravada, o segundo intacto."""
+    with open(destino, "wb") as f:
+        f.write(CONTEUDO[:25_000])
+        f.truncate(len(CONTEUDO))
+    manifesto = {"href": href, "size": len(CONTEUDO), "etag": '"v1"', "segments": [
+        {"start": 0, "end": 49_999, "pos": 25_000},
+        {"start": 50_000, "end": 99_999, "pos": 50_000},
+    ]}
+    with open(destino + SegmentedDownloader.MANIFEST_SUFFIX, "w") as f:
+        json.dump(manifesto, f)
+
+def test_resume_from_manifest(range_server, tmp_path):
+    range_server.files["/B04.tif"] = CONTEUDO
+    range_server.etags["/B04.tif"] = '"v1"'
+    downloader, href, remote, destino = _baixar(range_server, tmp_path, segments=2)
+    _interromper(href, destino)
+    recebidos, retomados = [], []
+
+    downloader.download(href, destino, remote, recebidos.append, on_resumed=retomados.append)
+
+    with open(destino, "rb") as f:
+        assert f.read() == CONTEUDO
+    assert sorted(_gets(range_server)) == ["bytes=25000-49999", "bytes=50000-99999"]
+    # Só o que foi transferido agora conta como recebido; o já gravado vai para on_resumed
+    assert sum(recebidos) == len(CONTEUDO) - 25_000
+    assert retomados == [25_000]
+
+def test_resumed_download_metrics_count_only_transferred_bytes(range_server, tmp_path, mocker):
+    range_server.files["/B04.tif"] = CONTEUDO
+    range_server.etags["/B04.tif"] = '"v1"'
+    href = f"{range_server.url}/B04.tif"
+    _interromper(href, str(tmp_path / "B04.tif"))
+    observe_transfer = mocker.patch.object(MetricsRegistry.get(), "observe_transfer")
+
+    caminhos = ImagemDownloader(str(tmp_path), segments=2).download_many({"B04.tif": SimpleNamespace(href=href)})
+
+    with open(caminhos["B04.tif"], "rb") as f:
+        assert f.read() == CONTEUDO
+    assert observe_transfer.call_args.args[0] == len(CONTEUDO) - 25_000
+
+def test_manifest_of_other_version_restarts(range_server, tmp_path):
+    range_server.files["/B04.tif"] = CONTEUDO
+    range_server.etags["/B04.tif"] = '"v2"'
+    downloader, href, remote, destino = _baixar(range_server, tmp_path, segments=2)
+    with open(destino, "wb") as f:
+        f.truncate(len(CONTEUDO))
+    with open(destino + SegmentedDownloader.MANIFEST_SUFFIX, "w") as f:
+        json.dump({"href": href, "size": len(CONTEUDO), "etag": '"v1"',
+                   "segments": [{"start": 0, "end": 99_999, "pos": 100_000}]}, f)
+
+    downloader.download(href, destino, remote)
+
+    with open(destino, "rb") as f:
+        assert f.read() == CONTEUDO
+    assert sorted(_gets(range_server)) == ["bytes=0-49999", "bytes=50000-99999"]
+
+def test_size_mismatch_is_reported(range_server, tmp_path):
+    # O HEAD anuncia mais bytes do que o servidor entrega
+    range_server.files["/B04.tif"] = CONTEUDO
+    range_server.head_sizes["/B04.tif"] = len(CONTEUDO) + 1000
+    downloader, href, remote, destino = _baixar(range_server, tmp_path, segments=2)
+
+    with pytest.raises(RuntimeError, match="incompleto"):
+        downloader.download(href, destino, remote)
+
+    # O manifesto fica para uma nova tentativa
+    assert os.path.exists(destino + SegmentedDownloader.MANIFEST_SUFFIX)
@@ -0,0 +1,44 @@
+# tests/test_statistics.py
+import numpy as np
+import pytest
+from brazil_data_cube.processors.statistics import HistogramPercentileEstimator, array_percentiles
+
+def test_percentiles_match_numpy_for_integer_blocks():
+    data = np.random.default_rng(0).integers(1, 12000, size=(300, 300)).astype(np.uint16)
+
+    estimator = HistogramPercentileEstimator()
+    for block in np.array_split(data, 7):
+        estimator.update(block)
+
+    expected = np.nanpercentile(data.astype(float), (2, 98))
+    assert np.array_equal(estimator.percentiles((2, 98)), expected)
+    assert estimator.min == data.min()
+    assert estimator.max == data.max()
+
+def test_percentile_respects_error_bound():
+    data = np.random.default_rng(1).integers(0, 60000, size=100000).astype(np.uint16)
+
+    estimator = HistogramPercentileEstimator(max_error=50)
+    estimator.update(data)
+
+    for q in (2, 50, 98):
+        assert abs(estimator.percentile(q) - np.percentile(data, q)) <= 50
+
+def test_percentiles_without_values():
+    estimator = HistogramPercentileEstimator()
+    estimator.update(np.array([], dtype=np.uint16))
+
+    assert estimator.percentiles((2, 98)) is None
+
+def test_range_too_wide_for_error_is_rejected():
+    with pytest.raises(ValueError):
+        HistogramPercentileEstimator((-2 ** 31, 2 ** 31 - 1))
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.int16, np.int32, np.float32])
+def test_array_percentiles_match_numpy(dtype):
+    info = np.iinfo(dtype) if np.dtype(dtype).kind in 'ui' else np.finfo(dtype)
+    low, high = max(info.min, -30000), min(info.max, 30000)
+    data = np.random.default_rng(2).uniform(low, high, size=(3, 200, 150)).astype(dtype)
+
+    for q in [(2, 98), (0, 50, 100), (0.5, 33.3, 99.9)]:
+        assert np.array_equal(array_percentiles(data, q), np.percentile(data, q))
@@ -0,0 +1,118 @@
+# tests/test_tile_grid.py
+import os
+import geopandas as gpd
+import pytest
+from shapely.geometry import box
+from brazil_data_cube.utils.tile_grid import TileGrid
+
+@pytest.fixture
+def grade(tmp_path):
+    path = tmp_path / "grade.shp"
+    gpd.GeoDataFrame({
+        "NAME": ["21JYM", "21JYN", "22JBS"],
+        "geometry": [box(-55.0, -25.0, -54.0, -24.0), box(-55.0, -24.0, -54.0, -23.0), box(-54.0, -25.0, -53.0, -24.0)]
+    }, crs="EPSG:4326").to_file(path)
+    TileGrid.clear_cache()
+    yield str(path)
+    TileGrid.clear_cache()
+
+def test_load_reads_shapefile_once(grade, mocker):
+    spy = mocker.spy(gpd, "read_file")
+
+    assert TileGrid.load(grade) is TileGrid.load(grade)
+    assert spy.call_count == 1
+
+def test_lookup_by_name(grade):
+    tile_grid = TileGrid.load(grade)
+
+    assert tile_grid.get_bounds("21JYN") == (-55.0, -24.0, -54.0, -23.0)
+    assert tile_grid.get_geometry("XXXXX") is None
+    assert tile_grid.get_frame("22JBS")["NAME"].tolist() == ["22JBS"]
+    assert tile_grid.get_frame("XXXXX").empty
+
+def test_spatial_queries(grade):
+    tile_grid = TileGrid.load(grade)
+
+    assert tile_grid.query_bbox([-54.5, -24.5, -53.5, -23.5]) == ["21JYM", "21JYN", "22JBS"]
+    assert tile_grid.query_bbox([-53.9, -24.9, -53.1, -24.1]) == ["22JBS"]
+    assert tile_grid.tiles_at_point(-54.5, -24.5) == ["21JYM"]
+
+def test_artifact_replaces_shapefile(grade, mocker):
+    from brazil_data_cube.utils.tile_grid_artifact import build_artifact, TileGridArtifact
+    build_artifact(grade)
+    spy = mocker.spy(gpd, "read_file")
+
+    tile_grid = TileGrid.load(grade)
+
+    assert isinstance(tile_grid, TileGridArtifact)
+    assert spy.call_count == 0
+    assert tile_grid.get_bounds("21JYN") == (-55.0, -24.0, -54.0, -23.0)
+    assert tile_grid.get_geometry("22JBS").equals(box(-54.0, -25.0, -53.0, -24.0))
+    assert tile_grid.query_bbox([-53.9, -24.9, -53.1, -24.1]) == ["22JBS"]
+
+def test_artifact_is_built_on_first_load(grade, mocker):
+    from brazil_data_cube.utils.tile_grid_artifact import TileGridArtifact, artifact_path
+
+    assert isinstance(TileGrid.load(grade), TileGridArtifact)
+    TileGrid.clear_cache()
+    spy = mocker.spy(gpd, "read_file")
+
+    # Nova execução: o artefato já existe e o shapefile não é lido
+    assert isinstance(TileGrid.load(grade), TileGridArtifact)
+    assert spy.call_count == 0
+    assert os.path.isdir(artifact_path(grade))
+
+def test_unwritable_artifact_falls_back_to_shapefile(grade, mocker):
+    mocker.patch("brazil_data_cube.utils.tile_grid.build_artifact", side_effect=PermissionError("somente leitura"))
+
+    tile_grid = TileGrid.load(grade)
+
+    assert isinstance(tile_grid, TileGrid)
+    assert tile_grid.get_bounds("21JYN") == (-55.0, -24.0, -54.0, -23.0)
+    assert tile_grid.query_bbox([-53.9, -24.9, -53.1, -24.1]) == ["22JBS"]
+
+def test_missing_grid_has_a_clear_error(tmp_path):
+    with pytest.raises(FileNotFoundError, match="Grade de tiles não encontrada"):
+        TileGrid.load(str(tmp_path / "inexistente.shp"))
+
+def test_artifact_and_shapefile_share_spatial_queries(grade):
+    from brazil_data_cube.utils.tile_grid_artifact import build_artifact, TileGridArtifact
+    artifact = TileGridArtifact(build_artifact(grade))
+    shapefile = TileGrid(grade)
+
+    # A STRtree do artefato só é montada na primeira consulta espacial
+    artifact.get_bounds("21JYM")
+    assert artifact._tree is None
+
+    for bbox in ([-54.5, -24.5, -53.5, -23.5], [-53.9, -24.9, -53.1, -24.1], [-60, -30, -59, -29]):
+        assert artifact.query_bbox(bbox) == shapefile.query_bbox(bbox)
+    for point in ((-54.5, -24.5), (-54.0, -24.0), (-53.5, -23.5)):
+        assert artifact.tiles_at_point(*point) == shapefile.tiles_at_point(*point)
+    assert artifact.tiles_at_point(-54.0, -24.0) == ["21JYM", "21JYN", "22JBS"]
+
+def test_artifact_is_stale_when_any_shapefile_file_changes(grade):
+    from brazil_data_cube.utils.tile_grid_artifact import build_artifact, TileGridArtifact, artifact_path
+    build_artifact(grade)
+    assert TileGridArtifact.is_fresh(artifact_path(grade), grade)
+
+    # Só o .dbf muda, com um mtime mais antigo que o do artefato
+    dbf = grade[:-4] + ".dbf"
+    with open(dbf, "ab") as f:
+        f.write(b" ")
+    os.utime(dbf, ns=(0, 0))
+    assert not TileGridArtifact.is_fresh(artifact_path(grade), grade)
+
+    build_artifact(grade)
+    assert TileGridArtifact.is_fresh(artifact_path(grade), grade)
+
+def test_concurrent_builds_leave_one_complete_artifact(grade):
+    from concurrent.futures import ThreadPoolExecutor
+    from brazil_data_cube.utils.tile_grid_artifact import build_artifact, TileGridArtifact, artifact_path
+    antes = set(os.listdir(os.path.dirname(grade)))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert set(executor.map(lambda _: build_artifact(grade), range(8))) == {artifact_path(grade)}
+
+    assert set(os.listdir(os.path.dirname(grade))) - antes == {os.path.basename(artifact_path(grade))}
+    assert TileGridArtifact.is_fresh(artifact_path(grade), grade)
+    assert TileGridArtifact(artifact_path(grade)).query_bbox([-53.9, -24.9, -53.1, -24.1]) == ["22JBS"]
@@ -0,0 +1,60 @@
+# tests/test_tile_processor.py
+import csv
+import time
+from types import SimpleNamespace
+import pytest
+from brazil_data_cube.processors.tile_processor import TileProcessor
+
+TILES = ["21JYM", "21JYN", "22JBS", "22JBT"]
+
+@pytest.fixture
+def processor(mock_fetcher, mock_downloader, mocker, tmp_path):
+    # Tiles que terminam fora de ordem: o primeiro é o mais lento
+    atrasos = {tile: 0.05 * (len(TILES) - i) for i, tile in enumerate(TILES)}
+
+    def fetch_image(satelite, bbox, start, end, cloud, grid, tile, items=None):
+        time.sleep(atrasos[tile])
+        return {band: SimpleNamespace(href=f"https://bdc/{tile}/{band}.tif") for band in ("B04", "B03", "B02")}
+
+    mock_fetcher.fetch_image.side_effect = fetch_image
+    mocker.patch("brazil_data_cube.processors.tile_processor.TileGrid.load").return_value.get_bounds.return_value = (0, 0, 1, 1)
+    mocker.patch("brazil_data_cube.processors.tile_processor.ImageProcessor")
+    mocker.patch("brazil_data_cube.processors.tile_processor.TILES_PARANA", TILES)
+    mocker.patch("brazil_data_cube.utils.logger.LOG_CSV_PATH", str(tmp_path / "log" / "erros.csv"))
+
+    processor = TileProcessor(mock_fetcher, mock_downloader, str(tmp_path), "grade.shp", 20.0, workers=3)
+    mocker.patch.object(processor.result_manager, "gerenciar_resultados")
+    return processor
+
+def test_results_keep_tile_order_with_concurrent_workers(processor, tmp_path):
+    processor.processar_tiles_parana("S2_L2A-1", "2024-01-01", "2024-01-31")
+
+    arquivos, duracoes = processor.result_manager.gerenciar_resultados.call_args.args[:2]
+    assert arquivos == [str(tmp_path / f"S2_L2A-1_{tile}_2024-01-01_2024-01-31_RGB.tif") for tile in TILES]
+    assert [d["Tile_id"] for d in duracoes] == TILES
+    assert processor.downloader.download_many.call_count == len(TILES)
+
+def test_tile_error_is_written_to_csv_and_others_continue(processor, mock_downloader, tmp_path):
+    def download_many(assets):
+        if any("22JBS" in name for name in assets):
+            raise RuntimeError("Erro ao fazer download das imagens: timeout")
+        return {name: name for name in assets}
+
+    mock_downloader.download_many.side_effect = download_many
+
+    processor.processar_tiles_parana("S2_L2A-1", "2024-01-01", "2024-01-31")
+
+    duracoes = processor.result_manager.gerenciar_resultados.call_args.args[1]
+    assert [d["Tile_id"] for d in duracoes] == ["21JYM", "21JYN", "22JBT"]
+    with open(tmp_path / "log" / "erros.csv", encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert [(linha["Tile_id"], linha["Satelite"]) for linha in linhas] == [("22JBS", "S2_L2A-1")]
+    assert "timeout" in linhas[0]["Erro"]
+
+def test_bands_are_released_after_each_tile(processor, mock_downloader):
+    processor.processar_tiles_parana("S2_L2A-1", "2024-01-01", "2024-01-31")
+
+    # Cada tile apaga as próprias bandas assim que o merge termina
+    liberados = [sorted(call.args[0]) for call in mock_downloader.release.call_args_list]
+    assert sorted(liberados) == sorted(
+        sorted(f"S2_L2A-1_{tile}_2024-01-01_2024-01-31_{banda}" for banda in ("red", "green", "blue")) for tile in TILES)
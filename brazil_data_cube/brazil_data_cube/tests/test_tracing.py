@@ -0,0 +1,40 @@
+# tests/test_tracing.py
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from brazil_data_cube.utils.tracing import Tracer
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.span("download", tile="21JYM") as span:
+        span["bytes"] = 10
+    assert tracer.to_chrome_trace()["traceEvents"] == []
+
+def test_spans_per_worker_with_inherited_attributes(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+
+    def processar(tile):
+        with tracer.attributes(tile=tile):
+            with tracer.span("fetch_image"):
+                pass
+            with tracer.span("download", asset=f"{tile}_red") as span:
+                span["bytes"] = 123
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="tile-worker") as executor:
+        list(executor.map(processar, ["21JYM", "21JYN", "21KYP"]))
+
+    with pytest.raises(RuntimeError):
+        with tracer.span("merge_rgb_tif"):
+            raise RuntimeError("falhou")
+
+    trace = json.loads(open(tracer.dump(str(tmp_path / "trace.json"))).read())
+    spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    threads = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+
+    assert len(spans) == 7
+    assert {span["args"]["tile"] for span in spans if span["name"] == "download"} == {"21JYM", "21JYN", "21KYP"}
+    assert all(span["args"]["bytes"] == 123 for span in spans if span["name"] == "download")
+    assert spans[-1]["args"]["error"] == "falhou"
+    assert any(thread["args"]["name"].startswith("tile-worker") for thread in threads)
+    assert len({span["tid"] for span in spans}) == len(threads)
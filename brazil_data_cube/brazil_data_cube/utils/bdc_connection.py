@@ -2,12 +2,17 @@
 
 import pystac_client
 import logging
+from typing import Optional
+from .http_transport import HttpTransport
 
 logger = logging.getLogger(__name__)
 
 class BdcConnection:
-    def __init__(self, endpoint: str ="https://data.inpe.br/bdc/stac/v1/"):
+    def __init__(self, endpoint: str ="https://data.inpe.br/bdc/stac/v1/",
+                 transport: Optional[HttpTransport] = None):
         self.endpoint = endpoint
+        # Sessão HTTP compartilhada com os downloads (o pystac_client cria a própria se None)
+        self.transport = transport
         self.connection = None
         logger.info("BdcConnection inicializado.")
 
@@ -20,7 +25,8 @@ class BdcConnection:
         """
         try:
             logger.info("Conectando ao Brazil Data Cube...")
-            self.connection = pystac_client.Client.open(self.endpoint)
+            stac_io = self.transport.stac_io() if self.transport is not None else None
+            self.connection = pystac_client.Client.open(self.endpoint, stac_io=stac_io)
             logger.info("Conexão com BDC estabelecida.")
         except Exception as e:
             logger.critical(f"Erro ao conectar ao BDC: {e}", exc_info=True)
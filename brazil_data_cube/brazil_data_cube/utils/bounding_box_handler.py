@@ -25,7 +25,19 @@ class BoundingBoxHandler:
             List[float]: [minx, miny, maxx, maxy] da nova bbox
         """
         tile_geometry = tile_grid.geometry.iloc[0]
-        minx, miny, maxx, maxy = tile_geometry.bounds
+        return self.calcular_bbox_reduzido_bounds(tile_geometry.bounds)
+
+    def calcular_bbox_reduzido_bounds(self, bounds: Tuple[float, float, float, float]) -> List[float]:
+        """
+        Calcula uma bounding box reduzida a partir dos limites do tile.
+
+        Args:
+            bounds (Tuple[float, float, float, float]): (minx, miny, maxx, maxy) do tile
+
+        Returns:
+            List[float]: [minx, miny, maxx, maxy] da nova bbox
+        """
+        minx, miny, maxx, maxy = bounds
 
         center_x = (minx + maxx) / 2
         center_y = (miny + maxy) / 2
@@ -57,20 +69,18 @@ class BoundingBoxHandler:
             Tuple[List[float], float, float, float]: BBox, lat_final, lon_final, radius_final
         """
         if tile_id:
-            import geopandas as gpd
-            if not os.path.isfile(tile_grid_path):
+            from .tile_grid import TileGrid
+            if not TileGrid.exists(tile_grid_path):
                 logging.error(f"Arquivo Shapefile não encontrado: {tile_grid_path}")
                 raise FileNotFoundError(f"Shapefile não encontrado no caminho: {tile_grid_path}")
-            
-            tile_grid = gpd.read_file(tile_grid_path)
-            tile_grid = tile_grid[tile_grid["NAME"] == tile_id]
 
-            if tile_grid.empty:
+            tile_bounds = TileGrid.load(tile_grid_path).get_bounds(tile_id)
+
+            if tile_bounds is None:
                 logger.error(f"Tile {tile_id} não encontrado na grade Sentinel-2.")
                 raise ValueError(f"Tile ID inválido: {tile_id}")
 
-            tile_geometry = tile_grid.geometry.iloc[0]
-            minx, miny, maxx, maxy = tile_geometry.bounds
+            minx, miny, maxx, maxy = tile_bounds
 
             center_x = (minx + maxx) / 2
             center_y = (miny + maxy) / 2
@@ -1,12 +1,17 @@
 # brazil_data_cube/downloader/geometry_utils.py
 
-import geopandas as gpd
-from shapely.geometry import shape
+import json
+import shapely
+import numpy as np
+from .tile_grid import TileGrid
 import logging
-from typing import Any
+from typing import Any, List, Sequence
 
 logger = logging.getLogger(__name__)
 
+# Fração mínima do tile que a imagem deve cobrir
+MIN_TILE_COVERAGE = 0.82
+
 class GeometryUtils:
     def __init__(self, tile_grid_path: str):
         self.tile_grid_path = tile_grid_path
@@ -22,19 +27,63 @@ class GeometryUtils:
         Returns:
             bool: True se passou no teste, False caso contrário
         """
-        tiles_gdf = gpd.read_file(self.tile_grid_path)
-        tile_row = tiles_gdf[tiles_gdf["NAME"] == tile_id]
+        if self.coverage_ratios([item], tile_id)[0] >= MIN_TILE_COVERAGE:
+            return True
+        else:
+            logger.debug(f"Imagem fora do tile {tile_id} - área de interseção insuficiente.")
+            return False
+
+    def coverage_ratios(self, items: Sequence[Any], tile_id: str) -> np.ndarray:
+        """
+        Calcula, de uma vez, a fração do tile coberta por cada item.
+
+        As geometrias dos itens são convertidas em lote e as interseções usam
+        as funções vetorizadas do shapely 2. Itens cujo bbox não toca o tile
+        são descartados antes, sem calcular interseção.
+
+        Args:
+            items (Sequence[Any]): Itens STAC candidatos
+            tile_id (str): ID do tile Sentinel-2
+
+        Returns:
+            np.ndarray: Fração coberta (0 a 1) de cada item, na ordem recebida
+            (zeros se o tile não existir na grade)
+        """
+        ratios = np.zeros(len(items), dtype=np.float64)
+        tile_geom = TileGrid.load(self.tile_grid_path).get_geometry(tile_id)
 
-        if tile_row.empty:
+        if tile_geom is None:
             logger.warning(f"Tile {tile_id} não encontrado na grade do Sentinel-2.")
-            return False
+            return ratios
+        if not items:
+            return ratios
 
-        tile_geom = tile_row.iloc[0].geometry
-        item_geom = shape(item.geometry)
-        intersection = tile_geom.intersection(item_geom)
+        footprints = shapely.from_geojson([json.dumps(item.geometry) for item in items])
 
-        if intersection.area / tile_geom.area >= 0.82:
-            return True
-        else:
-            logger.debug(f"Imagem fora do tile {tile_id} - área de interseção insuficiente.")
-            return False
\ No newline at end of file
+        minx, miny, maxx, maxy = tile_geom.bounds
+        bounds = shapely.bounds(footprints)
+        candidates = np.nonzero(
+            (bounds[:, 0] <= maxx) & (bounds[:, 2] >= minx) & (bounds[:, 1] <= maxy) & (bounds[:, 3] >= miny)
+        )[0]
+
+        if candidates.size:
+            intersections = shapely.intersection(footprints[candidates], tile_geom)
+            ratios[candidates] = shapely.area(intersections) / tile_geom.area
+
+        return ratios
+
+    def filter_good_geometries(self, items: Sequence[Any], tile_id: str) -> List[Any]:
+        """
+        Mantém só os itens que cobrem ao menos MIN_TILE_COVERAGE do tile.
+
+        Args:
+            items (Sequence[Any]): Itens STAC candidatos
+            tile_id (str): ID do tile Sentinel-2
+
+        Returns:
+            List[Any]: Itens aprovados, na ordem recebida
+        """
+        ratios = self.coverage_ratios(items, tile_id)
+        good = [item for item, ratio in zip(items, ratios) if ratio >= MIN_TILE_COVERAGE]
+        logger.debug(f"Filtro de geometria do tile {tile_id}: {len(good)}/{len(items)} itens aprovados.")
+        return good
\ No newline at end of file
@@ -0,0 +1,89 @@
+# brazil_data_cube/utils/http_transport.py
+
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter que aplica um timeout padrão quando a requisição não informa um."""
+
+    def __init__(self, timeout: Tuple[float, float], **kwargs: Any):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=self.timeout if timeout is None else timeout, **kwargs)
+
+class HttpTransport:
+    """
+    Camada HTTP única do pipeline: uma requests.Session com pool de conexões
+    keep-alive, timeouts padrão e política de retentativas do urllib3.
+
+    A mesma instância é usada pelo cliente STAC (via StacApiIO) e pelos
+    downloads, para que buscas e bandas reaproveitem as conexões TCP/TLS
+    abertas com o mesmo host.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 32,
+                 connect_timeout: float = 10.0, read_timeout: float = 60.0,
+                 retries: int = 3, backoff_factor: float = 0.5,
+                 status_forcelist: Sequence[int] = (429, 500, 502, 503, 504)):
+        """
+        Args:
+            pool_connections (int): Quantidade de hosts com pool próprio
+            pool_maxsize (int): Conexões mantidas abertas por host
+            connect_timeout (float): Timeout de conexão em segundos
+            read_timeout (float): Timeout de leitura em segundos
+            retries (int): Retentativas para erros de conexão e status em status_forcelist
+            backoff_factor (float): Fator da espera exponencial entre retentativas
+            status_forcelist (Sequence[int]): Status HTTP que disparam retentativa
+        """
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=tuple(status_forcelist),
+            # POST também: as buscas STAC são consultas, sem efeito colateral
+            allowed_methods=frozenset({"HEAD", "GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.session = self._create_session(pool_connections, pool_maxsize)
+        logger.info(f"Transporte HTTP criado (pool={pool_maxsize}, timeout={self.timeout}, retries={retries}).")
+
+    def _create_session(self, pool_connections: int, pool_maxsize: int) -> requests.Session:
+        session = requests.Session()
+        adapter = _TimeoutHTTPAdapter(
+            self.timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=self.retry,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def stac_io(self, headers: Optional[dict] = None) -> Any:
+        """
+        Cria um StacApiIO do pystac_client que usa a sessão compartilhada.
+
+        Returns:
+            StacApiIO: Objeto para Client.open(..., stac_io=...)
+        """
+        from pystac_client.stac_api_io import StacApiIO
+
+        stac_io = StacApiIO()
+        stac_io.session = self.session
+        if headers:
+            self.session.headers.update(headers)
+        return stac_io
+
+    def close(self) -> None:
+        """Fecha as conexões do pool."""
+        self.session.close()
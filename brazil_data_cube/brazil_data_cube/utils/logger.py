@@ -9,14 +9,18 @@ from ..config import TILES_PARANA
 from ..processors.mosaic_generator import MosaicGenerator  
 import pandas as pd 
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 logger = logging.getLogger(__name__)
 
 class ResultManager:
-    def __init__(self):
-        pass
+    def __init__(self, mosaic_generator: Optional[MosaicGenerator] = None):
+        """
+        Args:
+            mosaic_generator (Optional[MosaicGenerator]): Gerador do mosaico final (padrão: MosaicGenerator())
+        """
+        self.mosaic_generator = mosaic_generator or MosaicGenerator()
 
     @staticmethod
     def log_error_csv(tile: str, satelite: str, erro_msg: str) -> None:
@@ -81,8 +85,9 @@ class ResultManager:
         self._imprimir_resumo(media, estimativa_total, csv_path)
 
         parana_mosaic_output = os.path.join(output_dir, f"{satelite}_Parana_mosaic_{start_date}_{end_date}.tif")
-        MosaicGenerator().mosaic_tiles(tile_mosaic_files, parana_mosaic_output)
-        logger.info(f"Mosaico final do Paraná criado em: {parana_mosaic_output}")
+        parana_mosaic_output = self.mosaic_generator.mosaic_tiles(tile_mosaic_files, parana_mosaic_output)
+        if parana_mosaic_output:
+            logger.info(f"Mosaico final do Paraná criado em: {parana_mosaic_output}")
 
     def _criar_dataframe(self, results_time_estimated, executed_at):
         return pd.DataFrame([
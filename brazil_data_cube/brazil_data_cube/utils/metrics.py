@@ -0,0 +1,151 @@
+# brazil_data_cube/utils/metrics.py
+
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Métricas conhecidas: nome -> (tipo Prometheus, descrição)
+METRICS = {
+    "bdc_download_bytes_total": ("counter", "Bytes recebidos da rede nos downloads de assets"),
+    "bdc_download_ttfb_seconds": ("summary", "Tempo até o primeiro byte de cada asset"),
+    "bdc_download_seconds": ("summary", "Duração do download de cada asset"),
+    "bdc_download_throughput_bytes_per_second": ("gauge", "Vazão média de cada asset baixado"),
+    "bdc_asset_cache_hits_total": ("counter", "Assets entregues pelo cache local sem ir à rede"),
+    "bdc_search_seconds": ("summary", "Latência das buscas STAC, por estratégia"),
+    "bdc_search_cache_hits_total": ("counter", "Buscas STAC respondidas pelo cache em disco"),
+    "bdc_merge_seconds": ("summary", "Duração do merge RGB de cada tile"),
+    "bdc_mosaic_seconds": ("summary", "Duração da geração do mosaico final"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class MetricsRegistry:
+    """
+    Registro de métricas em memória, compartilhado pelo processo.
+
+    Contadores, gauges e summaries (count/sum/min/max) com labels, seguros
+    para uso concorrente. No fim da execução o conteúdo pode ser exportado em
+    texto Prometheus ou JSON, para separar execuções lentas por rede (bytes,
+    TTFB, vazão), API (latência das buscas) ou CPU (merge e mosaico).
+    """
+
+    _default: Optional["MetricsRegistry"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[LabelKey, Any]] = {}
+
+    @classmethod
+    def get(cls) -> "MetricsRegistry":
+        """Retorna o registro padrão do processo."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def reset(self) -> None:
+        """Descarta todos os valores registrados."""
+        with self._lock:
+            self._values.clear()
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Soma value a um contador."""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """Define o valor de um gauge."""
+        key = self._labels(labels)
+        with self._lock:
+            self._values.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Registra uma observação em um summary."""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            summary = series.get(key)
+            if summary is None:
+                series[key] = {"count": 1, "sum": value, "min": value, "max": value}
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["min"] = min(summary["min"], value)
+                summary["max"] = max(summary["max"], value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observa em name a duração do bloco, em segundos (mesmo se ele falhar)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def observe_transfer(self, nbytes: int, ttfb: Optional[float], duration: float, **labels: Any) -> None:
+        """Registra bytes, TTFB, duração e vazão de um asset baixado."""
+        self.inc("bdc_download_bytes_total", nbytes)
+        if ttfb is not None:
+            self.observe("bdc_download_ttfb_seconds", ttfb)
+        self.observe("bdc_download_seconds", duration)
+        if duration > 0:
+            self.set("bdc_download_throughput_bytes_per_second", nbytes / duration, **labels)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Exporta as métricas como dicionário serializável em JSON."""
+        with self._lock:
+            return {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in sorted(self._values.items())
+            }
+
+    def to_prometheus(self) -> str:
+        """Exporta as métricas no formato texto do Prometheus."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._values.items()):
+                kind, description = METRICS.get(name, ("untyped", name))
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in series.items():
+                    if kind == "summary":
+                        lines.append(f"{name}_count{self._format_labels(key)} {value['count']}")
+                        lines.append(f"{name}_sum{self._format_labels(key)} {value['sum']}")
+                    else:
+                        lines.append(f"{name}{self._format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _format_labels(key: LabelKey) -> str:
+        if not key:
+            return ""
+        escape = lambda value: value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in key) + "}"
+
+    def dump(self, path: str) -> str:
+        """
+        Grava as métricas em arquivo: JSON se path terminar em .json, senão texto Prometheus.
+
+        Returns:
+            str: Caminho do arquivo gravado
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                json.dump(self.to_json(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+        logger.info(f"Métricas gravadas em: {path}")
+        return path
@@ -0,0 +1,116 @@
+# brazil_data_cube/utils/output_profiles.py
+
+import os
+import logging
+import rasterio
+import rasterio.shutil
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+logger = logging.getLogger(__name__)
+
+# Perfis de gravação disponíveis: nome -> opções
+PROFILES = {
+    # COG com ZSTD: arquivos menores e descompressão mais rápida (requer GDAL com ZSTD)
+    "cog-zstd": {"cog": True, "compress": "ZSTD", "level": 9},
+    # COG com DEFLATE: legível por qualquer leitor de GeoTIFF
+    "cog-deflate": {"cog": True, "compress": "DEFLATE", "level": 6},
+    # GeoTIFF simples, sem compressão nem overviews (padrão)
+    "gtiff": {"cog": False, "compress": None, "level": None},
+}
+
+class OutputProfile:
+    """
+    Perfil de gravação dos rasters finais do pipeline (RGB dos tiles e mosaicos).
+
+    Os perfis COG gravam tiles internos, compressão com preditor (horizontal
+    para inteiros, ponto flutuante para float) e overviews, com os metadados e
+    as overviews no início do arquivo, para leituras por janela e por HTTP
+    range. Como o driver COG do GDAL só grava por cópia, o writer escreve
+    primeiro em um GeoTIFF tiled temporário, convertido para COG ao fechar.
+    """
+
+    def __init__(self, name: str = "gtiff", block_size: int = 512, resampling: str = "average",
+                 num_threads: str = "ALL_CPUS"):
+        """
+        Args:
+            name (str): Perfil ('cog-zstd', 'cog-deflate' ou 'gtiff')
+            block_size (int): Lado dos tiles internos do COG (múltiplo de 16)
+            resampling (str): Reamostragem das overviews (ex.: 'average', 'nearest')
+            num_threads (str): Threads de compressão e das overviews ('ALL_CPUS' ou um número)
+        """
+        if name not in PROFILES:
+            raise ValueError(f"Perfil de saída '{name}' desconhecido. Opções: {', '.join(PROFILES)}")
+        if block_size <= 0 or block_size % 16:
+            raise ValueError(f"block_size deve ser um múltiplo positivo de 16, recebido {block_size}.")
+        self.name = name
+        self.block_size = block_size
+        self.resampling = resampling
+        self.num_threads = str(num_threads)
+        self.cog = PROFILES[name]["cog"]
+        self.compress = PROFILES[name]["compress"]
+        self.level = PROFILES[name]["level"]
+
+    def cog_options(self) -> Dict[str, str]:
+        """Opções de criação do driver COG."""
+        options = {
+            "COMPRESS": self.compress,
+            "PREDICTOR": "YES",
+            "BLOCKSIZE": str(self.block_size),
+            "OVERVIEWS": "AUTO",
+            "RESAMPLING": self.resampling.upper(),
+            "NUM_THREADS": self.num_threads,
+            "BIGTIFF": "IF_SAFER",
+        }
+        if self.level is not None:
+            options["LEVEL"] = str(self.level)
+        return options
+
+    @contextmanager
+    def open(self, path: str, **profile: Any) -> Iterator[Any]:
+        """
+        Abre path para gravação com este perfil (substitui rasterio.open(path, 'w', **profile)).
+
+        Args:
+            path (str): Caminho final do raster
+            **profile: Profile do rasterio (dimensões, dtype, CRS, transform, ...)
+
+        Yields:
+            DatasetWriter: Dataset para gravar (por blocos ou inteiro)
+        """
+        if not self.cog:
+            with rasterio.open(path, "w", **profile) as dst:
+                yield dst
+            return
+
+        tmp_path = f"{path}.tmp.tif"
+        working = dict(profile)
+        working.update({"driver": "GTiff", "tiled": True, "compress": self.compress, "BIGTIFF": "IF_SAFER"})
+        # O profile de um GeoTIFF em faixas (ex.: src.profile) traz blocos que não servem para um arquivo tiled
+        blocks = [profile.get("blockxsize"), profile.get("blockysize")]
+        if not profile.get("tiled") or not all(block and block % 16 == 0 for block in blocks):
+            working.update(blockxsize=self.block_size, blockysize=self.block_size)
+
+        try:
+            with rasterio.open(tmp_path, "w", **working) as dst:
+                yield dst
+            self.translate(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def translate(self, src_path: str, dst_path: str) -> str:
+        """
+        Converte um raster existente para este perfil.
+
+        Returns:
+            str: Caminho gravado
+        """
+        if self.cog:
+            rasterio.shutil.copy(src_path, dst_path, driver="COG", **self.cog_options())
+        else:
+            rasterio.shutil.copy(src_path, dst_path, driver="GTiff")
+        logger.debug(f"Raster gravado com o perfil {self.name}: {dst_path}")
+        return dst_path
+
@@ -0,0 +1,114 @@
+# brazil_data_cube/utils/tile_grid.py
+
+import os
+import logging
+import threading
+from shapely.strtree import STRtree
+from typing import Any, Dict, List, Optional, Tuple
+from .tile_grid_artifact import GridQueries, TileGridArtifact, artifact_path, build_artifact
+
+
+logger = logging.getLogger(__name__)
+
+class TileGrid(GridQueries):
+    """
+    Grade de tiles Sentinel-2 carregada uma única vez por processo.
+
+    O shapefile é lido na primeira chamada de TileGrid.load e as geometrias
+    ficam indexadas por NAME e em uma STRtree para consultas espaciais. Na
+    primeira carga o shapefile é convertido em um artefato compacto (ver
+    tile_grid_artifact), que nas execuções seguintes é mapeado em memória no
+    lugar do shapefile, sem importar geopandas.
+    """
+
+    _instances: Dict[str, Any] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, tile_grid_path: str):
+        import geopandas as gpd
+
+        logger.info(f"Carregando grade de tiles: {tile_grid_path}")
+        self.tile_grid_path = tile_grid_path
+        self.gdf = gpd.read_file(tile_grid_path)
+        self.names: List[str] = self.gdf["NAME"].tolist()
+        self.geometries = self.gdf.geometry.values
+
+        # Em nomes repetidos vale a primeira ocorrência, como no filtro original
+        self._positions: Dict[str, int] = {}
+        for position, name in enumerate(self.names):
+            self._positions.setdefault(name, position)
+
+        self.tree = STRtree(self.geometries)
+
+    @classmethod
+    def load(cls, tile_grid_path: str) -> Any:
+        """
+        Retorna a grade do caminho informado, lendo o shapefile só na primeira vez.
+
+        Args:
+            tile_grid_path (str): Caminho do shapefile com a grade (ou do artefato .tilegrid)
+
+        Returns:
+            TileGrid | TileGridArtifact: Instância compartilhada pelo processo
+        """
+        key = os.path.abspath(tile_grid_path)
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls._open(tile_grid_path)
+            return cls._instances[key]
+
+    @classmethod
+    def _open(cls, tile_grid_path: str) -> Any:
+        """
+        Abre o artefato compacto da grade, gerando-o na primeira vez a partir do shapefile.
+
+        Se o artefato não puder ser gravado (ex.: diretório somente leitura), o
+        shapefile é lido diretamente.
+        """
+        artifact = artifact_path(tile_grid_path)
+        if not TileGridArtifact.is_fresh(artifact, tile_grid_path):
+            if not os.path.isfile(tile_grid_path):
+                raise FileNotFoundError(
+                    f"Grade de tiles não encontrada: {tile_grid_path} (nem o artefato {artifact}).")
+            try:
+                build_artifact(tile_grid_path)
+            except OSError as e:
+                logger.warning(f"Não foi possível gerar o artefato da grade ({e}); lendo o shapefile.")
+                return cls(tile_grid_path)
+
+        logger.info(f"Usando artefato da grade de tiles: {artifact}")
+        return TileGridArtifact(artifact)
+
+    @classmethod
+    def exists(cls, tile_grid_path: str) -> bool:
+        """Indica se há shapefile ou artefato para o caminho informado."""
+        return os.path.isfile(tile_grid_path) or os.path.isdir(artifact_path(tile_grid_path))
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Descarta as grades carregadas (útil em testes ou se o shapefile mudar)."""
+        with cls._lock:
+            cls._instances.clear()
+
+    def has_tile(self, name: str) -> bool:
+        return name in self._positions
+
+    def get_geometry(self, name: str) -> Optional[Any]:
+        """Retorna a geometria do tile ou None se ele não existir na grade."""
+        position = self._positions.get(name)
+        return None if position is None else self.geometries[position]
+
+    def get_bounds(self, name: str) -> Optional[Tuple[float, float, float, float]]:
+        """Retorna (minx, miny, maxx, maxy) do tile ou None se ele não existir na grade."""
+        geometry = self.get_geometry(name)
+        return None if geometry is None else geometry.bounds
+
+    def get_frame(self, name: str) -> Any:
+        """Retorna o GeoDataFrame com a linha do tile (vazio se ele não existir)."""
+        position = self._positions.get(name)
+        if position is None:
+            return self.gdf.iloc[0:0]
+        return self.gdf.iloc[position:position + 1]
+
+    def _name_at(self, position: int) -> str:
+        return self.names[position]
@@ -0,0 +1,271 @@
+# brazil_data_cube/utils/tile_grid_artifact.py
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+import threading
+import numpy as np
+import shapely
+from shapely.geometry import box, Point
+from shapely.strtree import STRtree
+from typing import Any, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_SUFFIX = ".tilegrid"
+SOURCE_FILE = "source.json"
+
+def artifact_path(tile_grid_path: str) -> str:
+    """Caminho do artefato compacto correspondente a um shapefile (mesmo nome, sufixo .tilegrid)."""
+    if tile_grid_path.endswith(ARTIFACT_SUFFIX):
+        return tile_grid_path
+    return os.path.splitext(tile_grid_path)[0] + ARTIFACT_SUFFIX
+
+def source_signature(tile_grid_path: str) -> List[List[Any]]:
+    """
+    Nome, tamanho e mtime de todos os arquivos do shapefile (.shp, .dbf, .shx, .prj, ...).
+
+    Guardada no artefato: qualquer arquivo trocado, inclusive por uma versão
+    mais antiga, muda a assinatura.
+    """
+    directory = os.path.dirname(os.path.abspath(tile_grid_path))
+    prefix = os.path.splitext(os.path.basename(tile_grid_path))[0] + "."
+    signature = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.startswith(prefix) and entry.is_file():
+                stat = entry.stat()
+                signature.append([entry.name, stat.st_size, stat.st_mtime_ns])
+    return sorted(signature)
+
+def build_artifact(tile_grid_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Converte o shapefile da grade em um artefato binário compacto.
+
+    O artefato é um diretório de arquivos .npy (carregados com mmap):
+    nomes, bounds, áreas, geometrias em WKB concatenadas com seus offsets e
+    um índice nome -> posição ordenado para busca binária, mais a assinatura
+    dos arquivos do shapefile de origem (source.json).
+
+    Args:
+        tile_grid_path (str): Caminho do shapefile com a grade
+        output_path (Optional[str]): Diretório do artefato (padrão: <shapefile>.tilegrid)
+
+    Returns:
+        str: Caminho do artefato gerado
+    """
+    import geopandas as gpd
+
+    output_path = output_path or artifact_path(tile_grid_path)
+    # Assinatura tirada antes da leitura: um shapefile alterado durante a leitura fica desatualizado
+    signature = source_signature(tile_grid_path)
+    gdf = gpd.read_file(tile_grid_path)
+
+    names = np.array(gdf["NAME"].astype(str).tolist())
+    geometries = gdf.geometry.values
+    wkb = [shapely.to_wkb(geometry) for geometry in geometries]
+    offsets = np.zeros(len(wkb) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(blob) for blob in wkb])
+
+    arrays = {
+        "names": names,
+        "bounds": shapely.bounds(geometries).astype(np.float64),
+        "area": shapely.area(geometries).astype(np.float64),
+        "wkb": np.frombuffer(b"".join(wkb), dtype=np.uint8),
+        "wkb_offsets": offsets,
+    }
+    # Ordenação estável: em nomes repetidos a primeira ocorrência vem antes
+    arrays["name_order"] = np.argsort(names, kind="stable").astype(np.int64)
+    arrays["sorted_names"] = names[arrays["name_order"]]
+
+    # Diretório temporário próprio deste processo, trocado de uma vez: nunca expõe um artefato parcial
+    parent = os.path.dirname(os.path.abspath(output_path))
+    tmp_path = tempfile.mkdtemp(prefix=os.path.basename(output_path) + ".", suffix=".tmp", dir=parent)
+    try:
+        os.chmod(tmp_path, 0o755)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        with open(os.path.join(tmp_path, SOURCE_FILE), "w", encoding="utf-8") as f:
+            json.dump(signature, f)
+        _swap_in(tmp_path, output_path, signature)
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    logger.info(f"Artefato da grade gerado em: {output_path} ({len(names)} tiles)")
+    return output_path
+
+def _swap_in(tmp_path: str, output_path: str, signature: List[List[Any]]) -> None:
+    """
+    Coloca o artefato de tmp_path em output_path.
+
+    Sem artefato no destino a troca é um único os.replace. Se outro processo
+    acabou de gravar um artefato da mesma origem, ele é mantido; um artefato
+    antigo é renomeado para fora e substituído.
+    """
+    try:
+        os.replace(tmp_path, output_path)
+        return
+    except OSError:
+        pass
+
+    if TileGridArtifact.read_signature(output_path) == signature:
+        return
+
+    stale = tmp_path + ".old"
+    try:
+        os.replace(output_path, stale)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(tmp_path, output_path)
+    except OSError:
+        # Outro processo colocou o dele entre as duas trocas
+        pass
+    shutil.rmtree(stale, ignore_errors=True)
+
+class GridQueries:
+    """
+    Consultas espaciais comuns a TileGrid e TileGridArtifact.
+
+    As subclasses expõem `tree` (STRtree sobre as geometrias, na ordem do
+    shapefile) e `_name_at(posição)`.
+    """
+
+    tree: STRtree
+
+    def _name_at(self, position: int) -> str:
+        raise NotImplementedError
+
+    def _query(self, geometry: Any) -> List[str]:
+        positions = self.tree.query(geometry, predicate="intersects")
+        return [self._name_at(position) for position in sorted(positions)]
+
+    def query_bbox(self, bbox: List[float]) -> List[str]:
+        """
+        Lista os tiles que intersectam uma bbox.
+
+        Args:
+            bbox (List[float]): [minx, miny, maxx, maxy] no CRS da grade
+
+        Returns:
+            List[str]: Nomes dos tiles, na ordem do shapefile
+        """
+        return self._query(box(*bbox))
+
+    def tiles_at_point(self, lon: float, lat: float) -> List[str]:
+        """Lista os tiles que contêm o ponto (tiles vizinhos se sobrepõem nas bordas)."""
+        return self._query(Point(lon, lat))
+
+class TileGridArtifact(GridQueries):
+    """
+    Grade de tiles lida de um artefato gerado por build_artifact.
+
+    Os arrays são mapeados em memória; a busca por nome é binária e as
+    geometrias só são decodificadas do WKB quando pedidas. A STRtree das
+    consultas espaciais é montada na primeira delas. Não usa geopandas.
+    Expõe a mesma interface de consulta de TileGrid.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tree: Optional[STRtree] = None
+        self._tree_lock = threading.Lock()
+        load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        self.names_array = load("names")
+        self.bounds = load("bounds")
+        self.area = load("area")
+        self.wkb = load("wkb")
+        self.wkb_offsets = load("wkb_offsets")
+        self.name_order = load("name_order")
+        self.sorted_names = load("sorted_names")
+
+    @staticmethod
+    def read_signature(path: str) -> Optional[List[List[Any]]]:
+        """Assinatura do shapefile de origem guardada no artefato (None se não houver)."""
+        try:
+            with open(os.path.join(path, SOURCE_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def is_fresh(path: str, tile_grid_path: str) -> bool:
+        """
+        Indica se o artefato existe e foi gerado a partir dos arquivos atuais do shapefile.
+
+        Sem o shapefile (ex.: imagem só com o artefato), qualquer artefato existente vale.
+        """
+        if not os.path.isdir(path):
+            return False
+        if not os.path.isfile(tile_grid_path):
+            return True
+        return TileGridArtifact.read_signature(path) == source_signature(tile_grid_path)
+
+    @property
+    def names(self) -> List[str]:
+        return self.names_array.tolist()
+
+    def _position(self, name: str) -> Optional[int]:
+        index = int(np.searchsorted(self.sorted_names, name))
+        if index < len(self.sorted_names) and self.sorted_names[index] == name:
+            return int(self.name_order[index])
+        return None
+
+    def has_tile(self, name: str) -> bool:
+        return self._position(name) is not None
+
+    def _geometry_at(self, position: int) -> Any:
+        start, end = self.wkb_offsets[position], self.wkb_offsets[position + 1]
+        return shapely.from_wkb(self.wkb[start:end].tobytes())
+
+    def get_geometry(self, name: str) -> Optional[Any]:
+        """Retorna a geometria do tile ou None se ele não existir na grade."""
+        position = self._position(name)
+        return None if position is None else self._geometry_at(position)
+
+    def get_bounds(self, name: str) -> Optional[Tuple[float, float, float, float]]:
+        """Retorna (minx, miny, maxx, maxy) do tile sem decodificar a geometria."""
+        position = self._position(name)
+        return None if position is None else tuple(float(v) for v in self.bounds[position])
+
+    def get_area(self, name: str) -> Optional[float]:
+        position = self._position(name)
+        return None if position is None else float(self.area[position])
+
+    def get_frame(self, name: str) -> Any:
+        """Retorna um GeoDataFrame com a linha do tile (importa geopandas só aqui)."""
+        import geopandas as gpd
+
+        position = self._position(name)
+        rows = [] if position is None else [position]
+        return gpd.GeoDataFrame({
+            "NAME": [self.names_array[p] for p in rows],
+            "geometry": [self._geometry_at(p) for p in rows],
+        })
+
+    @property
+    def tree(self) -> STRtree:
+        """STRtree das geometrias, decodificadas do WKB só na primeira consulta espacial."""
+        with self._tree_lock:
+            if self._tree is None:
+                self._tree = STRtree([self._geometry_at(position) for position in range(len(self.names_array))])
+            return self._tree
+
+    def _name_at(self, position: int) -> str:
+        return str(self.names_array[position])
+
+if __name__ == "__main__":
+    import typer
+
+    def main(
+        tile_grid_path: str = typer.Argument(..., help="Shapefile da grade Sentinel-2"),
+        output_path: str = typer.Option(None, help="Diretório do artefato (padrão: <shapefile>.tilegrid)")
+    ):
+        """Gera o artefato compacto da grade de tiles usado na inicialização."""
+        logging.basicConfig(level=logging.INFO)
+        print(build_artifact(tile_grid_path, output_path))
+
+    typer.run(main)
@@ -0,0 +1,124 @@
+# brazil_data_cube/utils/tracing.py
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+class Tracer:
+    """
+    Spans leves das etapas do pipeline, exportados como timeline do Chrome/Perfetto.
+
+    Desligado por padrão: span() só mede e guarda eventos depois de enable().
+    Cada thread vira uma trilha própria na timeline (com o nome da thread),
+    então tiles processados em paralelo aparecem um por worker. Atributos
+    definidos com attributes() (ex.: o tile em processamento) são herdados por
+    todos os spans abertos na mesma thread.
+    """
+
+    _default: Optional["Tracer"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    @classmethod
+    def get(cls) -> "Tracer":
+        """Retorna o tracer padrão do processo."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def enable(self) -> None:
+        """Passa a registrar os spans."""
+        self.enabled = True
+
+    def current_attributes(self) -> Dict[str, Any]:
+        """Atributos herdados pelos spans da thread atual."""
+        return dict(getattr(self._local, "attributes", {}))
+
+    @contextmanager
+    def attributes(self, **attributes: Any) -> Iterator[None]:
+        """Define atributos herdados pelos spans abertos nesta thread dentro do bloco."""
+        previous = getattr(self._local, "attributes", {})
+        self._local.attributes = {**previous, **attributes}
+        try:
+            yield
+        finally:
+            self._local.attributes = previous
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Mede o bloco como um span.
+
+        Args:
+            name (str): Nome da etapa
+            **attributes: Atributos do span (ex.: tile, bytes)
+
+        Yields:
+            Dict[str, Any]: Atributos do span; o bloco pode acrescentar valores (ex.: bytes ao final)
+        """
+        args = {**self.current_attributes(), **attributes}
+        if not self.enabled:
+            yield args
+            return
+
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = str(e)
+            raise
+        finally:
+            end = time.perf_counter()
+            thread = threading.current_thread()
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": thread.ident,
+                "args": {key: self._serializable(value) for key, value in args.items()},
+            }
+            with self._lock:
+                self._events.append(event)
+                self._threads.setdefault(thread.ident, thread.name)
+
+    @staticmethod
+    def _serializable(value: Any) -> Any:
+        return value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Monta o JSON no formato Trace Event (chrome://tracing, ui.perfetto.dev)."""
+        with self._lock:
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in self._threads.items()
+            ]
+            return {"traceEvents": metadata + list(self._events), "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> str:
+        """
+        Grava a timeline em JSON.
+
+        Returns:
+            str: Caminho do arquivo gravado
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        logger.info(f"Trace gravado em: {path} (abra em ui.perfetto.dev ou chrome://tracing)")
+        return path
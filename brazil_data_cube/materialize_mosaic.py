@@ -0,0 +1,31 @@
+# materialize_mosaic.py
+
+import os
+import typer
+import logging
+from brazil_data_cube.processors.vrt_materializer import VrtMaterializer
+from brazil_data_cube.utils.output_profiles import OutputProfile
+from brazil_data_cube.utils.logger import setup_logger
+
+setup_logger()
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer()
+
+@app.command()
+def main(
+    vrt_path: str = typer.Argument(..., help="Mosaico virtual (.vrt) gerado com --virtual-mosaic"),
+    output_path: str = typer.Option(None, help="COG de saída (padrão: mesmo nome do VRT com extensão .tif)"),
+    workers: int = typer.Option(os.cpu_count() or 4, help="Threads de leitura dos blocos do VRT"),
+    block_size: int = typer.Option(1024, help="Lado dos blocos lidos do VRT, em pixels (múltiplo de 16)"),
+    profile: str = typer.Option("cog-deflate", help="Perfil de saída: cog-zstd, cog-deflate ou gtiff")
+):
+    """
+    Converte um mosaico virtual em um arquivo COG, lendo os blocos em paralelo.
+    """
+    output_path = output_path or os.path.splitext(vrt_path)[0] + ".tif"
+    VrtMaterializer(workers, block_size, OutputProfile(profile)).materialize(vrt_path, output_path)
+
+if __name__ == "__main__":
+    app()
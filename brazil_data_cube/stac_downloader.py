@@ -2,8 +2,14 @@
 
 import typer
 from brazil_data_cube.utils.bdc_connection import BdcConnection
+from brazil_data_cube.utils.http_transport import HttpTransport
+from brazil_data_cube.utils.metrics import MetricsRegistry
+from brazil_data_cube.utils.tracing import Tracer
+from brazil_data_cube.utils.output_profiles import OutputProfile
 from brazil_data_cube.downloader.fetcher import SatelliteImageFetcher
 from brazil_data_cube.downloader.image_downloader import ImagemDownloader
+from brazil_data_cube.downloader.search_cache import SearchCache
+from brazil_data_cube.downloader.asset_cache import AssetCache
 from brazil_data_cube.utils.bounding_box_handler import BoundingBoxHandler
 from brazil_data_cube.processors.image_processor import ImageProcessor
 from brazil_data_cube.processors.tile_processor import TileProcessor
@@ -11,6 +17,7 @@ import os
 import logging
 
 from brazil_data_cube.utils.logger import setup_logger
+from brazil_data_cube.config import SEARCH_CACHE_DIR, SEARCH_CACHE_TTL_HOURS, ASSET_CACHE_DIR, ASSET_CACHE_MAX_GB
 
 setup_logger()
 
@@ -29,33 +36,89 @@ def main(
     end_date: str = typer.Argument(..., help="Data final (YYYY-MM-DD)"),
     output_dir: str = typer.Option("imagens", help="Diretório de saída para salvar as imagens"),
     tile_grid_path: str = typer.Option("shapefile_ids/grade_sentinel_brasil.shp"),
-    max_cloud_cover: float = typer.Option(20.0, help="Máximo de nuvens")
+    max_cloud_cover: float = typer.Option(20.0, help="Máximo de nuvens"),
+    workers: int = typer.Option(1, help="Quantidade de tiles processados em paralelo (modo Paraná)"),
+    batch_search: bool = typer.Option(False, help="Busca as imagens de todos os tiles do Paraná em uma única consulta STAC (exclusivo com --sorted-search)"),
+    dedupe_downloads: bool = typer.Option(False, help="No modo Paraná, baixa uma única vez as bandas compartilhadas entre tiles"),
+    segments: int = typer.Option(1, help="Intervalos de bytes baixados em paralelo por arquivo (1 desativa)"),
+    download_engine: str = typer.Option("threads", help="Motor de download: 'threads' (com segmentos) ou 'async' (asyncio/aiohttp)"),
+    http_pool_size: int = typer.Option(32, help="Conexões HTTP mantidas abertas por host (buscas e downloads)"),
+    http_timeout: float = typer.Option(60.0, help="Timeout de leitura das requisições HTTP, em segundos"),
+    http_retries: int = typer.Option(3, help="Retentativas para falhas de conexão e respostas 429/5xx"),
+    clip: bool = typer.Option(False, help="Com lat/lon, lê do COG remoto só a área da bbox em vez da banda inteira"),
+    preview_resolution: float = typer.Option(None, help="Gera uma prévia nesta resolução (ex: 60) lendo as overviews remotas, sem baixar as bandas"),
+    search_cache: bool = typer.Option(False, help="Reaproveita resultados de buscas STAC gravados em disco"),
+    cache_dir: str = typer.Option(str(SEARCH_CACHE_DIR), help="Diretório do cache de buscas STAC"),
+    cache_ttl: float = typer.Option(SEARCH_CACHE_TTL_HOURS, help="Validade das buscas em cache, em horas"),
+    refresh_cache: bool = typer.Option(False, help="Ignora o cache existente e refaz as buscas (gravando os novos resultados)"),
+    asset_cache: bool = typer.Option(False, help="Reaproveita bandas já baixadas (mesmo href e ETag/Last-Modified)"),
+    asset_cache_dir: str = typer.Option(str(ASSET_CACHE_DIR), help="Diretório do cache de bandas"),
+    asset_cache_size: float = typer.Option(ASSET_CACHE_MAX_GB, help="Cota do cache de bandas, em GB (as menos usadas são removidas)"),
+    streaming_mosaic: bool = typer.Option(False, help="Grava o mosaico do Paraná bloco a bloco, sem montá-lo inteiro em memória"),
+    virtual_mosaic: bool = typer.Option(False, help="Grava o mosaico do Paraná como VRT sobre os tiles (materialize depois com materialize_mosaic.py)"),
+    reproject_workers: int = typer.Option(None, help="Processos que reprojetam em paralelo os tiles de outra zona UTM (padrão: número de CPUs)"),
+    rgb_profile: str = typer.Option("gtiff", help="Formato dos RGB gravados: gtiff, cog-deflate ou cog-zstd (COG grava um temporário e converte)"),
+    mosaic_profile: str = typer.Option("gtiff", help="Formato do mosaico do Paraná: gtiff, cog-deflate ou cog-zstd (COG grava um temporário e converte)"),
+    mosaic_workers: int = typer.Option(1, help="Com --streaming-mosaic, processos que montam o mosaico do Paraná em chunks paralelos (1 grava bloco a bloco em um processo)"),
+    sorted_search: bool = typer.Option(False, help="Pede os itens ordenados por nuvem e para no primeiro válido (se a API suportar sortby; exclusivo com --batch-search)"),
+    metrics_output: str = typer.Option(None, help="Grava as métricas da execução neste arquivo (.json ou texto Prometheus)"),
+    trace_output: str = typer.Option(None, help="Grava a timeline das etapas neste arquivo JSON (Chrome trace / Perfetto)")
 ):
     """
     Baixa e processa imagens de satélite do Brazil Data Cube.
     """
+    if batch_search and sorted_search:
+        # Com a busca em lote os tiles já recebem os itens prontos e a busca ordenada nunca seria feita
+        raise typer.BadParameter("--batch-search e --sorted-search são exclusivos: escolha uma das estratégias de busca.")
+
+    if trace_output:
+        Tracer.get().enable()
+
     # Inicializa dependências
-    bdc_conn = BdcConnection().get_connection()
-    fetcher = SatelliteImageFetcher(bdc_conn)
-    downloader = ImagemDownloader(output_dir)
+    transport = HttpTransport(pool_maxsize=http_pool_size, read_timeout=http_timeout, retries=http_retries)
+    bdc_conn = BdcConnection(transport=transport).get_connection()
+    cache = SearchCache(cache_dir, cache_ttl * 3600, refresh_cache) if search_cache else None
+    fetcher = SatelliteImageFetcher(bdc_conn, cache, sorted_search)
+    bandas_cache = AssetCache(asset_cache_dir, int(asset_cache_size * 1024 ** 3)) if asset_cache else None
+    downloader = ImagemDownloader(output_dir, segments=segments, transport=transport, engine=download_engine,
+                                  asset_cache=bandas_cache)
     bbox_handler = BoundingBoxHandler(reduction_factor=0.2)
 
-    if tile_id in ["Paraná", "parana"]:
-        TileProcessor(fetcher, downloader, output_dir, tile_grid_path, max_cloud_cover).processar_tiles_parana(satelite, start_date, end_date)
-    else:
-        main_bbox, lat_final, lon_final, radius_final = bbox_handler.obter_bounding_box(tile_id, lat, lon, radius_km, tile_grid_path)
+    try:
+        if tile_id in ["Paraná", "parana"]:
+            TileProcessor(fetcher, downloader, output_dir, tile_grid_path, max_cloud_cover, workers,
+                          preview_resolution, batch_search, dedupe_downloads,
+                          streaming_mosaic, virtual_mosaic, reproject_workers,
+                          OutputProfile(rgb_profile), OutputProfile(mosaic_profile),
+                          mosaic_workers).processar_tiles_parana(satelite, start_date, end_date)
+        else:
+            main_bbox, lat_final, lon_final, radius_final = bbox_handler.obter_bounding_box(tile_id, lat, lon, radius_km, tile_grid_path)
 
-        image_assets = fetcher.fetch_image(satelite, main_bbox, start_date, end_date, max_cloud_cover, tile_grid_path, tile_id or "")
-        if not image_assets:
-            print("Nenhuma imagem encontrada.")
-            return
+            image_assets = fetcher.fetch_image(satelite, main_bbox, start_date, end_date, max_cloud_cover, tile_grid_path, tile_id or "")
+            if not image_assets:
+                print("Nenhuma imagem encontrada.")
+                return
 
-        r = downloader.download(image_assets['B04'], f"{radius_final:.2f}KM_{satelite}_{lat_final:.3f}_{lon_final:.3f}_{start_date}_{end_date}_red")
-        g = downloader.download(image_assets['B03'], f"{radius_final:.2f}KM_{satelite}_{lat_final:.3f}_{lon_final:.3f}_{start_date}_{end_date}_green")
-        b = downloader.download(image_assets['B02'], f"{radius_final:.2f}KM_{satelite}_{lat_final:.3f}_{lon_final:.3f}_{start_date}_{end_date}_blue")
+            base_name = f"{radius_final:.2f}KM_{satelite}_{lat_final:.3f}_{lon_final:.3f}_{start_date}_{end_date}"
+            if preview_resolution:
+                r, g, b = image_assets['B04'].href, image_assets['B03'].href, image_assets['B02'].href
+            else:
+                bandas = downloader.download_many({
+                    f"{base_name}_red": image_assets['B04'],
+                    f"{base_name}_green": image_assets['B03'],
+                    f"{base_name}_blue": image_assets['B02'],
+                }, clip_bbox=main_bbox if clip and not tile_id else None)
+                r, g, b = bandas[f"{base_name}_red"], bandas[f"{base_name}_green"], bandas[f"{base_name}_blue"]
 
-        output_path = os.path.join(output_dir, f"{radius_final:.2f}KM_{satelite}_{lat_final:.3f}_{lon_final:.3f}_{start_date}_{end_date}_RGB.tif")
-        ImageProcessor(satelite).merge_rgb_tif(r, g, b, output_path)
+            output_path = os.path.join(output_dir, f"{base_name}_RGB.tif")
+            ImageProcessor(satelite, preview_resolution,
+                           output_profile=OutputProfile(rgb_profile)).merge_rgb_tif(r, g, b, output_path)
+    finally:
+        downloader.close()
+        if metrics_output:
+            MetricsRegistry.get().dump(metrics_output)
+        if trace_output:
+            Tracer.get().dump(trace_output)
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -15,8 +15,12 @@ from shapely.wkt import loads
 import geopandas as gpd
 import subprocess
 from rasterio.merge import merge
-import time
 import pandas as pd
+import sys
+
+# Percentis por histograma (mesma implementação do pacote brazil_data_cube)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "brazil_data_cube"))
+from brazil_data_cube.processors.statistics import array_percentiles
 
 
 
@@ -164,7 +168,7 @@ def merge_rgb_tif(r,g,b, output_path,satelite):
 
         def normalize_percentile(array):
             """Normalização com recorte de extremos (usada pelo S2_L2A-1)"""
-            p2, p98 = np.percentile(array, (2, 98))
+            p2, p98 = array_percentiles(array, (2, 98))
             array = np.clip(array, p2, p98)
             if array.max() - array.min() == 0:
                 return np.zeros_like(array, dtype=np.uint8)
@@ -235,7 +239,6 @@ def mosaic_tiles(tile_files, output_path):
                     if result.returncode != 0:
                         logging.error(f"Erro ao reprojetar {fp}: {result.stderr}")
                         continue
-                    time.sleep(5)
                     valid_files.append(reprojected_fp)
                     src_files.append(rasterio.open(reprojected_fp))
                     continue
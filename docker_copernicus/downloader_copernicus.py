@@ -2,6 +2,7 @@ import openeo
 import math
 import logging
 import os
+import sys
 import typer
 import rasterio
 from rasterio.merge import merge
@@ -16,6 +17,10 @@ from rasterio.merge import merge
 from openeo.rest.connection import OpenEoApiError
 import subprocess
 
+# Perfis de saída (gtiff, cog-deflate, cog-zstd) do pacote brazil_data_cube
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "brazil_data_cube"))
+from brazil_data_cube.utils.output_profiles import OutputProfile
+
 
 
 
@@ -216,9 +221,13 @@ class BBoxProcessor:
         return bboxes
 
 class TileMosaicker:
-    def __init__(self, tile_files, output_path):
+    def __init__(self, tile_files, output_path, virtual=False, output_profile="gtiff"):
         self.tile_files = tile_files
         self.output_path = output_path
+        # Formato do mosaico gravado: gtiff, cog-deflate ou cog-zstd
+        self.output_profile = OutputProfile(output_profile)
+        # Com virtual=True o mosaico é só um VRT (gdalbuildvrt) que referencia os tiles
+        self.virtual = virtual
 
     def mosaic_tiles(self):
         src_files = []
@@ -272,6 +281,11 @@ class TileMosaicker:
             logging.error("Nenhum arquivo válido para mosaico.")
             return None
 
+        if self.virtual:
+            for src in src_files:
+                src.close()
+            return self.build_vrt(valid_files)
+
         # Fusão dos arquivos ajustados
         mosaic, out_trans = rasterio.merge.merge(src_files)
 
@@ -286,7 +300,7 @@ class TileMosaicker:
             "crs": common_crs
         })
 
-        with rasterio.open(self.output_path, "w", **out_meta) as dest:
+        with self.output_profile.open(self.output_path, **out_meta) as dest:
             dest.write(mosaic)
 
         for src in src_files:
@@ -295,6 +309,25 @@ class TileMosaicker:
         logging.info(f"Mosaico salvo em: {self.output_path}")
         return self.output_path
 
+    def build_vrt(self, valid_files):
+        """Grava um VRT sobre os tiles, no lugar do .tif de saída (leva milissegundos)."""
+        vrt_path = os.path.splitext(self.output_path)[0] + ".vrt"
+        # Resolução do primeiro tile, como no merge (o padrão do gdalbuildvrt é a média das fontes)
+        with rasterio.open(valid_files[0]) as first:
+            x_res, y_res = first.res
+        # No VRT a última fonte prevalece; a ordem é invertida para valer o primeiro tile, como no merge
+        cmd = ["gdalbuildvrt", "-overwrite", "-resolution", "user", "-tr", repr(x_res), repr(y_res),
+               vrt_path] + list(reversed(valid_files))
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            logging.error(f"Erro ao criar o VRT {vrt_path}: {result.stderr}")
+            return None
+
+        self.output_path = vrt_path
+        logging.info(f"Mosaico virtual salvo em: {vrt_path}")
+        return vrt_path
+
 
 app = typer.Typer()
 
@@ -323,7 +356,9 @@ def main(
     client_secret: str = typer.Option('wNqrCLhYnogycEclvClgVfrCRzNxjzec', help="Client Secret da conta Copernicus"),
     output_dir: str = typer.Option("docker_copernicus\\imagens", help="Diretório de saída para salvar as imagens"),
     tile_size_km: float = typer.Option(16.0),
-    tile_grid_path: str = typer.Option("docker_copernicus\\shapefile_ids\\grade_sentinel_brasil.shp")
+    tile_grid_path: str = typer.Option("docker_copernicus\\shapefile_ids\\grade_sentinel_brasil.shp"),
+    virtual_mosaic: bool = typer.Option(False, help="Grava o mosaico do Paraná como VRT sobre os mosaicos dos tiles (gdalbuildvrt)"),
+    output_profile: str = typer.Option("gtiff", help="Formato dos mosaicos gravados: gtiff, cog-deflate ou cog-zstd")
 ):
     copernicus_conn = CopernicusConnection(client_id, client_secret)
     copernicus_conn.initialize()
@@ -402,7 +437,7 @@ def main(
 
             tile_mosaic_output = os.path.join(tile_dir, f"{satelite}_{tile}_{start_date}_{end_date}_mosaic.tif")
             if tile_files:
-                processor_mosaic = TileMosaicker(tile_files, tile_mosaic_output)
+                processor_mosaic = TileMosaicker(tile_files, tile_mosaic_output, output_profile=output_profile)
                 processor_mosaic.mosaic_tiles()
                 logging.info(f"Mosaico do tile {tile} criado: {tile_mosaic_output}")
                 tile_mosaic_files.append(tile_mosaic_output)
@@ -411,8 +446,8 @@ def main(
 
         if tile_mosaic_files:
             parana_mosaic_output = os.path.join(output_dir, f"{satelite}_Parana_mosaic_{start_date}_{end_date}_2.tif")
-            processor_mosaic = TileMosaicker(tile_mosaic_files, parana_mosaic_output)
-            processor_mosaic.mosaic_tiles()
+            processor_mosaic = TileMosaicker(tile_mosaic_files, parana_mosaic_output, virtual_mosaic, output_profile)
+            parana_mosaic_output = processor_mosaic.mosaic_tiles()
             logging.info(f"Mosaico final do Paraná criado em: {parana_mosaic_output}")
         else:
             logging.error("Nenhum mosaico foi criado para o Paraná.")
@@ -516,7 +551,7 @@ def main(
             final_filepath = os.path.join(output_dir, final_filename)
 
             if temp_files:
-                processor_mosaic = TileMosaicker(temp_files, final_filepath)
+                processor_mosaic = TileMosaicker(temp_files, final_filepath, output_profile=output_profile)
                 processor_mosaic.mosaic_tiles()
                 logging.info(f"Mosaico final criado em: {final_filepath}")
             else:
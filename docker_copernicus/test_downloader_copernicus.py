@@ -0,0 +1,60 @@
+# test_downloader_copernicus.py
+import shutil
+import numpy as np
+import pytest
+import rasterio
+from rasterio.merge import merge
+from rasterio.transform import from_origin
+
+pytest.importorskip("openeo")
+
+from downloader_copernicus import TileMosaicker
+
+CRS = "EPSG:32721"
+
+def _write_tile(path, left, top, width, height, seed, res):
+    data = np.random.default_rng(seed).integers(1, 255, size=(3, height, width)).astype(np.uint8)
+    data[:, :, :3] = 0
+    profile = {"driver": "GTiff", "width": width, "height": height, "count": 3, "dtype": "uint8",
+               "crs": CRS, "transform": from_origin(left, top, res, res), "nodata": 0}
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data)
+    return str(path)
+
+def _tiles(tmp_path):
+    # O segundo tile tem outra resolução: o VRT deve usar a do primeiro, como o merge
+    return [
+        _write_tile(tmp_path / "a.tif", 500000, 7200000, 60, 50, 1, 10),
+        _write_tile(tmp_path / "b.tif", 500300, 7199800, 30, 25, 2, 20),
+    ]
+
+def test_build_vrt_uses_first_tile_resolution_and_reversed_order(tmp_path, mocker):
+    tiles = _tiles(tmp_path)
+    run = mocker.patch("downloader_copernicus.subprocess.run")
+    run.return_value.returncode = 0
+
+    vrt_path = TileMosaicker(tiles, str(tmp_path / "mosaico.tif"), virtual=True).build_vrt(tiles)
+
+    assert vrt_path == str(tmp_path / "mosaico.vrt")
+    cmd = run.call_args.args[0]
+    assert cmd[cmd.index("-resolution") + 1] == "user"
+    assert cmd[cmd.index("-tr") + 1:cmd.index("-tr") + 3] == ["10.0", "10.0"]
+    assert cmd[-2:] == list(reversed(tiles))
+
+@pytest.mark.skipif(shutil.which("gdalbuildvrt") is None, reason="gdalbuildvrt não instalado")
+def test_virtual_mosaic_matches_merge(tmp_path):
+    tiles = _tiles(tmp_path)
+
+    vrt_path = TileMosaicker(tiles, str(tmp_path / "mosaico.tif"), virtual=True).mosaic_tiles()
+
+    sources = [rasterio.open(path) for path in tiles]
+    try:
+        expected, transform = merge(sources)
+    finally:
+        for src in sources:
+            src.close()
+
+    with rasterio.open(vrt_path) as result:
+        assert result.res == (10, 10)
+        assert result.transform == transform
+        assert np.array_equal(result.read(), expected)
@@ -1,12 +1,18 @@
 import os
+import sys
 import requests
 import rasterio
 import numpy as np
 from rasterio.plot import reshape_as_raster
 from pystac_client import Client
 
+# Perfis de saída (gtiff, cog-deflate, cog-zstd) do pacote brazil_data_cube
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "brazil_data_cube"))
+from brazil_data_cube.utils.output_profiles import OutputProfile
+
 # Parâmetros de busca
 CLOUD_COVER_MAX = 20  # Percentual máximo de cobertura de nuvens
+OUTPUT_PROFILE = "gtiff"  # Formato do RGB: gtiff, cog-deflate ou cog-zstd
 
 # URL do STAC do INPE
 datainpe = "https://data.inpe.br/bdc/stac/v1/"
@@ -74,7 +80,7 @@ meta.update({"count": 3, "dtype": "uint16"})  # Ajuste conforme necessário
 
 # Salvar imagem RGB na pasta /images
 caminho_rgb = os.path.join("inpe/images", "rgb_merged.tif")
-with rasterio.open(caminho_rgb, "w", **meta) as dst:
+with OutputProfile(OUTPUT_PROFILE).open(caminho_rgb, **meta) as dst:
     dst.write(rgb)
 
 print(f"Imagem RGB salva em: {caminho_rgb}")
@@ -21,9 +21,13 @@ import geopandas as gpd
 import re
 import subprocess
 from rasterio.merge import merge
-import time
 import planetary_computer
 from pystac.extensions.eo import EOExtension as eo
+import sys
+
+# Percentis por histograma (mesma implementação do pacote brazil_data_cube)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "brazil_data_cube"))
+from brazil_data_cube.processors.statistics import array_percentiles
 
 
 
@@ -183,7 +187,7 @@ def merge_rgb_tif(r, g, b, output_path, satelite):
         def normalize_percentile_common(r, g, b, gamma=1.0):
             """Normalização com percentil comum entre bandas e correção gama"""
             stacked = np.stack([r, g, b])
-            p2, p98 = np.percentile(stacked, (2, 98))
+            p2, p98 = array_percentiles(stacked, (2, 98))
 
             def apply(arr):
                 arr = np.clip(arr, p2, p98)
@@ -259,7 +263,6 @@ def mosaic_tiles(tile_files, output_path):
                     if result.returncode != 0:
                         logging.error(f"Erro ao reprojetar {fp}: {result.stderr}")
                         continue
-                    time.sleep(5)
                     valid_files.append(reprojected_fp)
                     src_files.append(rasterio.open(reprojected_fp))
                     continue
@@ -13,6 +13,10 @@ import numpy as np
 from rasterio.merge import merge
 from rasterio.plot import show
 
+# Perfis de saída (gtiff, cog-deflate, cog-zstd) do pacote brazil_data_cube
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "brazil_data_cube"))
+from brazil_data_cube.utils.output_profiles import OutputProfile
+
 # Definições iniciais
 MAX_THREADS = 5  # Número máximo de downloads simultâneos
 SEMA = threading.Semaphore(value=MAX_THREADS)
@@ -49,7 +53,7 @@ def send_request(url, data, api_key=None):
         sys.exit()
 
 # Função para extrair bandas RGB e combinar
-def process_landsat_tar(file_path, base_path):
+def process_landsat_tar(file_path, base_path, output_profile="gtiff"):
     tiles_path = os.path.join(base_path, "tiles")
     images_path = base_path
     os.makedirs(tiles_path, exist_ok=True)
@@ -74,7 +78,7 @@ def process_landsat_tar(file_path, base_path):
                 profile.update(count=3, dtype=np.uint16)
                 
                 rgb_output_path = os.path.join(images_path, os.path.basename(file_path).replace(".tar", "_RGB.tif"))
-                with rasterio.open(rgb_output_path, "w", **profile) as dst:
+                with OutputProfile(output_profile).open(rgb_output_path, **profile) as dst:
                     for i, src in enumerate(rgb_files):
                         dst.write(src.read(1), i + 1)
                 
@@ -83,7 +87,7 @@ def process_landsat_tar(file_path, base_path):
         log_message(f"Erro ao processar TAR {file_path}: {e}")
 
 # Função para download
-def download_file(url, base_path):
+def download_file(url, base_path, output_profile="gtiff"):
     SEMA.acquire()
     tiles_path = os.path.join(base_path, "tiles")
     os.makedirs(tiles_path, exist_ok=True)
@@ -103,15 +107,15 @@ def download_file(url, base_path):
                 file.write(chunk)
         
         log_message(f"Download concluído: {file_path}")
-        process_landsat_tar(file_path, base_path)  # Processar TAR após download
+        process_landsat_tar(file_path, base_path, output_profile)  # Processar TAR após download
     except Exception as e:
         log_message(f"Erro ao baixar {url}: {e}")
     finally:
         SEMA.release()
 
 # Função para gerenciar threads de download
-def run_download(url, path):
-    thread = threading.Thread(target=download_file, args=(url, path))
+def run_download(url, path, output_profile="gtiff"):
+    thread = threading.Thread(target=download_file, args=(url, path, output_profile))
     THREADS.append(thread)
     thread.start()
 
@@ -121,6 +125,7 @@ if __name__ == "__main__":
     parser.add_argument('-u', '--username', required=True, help='ERS Username')
     parser.add_argument('-t', '--token', required=True, help='ERS application token')
     parser.add_argument('-p', '--path', required=True, help='Diretório para salvar arquivos')
+    parser.add_argument('--output-profile', default='gtiff', help='Formato do RGB: gtiff, cog-deflate ou cog-zstd')
     args = parser.parse_args()
 
     username = args.username
@@ -165,7 +170,7 @@ if __name__ == "__main__":
                 request_results = send_request(service_url + "download-request", payload, api_key)
                 
                 for download in request_results.get("availableDownloads", []):
-                    run_download(download['url'], path)
+                    run_download(download['url'], path, args.output_profile)
     
     log_message("Aguardando downloads...")
     for thread in THREADS: